@@ -7,21 +7,24 @@ from langgraph.graph import StateGraph, START, END
 # To create image
 from utils.graph_img_generation import save_and_show_graph
 
+# Append-only text channel: nodes return only the new fragment, no string copies
+from utils.text_channel import AppendOnlyText
+
 class State(TypedDict):
-    graph_state: str
+    graph_state: AppendOnlyText
 
 
 def node_1(state):
     print("---Node 1---")
-    return {"graph_state": state['graph_state'] + " I am"}
+    return {"graph_state": " I am"}
 
 def node_2(state):
     print("---Node 2---")
-    return {"graph_state": state['graph_state'] + " happy :)  "}
+    return {"graph_state": " happy :)  "}
 
 def node_3(state):
     print("---Node 3---")
-    return {"graph_state": state['graph_state'] + " Sad :(  "}
+    return {"graph_state": " Sad :(  "}
 
 
 def decide_mood(state) -> Literal["node_2", "node_3"]:
@@ -3,6 +3,7 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import MessagesState, START, END, StateGraph
 from langgraph.checkpoint.mongodb import MongoDBSaver
+from utils.delta_checkpointer import DeltaCheckpointSaver
 
 from config.secret_keys import OPENAI_API_KEY, MONGO_URI
 
@@ -18,7 +19,8 @@ try:
     print("✅ MongoDB Connection: Successfully connected")
     
     # Set up the checkpointer
-    mongodb_memory = MongoDBSaver(mongodb_client)
+    # Messages are stored as deltas between checkpoints instead of the full list every time
+    mongodb_memory = DeltaCheckpointSaver(MongoDBSaver(mongodb_client))
     print("✅ MongoDB Checkpointer: Successfully initialized")
 except Exception as e:
     print(f"❌ MongoDB Error: {e}")
@@ -3,6 +3,7 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import MessagesState, START, END, StateGraph
 from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+from utils.delta_checkpointer import DeltaCheckpointSaver
 
 from config.secret_keys import OPENAI_API_KEY, MONGO_URI
 
@@ -21,7 +22,8 @@ async def initialize_mongodb():
         print("✅ MongoDB Connection: Successfully connected")
         
         # Set up the checkpointer
-        checkpointer = AsyncMongoDBSaver(async_mongodb_client)
+        # Messages are stored as deltas between checkpoints instead of the full list every time
+        checkpointer = DeltaCheckpointSaver(AsyncMongoDBSaver(async_mongodb_client))
         print("✅ MongoDB Checkpointer: Successfully initialized")
         return checkpointer
     except Exception as e:
@@ -4,7 +4,7 @@
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import MessagesState, START, END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from utils.bounded_checkpointer import BoundedMemorySaver
 from langgraph.store.memory import InMemoryStore
 from typing import Annotated, Dict, List, Any
 from typing_extensions import TypedDict
@@ -108,7 +108,7 @@ builder.add_edge("Assistant", END)
 # Compile the graph with in-memory checkpointer and store
 try:
     memory_graph = builder.compile(
-        checkpointer=MemorySaver(),  # In-memory checkpointer for conversation history
+        checkpointer=BoundedMemorySaver(keep_checkpoints=10, max_threads=1000),  # In-memory checkpointer for conversation history
         store=memory_store           # In-memory store for cross-thread memories
     )
     print("✅ Graph compiled with cross-thread memory")
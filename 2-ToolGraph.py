@@ -6,6 +6,9 @@ from langgraph.graph import MessagesState
 from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import tools_condition
 
+# Memoizes the results of pure tools (same arguments -> same result)
+from utils.tool_cache import ToolResultCache, pure_tool, with_result_cache
+
 # To create image
 from utils.graph_img_generation import save_and_show_graph
 
@@ -21,6 +24,7 @@ llm = ChatOpenAI(model = "gpt-4o-mini", openai_api_key=OPENAI_API_KEY)
 
 
 # defining the tools
+@pure_tool
 def multiply(a: int, b: int) -> int:
     """Multiply a and b.
 
@@ -32,6 +36,11 @@ def multiply(a: int, b: int) -> int:
 
 
 
+# cache for the pure tools, shared by every run of the graph
+tool_cache = ToolResultCache(maxsize=256)
+
+
+
 # binding tools with llm
 llm_with_tools = llm.bind_tools([multiply])
 
@@ -47,7 +56,7 @@ def tool_calling_llm(state: MessagesState):
 # Build the graph
 builder = StateGraph(MessagesState)
 builder.add_node("tool_calling_llm", tool_calling_llm)
-builder.add_node("tools", ToolNode([multiply]))
+builder.add_node("tools", ToolNode(with_result_cache([multiply], tool_cache)))
 builder.add_edge(START, "tool_calling_llm")
 builder.add_conditional_edges(
     "tool_calling_llm",
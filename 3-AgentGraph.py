@@ -7,9 +7,18 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import tools_condition
 
+# Answers pure arithmetic locally, without calling the LLM
+from utils.arithmetic_fast_path import make_arithmetic_fast_path, arithmetic_fast_path_condition
+
+# Memoizes the results of pure tools (same arguments -> same result)
+from utils.tool_cache import ToolResultCache, pure_tool, with_result_cache
+
 # To create image
 from utils.graph_img_generation import save_and_show_graph
 
+# Records per-node latency, LLM calls and tokens when GRAPH_TRACE_DIR is set
+from utils.node_tracer import trace_graph
+
 # for printing messages
 from langchain_core.messages import HumanMessage
 
@@ -23,6 +32,7 @@ llm = ChatOpenAI(model = "gpt-4o-mini",openai_api_key=OPENAI_API_KEY)
 
 
 # defining the tools
+@pure_tool
 def multiply(a: int, b: int) -> int:
     """Multiply a and b.
 
@@ -32,6 +42,7 @@ def multiply(a: int, b: int) -> int:
     """
     return a * b
 
+@pure_tool
 def add(a: int, b: int) -> int:
     """Adds a and b.
 
@@ -41,6 +52,7 @@ def add(a: int, b: int) -> int:
     """
     return a + b
 
+@pure_tool
 def subtract(a: int, b: int) -> int:
     """Subtract a and b.
 
@@ -50,6 +62,7 @@ def subtract(a: int, b: int) -> int:
     """
     return a - b
 
+@pure_tool
 def divide(a: int, b: int) -> float:
     """Divide a and b.
 
@@ -61,11 +74,15 @@ def divide(a: int, b: int) -> float:
 
 tools = [add, subtract, multiply, divide]
 
+# cache for the pure tools, shared by every run (and retry) of the graph
+tool_cache = ToolResultCache(maxsize=256)
 
-# For this ipynb we set parallel tool calling to false as math generally is done sequentially, and this time we have 3 tools that can do math
-# the OpenAI model specifically defaults to parallel tool calling for efficiency, see https://python.langchain.com/docs/how_to/tool_calling_parallel/
+
+# Math is usually done sequentially, but independent steps (like both sums in (1+2)*(3+4)) can be sent in one turn.
+# ToolNode runs the calls of a turn concurrently, steps that need an earlier result come in the next turn,
+# see https://python.langchain.com/docs/how_to/tool_calling_parallel/
 # binding tools with llm
-llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
+llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=True)
 
 
 
@@ -83,11 +100,18 @@ def assistant(state: MessagesState):
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
+builder.add_node("arithmetic_fast_path", make_arithmetic_fast_path(tools))
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+builder.add_node("tools", ToolNode(with_result_cache(tools, tool_cache)))
 
 # Define edges: these determine how the control flow moves
-builder.add_edge(START, "assistant")
+builder.add_edge(START, "arithmetic_fast_path")
+builder.add_conditional_edges(
+    "arithmetic_fast_path",
+    # If the input is pure arithmetic (e.g. "7+3+4-2") it is already answered -> END
+    # Otherwise -> assistant
+    arithmetic_fast_path_condition,
+)
 builder.add_conditional_edges(
     "assistant",
     # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
@@ -96,6 +120,7 @@ builder.add_conditional_edges(
 )
 builder.add_edge("tools", "assistant")
 agent_graph = builder.compile()
+agent_graph = trace_graph(agent_graph, "agent_graph")
 
 
 # Use the utility function to save and optionally show the graph
@@ -7,14 +7,26 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.prebuilt import ToolNode
 from langgraph.prebuilt import tools_condition
 
+# Answers pure arithmetic locally, without calling the LLM
+from utils.arithmetic_fast_path import make_arithmetic_fast_path, arithmetic_fast_path_condition
+
+# Memoizes the results of pure tools (same arguments -> same result)
+from utils.tool_cache import ToolResultCache, pure_tool, with_result_cache
+
+# Keeps the prompt within a token budget as the thread grows
+from utils.context_window import ContextWindow
+
 # To create image
-from utils.graph_img_generation import save_and_show_graph
+from utils.graph_img_generation import save_and_show_graph, wait_for_pending_renders
+
+# Records per-node latency, LLM calls and tokens when GRAPH_TRACE_DIR is set
+from utils.node_tracer import trace_graph
 
 # for printing messages
 from langchain_core.messages import HumanMessage
 
-# for adding checkpoint in memory
-from langgraph.checkpoint.memory import MemorySaver
+# for adding checkpoint in memory (bounded: old checkpoints and idle threads are dropped)
+from utils.bounded_checkpointer import BoundedMemorySaver
 
 from config.secret_keys import OPENAI_API_KEY
 
@@ -23,12 +35,13 @@ from config.secret_keys import OPENAI_API_KEY
 # defining the LLM
 llm = ChatOpenAI(model = "gpt-4o-mini", openai_api_key=OPENAI_API_KEY)
 
-# defining a memory location
-memory = MemorySaver()
+# defining a memory location, keeping the last 10 checkpoints of at most 1000 threads
+memory = BoundedMemorySaver(keep_checkpoints=10, max_threads=1000)
 
 
 
 # defining the tools
+@pure_tool
 def multiply(a: int, b: int) -> int:
     """Multiply a and b.
 
@@ -38,6 +51,7 @@ def multiply(a: int, b: int) -> int:
     """
     return a * b
 
+@pure_tool
 def add(a: int, b: int) -> int:
     """Adds a and b.
 
@@ -47,6 +61,7 @@ def add(a: int, b: int) -> int:
     """
     return a + b
 
+@pure_tool
 def subtract(a: int, b: int) -> int:
     """Subtract a and b.
 
@@ -56,6 +71,7 @@ def subtract(a: int, b: int) -> int:
     """
     return a - b
 
+@pure_tool
 def divide(a: int, b: int) -> float:
     """Divide a and b.
 
@@ -67,11 +83,15 @@ def divide(a: int, b: int) -> float:
 
 tools = [add, subtract, multiply, divide]
 
+# cache for the pure tools, shared by every run (and retry) of the graph
+tool_cache = ToolResultCache(maxsize=256)
+
 
-# For this ipynb we set parallel tool calling to false as math generally is done sequentially, and this time we have 3 tools that can do math
-# the OpenAI model specifically defaults to parallel tool calling for efficiency, see https://python.langchain.com/docs/how_to/tool_calling_parallel/
+# Math is usually done sequentially, but independent steps (like both sums in (1+2)*(3+4)) can be sent in one turn.
+# ToolNode runs the calls of a turn concurrently, steps that need an earlier result come in the next turn,
+# see https://python.langchain.com/docs/how_to/tool_calling_parallel/
 # binding tools with llm
-llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
+llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=True)
 
 
 
@@ -79,9 +99,12 @@ llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
 # System message
 sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
 
+# Only the most recent turns that fit in the budget are sent (the current turn is always sent whole)
+context_window = ContextWindow(max_tokens=4000)
+
 # Node
 def assistant(state: MessagesState):
-   return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+   return {"messages": [llm_with_tools.invoke(context_window.build_prompt(sys_msg, state["messages"]))]}
 
 
 
@@ -89,11 +112,18 @@ def assistant(state: MessagesState):
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
+builder.add_node("arithmetic_fast_path", make_arithmetic_fast_path(tools))
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+builder.add_node("tools", ToolNode(with_result_cache(tools, tool_cache)))
 
 # Define edges: these determine how the control flow moves
-builder.add_edge(START, "assistant")
+builder.add_edge(START, "arithmetic_fast_path")
+builder.add_conditional_edges(
+    "arithmetic_fast_path",
+    # If the input is pure arithmetic (e.g. "7+3+4-2") it is already answered -> END
+    # Otherwise -> assistant
+    arithmetic_fast_path_condition,
+)
 builder.add_conditional_edges(
     "assistant",
     # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
@@ -104,10 +134,11 @@ builder.add_edge("tools", "assistant")
 
 # Compile graph with memory
 agent_graph_withMemory = builder.compile(checkpointer=memory)
+agent_graph_withMemory = trace_graph(agent_graph_withMemory, "agent_graph_withMemory")
 
 
-# Use the utility function to save and optionally show the graph
-save_and_show_graph(agent_graph_withMemory, filename="AgentGraph_withMemory_image", show_image=False)
+# Use the utility function to save and optionally show the graph (rendered in the background)
+save_and_show_graph(agent_graph_withMemory, filename="AgentGraph_withMemory_image", show_image=False, background=True)
 
 
 
@@ -130,3 +161,6 @@ while True:
 
     for m in messages['messages']:
         m.pretty_print()
+
+# Make sure the graph image has finished rendering before exiting
+wait_for_pending_renders()
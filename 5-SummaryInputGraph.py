@@ -1,11 +1,29 @@
+import operator
+from typing import Annotated
+
 from langchain_openai import ChatOpenAI
 
 from langgraph.graph import MessagesState
-from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from utils.bounded_checkpointer import BoundedMemorySaver
 from langgraph.graph import StateGraph, START, END
 
-from utils.graph_img_generation import save_and_show_graph
+from utils.graph_img_generation import save_and_show_graph, wait_for_pending_renders
+
+# Counts message tokens (each message is tokenized once and cached)
+from utils.token_counter import TokenCounter
+
+# Message channel that drops old messages by moving its head instead of rebuilding the list
+from utils.message_window import WindowedMessages, TruncateBefore
+
+# Keeps the summary as levels of bounded chunk summaries
+from utils.rolling_summary import add_summary, summaries_for_prompt
+
+# Runs summarization in the background after the reply
+from utils.deferred_updates import DeferredNodeRunner
+
+# Records per-node latency, LLM calls and tokens when GRAPH_TRACE_DIR is set
+from utils.node_tracer import trace_graph
 
 
 from config.secret_keys import OPENAI_API_KEY
@@ -15,16 +33,46 @@ from config.secret_keys import OPENAI_API_KEY
 # defining the LLM
 llm = ChatOpenAI(model = "gpt-4o-mini", openai_api_key=OPENAI_API_KEY)
 
+# Summarize once the messages take more than this many tokens (past about 1250, the longer
+# prompts cost more than the summaries save, see benchmarks/summary_trigger.py)
+SUMMARY_TOKEN_BUDGET = 750
+
+# Summarize in the background after the reply, instead of as part of the user's turn
+BACKGROUND_SUMMARY = True
+
+# Summaries are kept short, 4 summaries of one level are rolled up into one of the next level,
+# and the prompt gets the highest level summaries, then finer ones up to SUMMARY_PROMPT_TOKENS
+SUMMARY_MAX_TOKENS = 300
+SUMMARY_FANOUT = 4
+SUMMARY_PROMPT_TOKENS = 1500
+
+CHUNK_SUMMARY_PROMPT = "Summarize the conversation above in at most 200 words:"
+ROLLUP_SUMMARY_PROMPT = "Combine these summaries of consecutive parts of a conversation into one summary of at most 200 words:"
+
+token_counter = TokenCounter(model="gpt-4o-mini")
+
 
 class State(MessagesState):
-    summary: str
+    messages: WindowedMessages
+    # Summaries of the removed messages, oldest first: [{"level": int, "text": str}]
+    summaries: list[dict]
+    # Running token count of the messages: nodes return the change, which is added up
+    message_tokens: Annotated[int, operator.add]
+
+
+def new_input_messages(messages: list) -> list:
+    """Messages added since the last model reply (the user input of this turn, not counted yet)."""
+    start = len(messages)
+    while start > 0 and not isinstance(messages[start - 1], AIMessage):
+        start -= 1
+    return messages[start:]
 
 
 # Define the logic to call the model
 def call_model(state: State):
     
-    # Get summary if it exists
-    summary = state.get("summary", "")
+    # Get the summaries that fit the budget, if there are any
+    summary = summaries_for_prompt(state.get("summaries", []), SUMMARY_PROMPT_TOKENS, token_counter.encode)
 
     # If there is summary, then we add it
     if summary:
@@ -39,34 +87,38 @@ def call_model(state: State):
         messages = state["messages"]
     
     response = llm.invoke(messages)
-    return {"messages": response}
+
+    # Only the new input and the reply are counted, the rest is already in message_tokens
+    added_tokens = token_counter.count_messages(new_input_messages(state["messages"]) + [response])
+    return {"messages": response, "message_tokens": added_tokens}
+
+
+# Rolls summaries of the same level up into one summary of the next level
+def merge_summaries(texts: list) -> str:
+    parts = "\n\n".join(f"Part {i + 1}: {text}" for i, text in enumerate(texts))
+    response = llm.invoke([HumanMessage(content=f"{ROLLUP_SUMMARY_PROMPT}\n\n{parts}")], max_tokens=SUMMARY_MAX_TOKENS)
+    return response.content
 
 
 # Creating a summary of the message history
 def summarize_conversation(state: State):
     
-    # First, we get any existing summary
-    summary = state.get("summary", "")
-
-    # Create our summarization prompt 
-    if summary:
-        
-        # A summary already exists
-        summary_message = (
-            f"This is summary of the conversation to date: {summary}\n\n"
-            "Extend the summary by taking into account the new messages above:"
-        )
-        
-    else:
-        summary_message = "Create a summary of the conversation above:"
-
-    # Add prompt to our history
-    messages = state["messages"] + [HumanMessage(content=summary_message)]
-    response = llm.invoke(messages)
+    # Only the messages that are removed are summarized, the earlier summaries are not re-read
+    old_messages = state["messages"][:-2]
+    messages = old_messages + [HumanMessage(content=CHUNK_SUMMARY_PROMPT)]
+    response = llm.invoke(messages, max_tokens=SUMMARY_MAX_TOKENS)
+
+    # Add it as a level 0 summary, and roll up full levels
+    summaries = add_summary(state.get("summaries", []), {"level": 0, "text": response.content},
+                            merge=merge_summaries, fanout=SUMMARY_FANOUT)
     
-    # Delete all but the 2 most recent messages
-    delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
-    return {"summary": response.content, "messages": delete_messages}
+    # Delete all but the 2 most recent messages (messages added after them, e.g. while
+    # summarizing in the background, are kept)
+    delete_messages = TruncateBefore(state["messages"][-2].id)
+
+    # Subtract the deleted messages (their counts come from the cache)
+    removed_tokens = token_counter.count_messages(old_messages)
+    return {"summaries": summaries, "messages": delete_messages, "message_tokens": -removed_tokens}
 
 
 # Determine whether to end or summarize the conversation
@@ -76,8 +128,9 @@ def should_continue(state: State):
     
     messages = state["messages"]
     
-    # If there are more than six messages, then we summarize the conversation
-    if len(messages) > 6:
+    # If the messages are over the token budget, then we summarize the conversation
+    # (at least 3 messages, as the last 2 are kept anyway)
+    if state.get("message_tokens", 0) > SUMMARY_TOKEN_BUDGET and len(messages) > 2:
         return "summarize_conversation"
     
     # Otherwise we can just end
@@ -91,15 +144,27 @@ workflow.add_node(summarize_conversation)
 
 # Set the entrypoint as conversation
 workflow.add_edge(START, "conversation")
-workflow.add_conditional_edges("conversation", should_continue)
+if BACKGROUND_SUMMARY:
+    # The turn ends with the reply, summarize_conversation runs afterwards (see DeferredNodeRunner below)
+    workflow.add_edge("conversation", END)
+else:
+    workflow.add_conditional_edges("conversation", should_continue)
 workflow.add_edge("summarize_conversation", END)
 
 # Compile
-memory = MemorySaver()
+memory = BoundedMemorySaver(keep_checkpoints=10, max_threads=1000)
 summarize_conversation_graph = workflow.compile(checkpointer=memory)
+summarize_conversation_graph = trace_graph(summarize_conversation_graph, "summarize_conversation_graph")
 
-# Use the utility function to save and optionally show the graph
-save_and_show_graph(summarize_conversation_graph, filename="AgentGraph_withMemory_image", show_image=False)
+# Use the utility function to save and optionally show the graph (rendered in the background)
+save_and_show_graph(summarize_conversation_graph, filename="AgentGraph_withMemory_image", show_image=False, background=True)
+
+# Summarizes the thread on a worker thread once a turn pushes it over the token budget
+summarizer = DeferredNodeRunner(
+    summarize_conversation_graph,
+    summarize_conversation,
+    should_run=lambda state: should_continue(state) == "summarize_conversation",
+)
 
 
 
@@ -117,8 +182,15 @@ while True:
         break
 
     messages = [HumanMessage(content=user_msg)]
-    messages = summarize_conversation_graph.invoke({"messages": messages}, config)
+    if BACKGROUND_SUMMARY:
+        messages = summarizer.invoke({"messages": messages}, config)
+    else:
+        messages = summarize_conversation_graph.invoke({"messages": messages}, config)
 
 
     for m in messages['messages'][-1:]:
-        m.pretty_print()
\ No newline at end of file
+        m.pretty_print()
+
+# Let a running summarization finish, and make sure the graph image has finished rendering before exiting
+summarizer.close()
+wait_for_pending_renders()
@@ -4,16 +4,38 @@ from langchain_openai import ChatOpenAI
 # to build graph
 from langgraph.graph import StateGraph, START, MessagesState
 from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.prebuilt import tools_condition, ToolNode
+from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt import tools_condition
+
+# Answers pure arithmetic locally, without calling the LLM
+from utils.arithmetic_fast_path import make_arithmetic_fast_path, arithmetic_fast_path_condition
+
+# Memoizes the results of pure tools (same arguments -> same result)
+from utils.tool_cache import ToolResultCache, pure_tool, with_result_cache
+
+# Keeps the prompt within a token budget as the thread grows
+from utils.context_window import ContextWindow
 
 # To create image
-from utils.graph_img_generation import save_and_show_graph
+from utils.graph_img_generation import save_and_show_graph, wait_for_pending_renders
+
+# Keeps the threads paused at the breakpoint and resumes approved ones concurrently
+from utils.approval_queue import ApprovalQueue
+
+# Approves (or rejects) tool calls by rule, so only the unusual ones wait for a human
+from utils.approval_policy import ApprovalPolicy, ApprovalRule, REJECT
+
+# Records per-node latency, LLM calls and tokens when GRAPH_TRACE_DIR is set
+from utils.node_tracer import trace_graph
+
+# Streams per-step state diffs over HTTP/SSE when STATE_STREAM_PORT is set
+from utils.state_stream import serve_state_stream
 
 # for printing messages
 from langchain_core.messages import HumanMessage
 
-# for adding checkpoint in memory
-from langgraph.checkpoint.memory import MemorySaver
+# for adding checkpoint in memory (bounded: old checkpoints and idle threads are dropped)
+from utils.bounded_checkpointer import BoundedMemorySaver
 
 from config.secret_keys import OPENAI_API_KEY
 
@@ -22,12 +44,13 @@ from config.secret_keys import OPENAI_API_KEY
 # defining the LLM
 llm = ChatOpenAI(model = "gpt-4o-mini", openai_api_key=OPENAI_API_KEY)
 
-# defining a memory location
-memory = MemorySaver()
+# defining a memory location, keeping the last 10 checkpoints of at most 1000 threads
+memory = BoundedMemorySaver(keep_checkpoints=10, max_threads=1000)
 
 
 
 # defining the tools
+@pure_tool
 def multiply(a: int, b: int) -> int:
     """Multiply a and b.
 
@@ -37,6 +60,7 @@ def multiply(a: int, b: int) -> int:
     """
     return a * b
 
+@pure_tool
 def add(a: int, b: int) -> int:
     """Adds a and b.
 
@@ -46,6 +70,7 @@ def add(a: int, b: int) -> int:
     """
     return a + b
 
+@pure_tool
 def subtract(a: int, b: int) -> int:
     """Subtract a and b.
 
@@ -55,6 +80,7 @@ def subtract(a: int, b: int) -> int:
     """
     return a - b
 
+@pure_tool
 def divide(a: int, b: int) -> float:
     """Divide a and b.
 
@@ -66,7 +92,19 @@ def divide(a: int, b: int) -> float:
 
 tools = [add, subtract, multiply, divide]
 
-llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
+# cache for the pure tools, shared by every run (and retry) of the graph
+tool_cache = ToolResultCache(maxsize=256)
+
+# Tool calls matching a rule are decided without asking; your own answers are remembered for identical calls
+approval_policy = ApprovalPolicy([
+    # Arithmetic on numbers of reasonable size runs right away
+    ApprovalRule(tools=["add", "subtract", "multiply"], args={"a": (-10**6, 10**6), "b": (-10**6, 10**6)}),
+    # Division by zero never runs
+    ApprovalRule(tools=["divide"], args={"b": [0]}, decision=REJECT),
+])
+
+# Independent steps can be sent in one turn, ToolNode runs them concurrently
+llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=True)
 
 
 
@@ -74,9 +112,12 @@ llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
 # System message
 sys_msg = SystemMessage(content="You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
 
+# Only the most recent turns that fit in the budget are sent (the current turn is always sent whole)
+context_window = ContextWindow(max_tokens=4000)
+
 # Node
 def assistant(state: MessagesState):
-   return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+   return {"messages": [llm_with_tools.invoke(context_window.build_prompt(sys_msg, state["messages"]))]}
 
 
 
@@ -84,11 +125,18 @@ def assistant(state: MessagesState):
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
+builder.add_node("arithmetic_fast_path", make_arithmetic_fast_path(tools))
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+builder.add_node("tools", ToolNode(with_result_cache(tools, tool_cache)))
 
 # Define edges: these determine how the control flow moves
-builder.add_edge(START, "assistant")
+builder.add_edge(START, "arithmetic_fast_path")
+builder.add_conditional_edges(
+    "arithmetic_fast_path",
+    # If the input is pure arithmetic (e.g. "7+3+4-2") it is already answered -> END
+    # Otherwise -> assistant
+    arithmetic_fast_path_condition,
+)
 builder.add_conditional_edges(
     "assistant",
     # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
@@ -99,15 +147,32 @@ builder.add_edge("tools", "assistant")
 
 # Compile graph with memory
 breakpoint_graph = builder.compile(interrupt_before=["tools"], checkpointer=memory)
+breakpoint_graph = trace_graph(breakpoint_graph, "breakpoint_graph")
+
+
+# Use the utility function to save and optionally show the graph (rendered in the background)
+save_and_show_graph(breakpoint_graph, filename="BreakpointGraph_image", show_image=False, background=True)
+
+# Lets HTTP clients run and follow the threads (only when STATE_STREAM_PORT is set);
+# tool calls are approved below, so HTTP clients can't resume or edit a paused thread
+serve_state_stream(breakpoint_graph, allow_resume=False)
 
 
-# Use the utility function to save and optionally show the graph
-save_and_show_graph(breakpoint_graph, filename="BreakpointGraph_image", show_image=False)
 
+# Paused threads wait here for a decision; approved threads are resumed by up to 8 workers
+approvals = ApprovalQueue(breakpoint_graph, max_parallel=8, policy=approval_policy)
+
+
+def print_new_messages(futures, seen: int):
+    """Prints the messages the resumed runs added."""
+    for future in futures:
+        for m in future.result()['messages'][seen:]:
+            m.pretty_print()
 
 
 # Specify a thread AKA session
-config = {"configurable": {"thread_id": "1"}}
+thread_id = "1"
+config = {"configurable": {"thread_id": thread_id}}
 
 # Start the conversation loop
 while True:
@@ -123,9 +188,15 @@ while True:
     # Input
     initial_input = {"messages": HumanMessage(content=user_msg)}
 
-    # Run the graph until the first interruption
-    for event in breakpoint_graph.stream(initial_input, config, stream_mode="values"):
-        event['messages'][-1].pretty_print()
+    # Run the graph until the first interruption the policy can't decide
+    seen = len(breakpoint_graph.get_state(config).values.get('messages', []))
+    run = approvals.start(thread_id, initial_input)
+    print_new_messages([run], seen)
+
+    # Nothing to approve when the graph finished (or the policy decided every breakpoint)
+    if approvals.get(thread_id) is None:
+        continue
+    seen = len(run.result()['messages'])
 
     # Get user feedback
     user_approval = input("Do you want to call the tool? (yes/no): ")
@@ -134,8 +205,13 @@ while True:
     if user_approval.lower() == "yes":
         
         # If approved, continue the graph execution
-        for event in breakpoint_graph.stream(None, config, stream_mode="values"):
-            event['messages'][-1].pretty_print()
+        print_new_messages(approvals.approve([thread_id]), seen)
             
     else:
+        # The pending tool calls are answered with the reason, so the thread can take the next message
+        approvals.reject([thread_id], reason="Operation cancelled by user.")
         print("Operation cancelled by user.")
+
+# Stop the approval workers, and make sure the graph image has finished rendering before exiting
+approvals.close()
+wait_for_pending_renders()
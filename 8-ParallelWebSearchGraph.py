@@ -6,28 +6,49 @@ import operator
 # LangGraph components to build the graph
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.document_loaders import WikipediaLoader
-from langchain_community.tools.tavily_search import TavilySearchResults
+
+# Search clients shared by every run, reusing keep-alive connections
+from utils.search_clients import shared_search_clients
+
+# Search results cached on disk, so repeated questions don't go to the network
+from utils.retrieval_cache import RetrievalCache
+
+# Chunks, deduplicates and ranks the search results so only relevant passages reach the prompt
+from utils.context_packer import ContextPacker
 
 # Import custom function for image saving and display
 from utils.graph_img_generation import save_and_show_graph
 
+# Records per-node latency, LLM calls and tokens when GRAPH_TRACE_DIR is set
+from utils.node_tracer import trace_graph
+
 from config.secret_keys import OPENAI_API_KEY, TAVILY_API_KEY
 
 # Initialize the OpenAI language model with parameters
 llm = ChatOpenAI(model="gpt-4o-mini", openai_api_key=OPENAI_API_KEY, temperature=0)
 
+# Process-wide search clients (at most 16 search requests in flight)
+tavily_search, wikipedia_search = shared_search_clients(tavily_api_key=TAVILY_API_KEY, max_concurrency=16)
+
+# Results are fresh for a day, and served for another week while they are refreshed in the background
+retrieval_cache = RetrievalCache("./.retrieval_cache/search.sqlite", ttl=24 * 3600, stale_ttl=7 * 24 * 3600)
+
+# The answer prompt gets at most 1500 tokens of context, in passages of about 120 tokens
+context_packer = ContextPacker(max_tokens=1500, passage_tokens=120)
+
 # Define the structure of the state dictionary
 class State(TypedDict):
     question: str
     answer: str
     context: Annotated[list, operator.add]
+    selected_context: str
 
 # Define the function to retrieve documents from the web
 def search_web(state):
-    """Retrieve search results from the web using TavilySearchResults."""
-    tavily_search = TavilySearchResults(max_results=3)  # Initialize Tavily search
-    search_docs = tavily_search.invoke(state['question'])  # Retrieve documents
+    """Retrieve search results from the web using Tavily."""
+    search_docs = retrieval_cache.get_or_fetch(  # Retrieve documents (from the cache when possible)
+        "tavily:3", state['question'], lambda: tavily_search.search(state['question'], max_results=3)
+    )
     
     # Format search results for readability
     formatted_search_docs = "\n\n---\n\n".join(
@@ -43,7 +64,9 @@ def search_web(state):
 # Define the function to retrieve documents from Wikipedia
 def search_wikipedia(state):
     """Retrieve search results from Wikipedia."""
-    search_docs = WikipediaLoader(query=state['question'], load_max_docs=2).load()  # Load Wikipedia docs
+    search_docs = retrieval_cache.get_or_fetch(  # Load Wikipedia docs (from the cache when possible)
+        "wikipedia:2", state['question'], lambda: wikipedia_search.load(state['question'], load_max_docs=2)
+    )
     
     # Format Wikipedia results for readability
     formatted_search_docs = "\n\n---\n\n".join(
@@ -56,10 +79,15 @@ def search_wikipedia(state):
     # Update state with the Wikipedia results
     return {"context": [formatted_search_docs]} 
 
+# Define the function to select the passages of the search results that answer the question
+def select_context(state):
+    """Pack the most relevant passages of the accumulated context into the token budget."""
+    return {"selected_context": context_packer.pack(state["question"], state["context"])}
+
 # Define the function to generate an answer based on context
 def generate_answer(state):
-    """Generate an answer based on the accumulated context."""
-    context = state["context"]
+    """Generate an answer based on the selected context."""
+    context = state["selected_context"]
     question = state["question"]
 
     # Template for the AI to generate an answer
@@ -78,18 +106,21 @@ builder = StateGraph(State)
 # Add nodes for parallel execution
 builder.add_node("search_web", search_web)  # Node for web search
 builder.add_node("search_wikipedia", search_wikipedia)  # Node for Wikipedia search
+builder.add_node("select_context", select_context)  # Node to rank the results into the token budget
 builder.add_node("generate_answer", generate_answer)  # Node to generate an answer
 
 # Define the flow: 
-# Start the search processes in parallel, then direct both outputs to the answer generator
+# Start the search processes in parallel, then select the relevant passages of both outputs for the answer generator
 builder.add_edge(START, "search_wikipedia")
 builder.add_edge(START, "search_web")
-builder.add_edge("search_wikipedia", "generate_answer")
-builder.add_edge("search_web", "generate_answer")
+builder.add_edge("search_wikipedia", "select_context")
+builder.add_edge("search_web", "select_context")
+builder.add_edge("select_context", "generate_answer")
 builder.add_edge("generate_answer", END)
 
 # Compile the graph to create the parallel execution structure
 parallel_websearch_graph = builder.compile()
+parallel_websearch_graph = trace_graph(parallel_websearch_graph, "parallel_websearch_graph")
 
 # Use the utility function to save and optionally show the generated graph
 save_and_show_graph(parallel_websearch_graph, filename="Parallel_WebSearchGraph_image", show_image=False)
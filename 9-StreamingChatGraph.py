@@ -2,7 +2,7 @@ import asyncio
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import MessagesState, START, END, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from utils.bounded_checkpointer import BoundedMemorySaver
 
 from config.secret_keys import OPENAI_API_KEY
 
@@ -26,7 +26,7 @@ async def Assistant(state: MessagesState):
     return {'messages': response}
 
 # Initialize LangGraph components
-memory = MemorySaver()
+memory = BoundedMemorySaver(keep_checkpoints=10, max_threads=1000)
 builder = StateGraph(MessagesState)
 
 # Configure graph nodes and edges
@@ -0,0 +1,142 @@
+"""
+Paused threads and end-to-end latency with and without an ApprovalPolicy.
+
+Builds the graph of 6-BreakpointGraph.py (assistant -> tools with
+interrupt_before=["tools"], no arithmetic fast path so every prompt goes
+through the tools, the scripted LLM with one tool call per turn) and replays
+the same workload of THREADS conversations from USERS users, one arriving
+every ARRIVAL seconds (each conversation is its own thread, and the policy
+sees the user as the caller):
+  - 60% small arithmetic, e.g. "(12+7)*3"                -> approved by the rules
+  - 15% the user's recurring large product, "1500000*4"  -> a human once per user, then cached
+  - 15% the user's recurring division, "84/6"            -> a human once per user, then cached
+  - 10% one-off large sums                                -> always a human
+A single simulated reviewer approves whatever is pending, taking REVIEW_SECONDS
+per decision. Runs without a policy (every tool call pauses) and with the
+policy of 6-BreakpointGraph.py.
+
+Run from the project root:
+    python -m benchmarks.approval_policy
+"""
+import random
+import threading
+import time
+from datetime import datetime
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from utils.approval_policy import ApprovalPolicy
+from utils.approval_queue import ApprovalQueue
+
+THREADS = 200
+USERS = 10
+ARRIVAL = 0.01  # seconds between conversations
+LLM_LATENCY = 0.02  # seconds per call
+REVIEW_SECONDS = 0.05  # seconds the reviewer takes per decision
+
+
+def build_graph(namespace: dict):
+    builder = StateGraph(namespace["MessagesState"])
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile(interrupt_before=["tools"], checkpointer=MemorySaver())
+
+
+def workload(n: int, seed: int = 0) -> list:
+    """Returns (thread id, prompt) pairs, the thread id starting with the user."""
+    rng = random.Random(seed)
+    products = {user: f"1500000*{rng.randint(2, 5)}" for user in range(USERS)}
+    divisions = {user: f"{rng.choice([84, 96, 120])}/{rng.choice([4, 6])}" for user in range(USERS)}
+    conversations = []
+    for i in range(n):
+        user = rng.randrange(USERS)
+        kind = rng.random()
+        if kind < 0.6:
+            prompt = f"({rng.randint(1, 99)}+{rng.randint(1, 99)})*{rng.randint(2, 9)}"
+        elif kind < 0.75:
+            prompt = products[user]
+        elif kind < 0.9:
+            prompt = divisions[user]
+        else:
+            prompt = f"{rng.randint(2_000_000, 9_000_000)}+{rng.randint(1, 99)}"
+        conversations.append((f"u{user}-{i}", prompt))
+    return conversations
+
+
+def user_of(thread_id: str) -> str:
+    return thread_id.split("-")[0]
+
+
+def replay(graph, conversations: list, policy) -> dict:
+    queue = ApprovalQueue(graph, max_parallel=8, policy=policy, caller=user_of)
+    started = {}
+
+    def arrive():
+        for thread_id, prompt in conversations:
+            started[thread_id] = time.time()
+            queue.start(thread_id, {"messages": HumanMessage(content=prompt)})
+            time.sleep(ARRIVAL)
+
+    arrivals = threading.Thread(target=arrive)
+    wall = time.perf_counter()
+    arrivals.start()
+    decisions, paused_threads = 0, set()
+    # The reviewer: approves the oldest pending thread, one decision at a time
+    while arrivals.is_alive() or len(queue) or queue.stats()["running"]:
+        pending = queue.pending()
+        if not pending:
+            time.sleep(0.001)
+            continue
+        time.sleep(REVIEW_SECONDS)
+        queue.approve([pending[0].thread_id])
+        paused_threads.add(pending[0].thread_id)
+        decisions += 1
+    queue.close()
+    wall = time.perf_counter() - wall
+
+    latencies = sorted(
+        datetime.fromisoformat(graph.get_state({"configurable": {"thread_id": t}}).created_at).timestamp() - start
+        for t, start in started.items()
+    )
+    finished = sum(1 for t in started if queue.results[t]["messages"][-1].content.startswith("The result is"))
+    return {
+        "paused_threads": len(paused_threads),
+        "decisions": decisions,
+        "auto": queue.stats()["auto_approved"],
+        "p50": latencies[len(latencies) // 2],
+        "p90": latencies[int(len(latencies) * 0.9)],
+        "max": latencies[-1],
+        "wall": wall,
+        "finished": finished,
+    }
+
+
+def main():
+    namespace = run_script_startup("6-BreakpointGraph.py", include_stop=False)
+    namespace["llm_with_tools"] = ScriptedToolCallingLLM(latency=LLM_LATENCY, parallel_tool_calls=False)
+    rules = namespace["approval_policy"].rules
+    conversations = workload(THREADS)
+
+    print(f"{THREADS} conversations of {USERS} users ({ARRIVAL * 1000:.0f} ms apart), LLM {LLM_LATENCY * 1000:.0f} ms per call, "
+          f"reviewer {REVIEW_SECONDS * 1000:.0f} ms per decision\n")
+    print(f"{'policy':18} {'paused thr':>10} {'human dec':>10} {'auto':>6} {'p50 s':>7} {'p90 s':>7} "
+          f"{'max s':>7} {'wall s':>7} {'done':>5}")
+    for name, policy in (("none", None), ("rules", ApprovalPolicy(rules, max_cached=0)),
+                         ("rules + cache", ApprovalPolicy(rules))):
+        r = replay(build_graph(namespace), conversations, policy)
+        print(f"{name:18} {r['paused_threads']:>10} {r['decisions']:>10} {r['auto']:>6} {r['p50']:>7.2f} "
+              f"{r['p90']:>7.2f} {r['max']:>7.2f} {r['wall']:>7.2f} {r['finished']:>5}")
+        if policy is not None:
+            print(f"{'':18} decided by: {policy.stats()}")
+
+
+if __name__ == "__main__":
+    main()
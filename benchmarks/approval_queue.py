@@ -0,0 +1,103 @@
+"""
+Resuming many paused threads: one at a time vs ApprovalQueue with bounded parallelism.
+
+Builds the graph of 6-BreakpointGraph.py (assistant -> tools with
+interrupt_before=["tools"], a MemorySaver, and the scripted tool-calling LLM
+with LLM_LATENCY per call) and pauses THREADS threads at the tools breakpoint.
+Then every thread is approved:
+  - serial: graph.invoke(None, config) for one thread after the other (what the
+    script's input() loop amounts to)
+  - ApprovalQueue.approve(all pending) with max_parallel 8, 32 and 64
+It also times the reviewer side: listing the pending approvals of one tool,
+and rejecting a tenth of the threads in one call.
+
+Run from the project root:
+    python -m benchmarks.approval_queue
+"""
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from utils.approval_queue import ApprovalQueue
+
+THREADS = 500
+LLM_LATENCY = 0.02  # seconds per call
+PARALLEL = [8, 32, 64]
+
+
+def build_graph(namespace: dict):
+    builder = StateGraph(namespace["MessagesState"])
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile(interrupt_before=["tools"], checkpointer=MemorySaver())
+
+
+def prompt(i: int) -> str:
+    # The graph has no fast path, so the assistant answers this with one tool call (one breakpoint)
+    return f"{i % 9 + 1}*{i % 7 + 2}"
+
+
+def pause_all(queue: ApprovalQueue, prefix: str) -> list:
+    thread_ids = [f"{prefix}-{i}" for i in range(THREADS)]
+    for i, thread_id in enumerate(thread_ids):
+        queue.start(thread_id, {"messages": HumanMessage(content=prompt(i))})
+    queue.wait()
+    return thread_ids
+
+
+def main():
+    namespace = run_script_startup("6-BreakpointGraph.py", include_stop=False)
+    namespace["llm_with_tools"] = ScriptedToolCallingLLM(latency=LLM_LATENCY, parallel_tool_calls=True)
+
+    print(f"{THREADS} threads paused at the tools breakpoint, simulated LLM {LLM_LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'resume':22} {'seconds':>8} {'threads/s':>10} {'finished':>9}")
+
+    graph = build_graph(namespace)
+    queue = ApprovalQueue(graph, max_parallel=64)
+    thread_ids = pause_all(queue, "serial")
+    start = time.perf_counter()
+    finished = 0
+    for thread_id in thread_ids:
+        result = graph.invoke(None, {"configurable": {"thread_id": thread_id}})
+        finished += result["messages"][-1].content.startswith("The result is")
+    seconds = time.perf_counter() - start
+    print(f"{'serial invoke':22} {seconds:>8.2f} {THREADS / seconds:>10.0f} {finished:>9}")
+    queue.close()
+
+    for parallel in PARALLEL:
+        graph = build_graph(namespace)
+        queue = ApprovalQueue(graph, max_parallel=parallel)
+        pause_all(queue, f"queue-{parallel}")
+        start = time.perf_counter()
+        queue.approve([entry.thread_id for entry in queue.pending(node="tools")])
+        queue.wait()
+        seconds = time.perf_counter() - start
+        print(f"{f'ApprovalQueue x{parallel}':22} {seconds:>8.2f} {THREADS / seconds:>10.0f} "
+              f"{queue.stats()['finished']:>9}")
+        queue.close()
+
+    # Reviewer operations on a full queue
+    graph = build_graph(namespace)
+    queue = ApprovalQueue(graph, max_parallel=64)
+    thread_ids = pause_all(queue, "review")
+    start = time.perf_counter()
+    multiply = queue.pending(tool="multiply")
+    list_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    rejected = queue.reject(thread_ids[::10])
+    reject_ms = (time.perf_counter() - start) * 1000
+    print(f"\nlist pending multiply calls: {len(multiply)} threads in {list_ms:.2f} ms; "
+          f"reject {rejected} threads in {reject_ms:.0f} ms; {len(queue)} still pending")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
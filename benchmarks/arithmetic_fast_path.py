@@ -0,0 +1,74 @@
+"""
+LLM calls and wall time saved by the arithmetic fast path.
+
+Runs a corpus of prompts through 3-AgentGraph.py with and without the
+arithmetic_fast_path node. The LLM is replaced by a scripted fake with a fixed
+latency per call (see benchmarks/fake_llm.py), so no API key is needed.
+
+Run from the project root:
+    python -m benchmarks.arithmetic_fast_path
+"""
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph, START, MessagesState
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+
+LLM_LATENCY = 0.3  # seconds per simulated LLM call
+
+CORPUS = [
+    "7+3+4-2.",
+    "2*3*6",
+    "10/4+3",
+    "(5+3)*2-4",
+    "100-37",
+    "3*(4+5)/3",
+    "12 x 12",
+    "1+2+3+4+5+6",
+    "What can you help me with?",
+    "Multiply 2 and 3, then add 4.",
+]
+
+
+def build_baseline_graph(namespace: dict):
+    """The agent graph as it was before the fast path: START -> assistant."""
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile()
+
+
+def run_corpus(graph, llm) -> tuple:
+    llm.calls = 0
+    start = time.perf_counter()
+    answers = [graph.invoke({"messages": [HumanMessage(content=p)]})["messages"][-1].content for p in CORPUS]
+    return llm.calls, time.perf_counter() - start, answers
+
+
+def main():
+    namespace = run_script_startup("3-AgentGraph.py", include_stop=False)
+    llm = ScriptedToolCallingLLM(latency=LLM_LATENCY)
+    namespace["llm_with_tools"] = llm  # the assistant node looks this global up at call time
+
+    baseline_calls, baseline_time, baseline_answers = run_corpus(build_baseline_graph(namespace), llm)
+    fast_calls, fast_time, fast_answers = run_corpus(namespace["agent_graph"], llm)
+
+    print(f"{len(CORPUS)} prompts, {LLM_LATENCY}s simulated latency per LLM call\n")
+    print(f"{'prompt':32} {'baseline answer':24} {'fast path answer':24}")
+    for prompt, before, after in zip(CORPUS, baseline_answers, fast_answers):
+        print(f"{prompt:32} {before[:24]:24} {after[:24]:24}")
+
+    print(f"\n{'graph':20} {'LLM calls':>10} {'seconds':>9}")
+    print(f"{'without fast path':20} {baseline_calls:>10} {baseline_time:>9.2f}")
+    print(f"{'with fast path':20} {fast_calls:>10} {fast_time:>9.2f}")
+    print(f"\nSaved {baseline_calls - fast_calls} LLM calls and {baseline_time - fast_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
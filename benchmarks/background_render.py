@@ -0,0 +1,54 @@
+"""
+Time-to-first-response benchmark: blocking vs background graph rendering.
+
+Measures how long save_and_show_graph() keeps the interactive scripts from
+reaching their first input() prompt. Images are written to a temporary
+directory, so GraphImages/ is never touched.
+
+Run from the project root (set GRAPH_RENDERER=local when offline):
+    python -m benchmarks.background_render
+"""
+import os
+import time
+import tempfile
+
+from benchmarks.script_loader import load_script_graph
+from utils.graph_img_generation import save_and_show_graph, wait_for_pending_renders
+
+INTERACTIVE_SCRIPTS = [
+    "4-AgentGraph_withMemory.py",
+    "5-SummaryInputGraph.py",
+    "6-BreakpointGraph.py",
+    "7-EditBreakpointGraph.py",
+]
+
+
+def main():
+    graphs = {script_name: load_script_graph(script_name) for script_name in INTERACTIVE_SCRIPTS}
+    os.chdir(tempfile.mkdtemp(prefix="background_render_bench_"))
+
+    print(f"{'script':30} {'blocking (ms)':>14} {'background (ms)':>16} {'flush (ms)':>11}")
+    for script_name, graph in graphs.items():
+        filename = script_name.replace(".py", "")
+
+        start = time.perf_counter()
+        try:
+            save_and_show_graph(graph, filename, use_cache=False)
+            blocking = f"{(time.perf_counter() - start) * 1000:>14.2f}"
+        except Exception as e:
+            blocking = f"{'failed':>14}"
+            print(f"  blocking render failed: {type(e).__name__}")
+
+        start = time.perf_counter()
+        save_and_show_graph(graph, filename, use_cache=False, background=True)
+        background = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        wait_for_pending_renders()
+        flush = (time.perf_counter() - start) * 1000
+
+        print(f"{script_name:30} {blocking} {background:>16.2f} {flush:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
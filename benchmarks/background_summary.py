@@ -0,0 +1,122 @@
+"""
+Turn latency of 5-SummaryInputGraph.py with inline vs background summarization.
+
+Replays the "support" transcript of benchmarks.summary_trigger through the
+script's graph with a simulated LLM that sleeps
+LLM_BASE_LATENCY + prompt tokens * LLM_SECONDS_PER_TOKEN per call:
+  - inline: summarize_conversation runs inside the turn (the original graph)
+  - background: the turn ends with the reply and DeferredNodeRunner
+    summarizes afterwards
+The user waits THINK_TIME between turns (also with 0, the worst case for the
+background mode: the next turn starts while summarization is still running).
+
+Reports p50 / p90 / max turn latency (with 60 turns the max is the p99), the
+summarizations, and checks that no message was lost: every message sent is
+either still in the thread or was summarized.
+
+Run from the project root:
+    python -m benchmarks.background_summary
+"""
+import time
+import uuid
+import statistics
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from benchmarks.script_loader import run_script_startup
+from benchmarks.summary_trigger import transcript
+from utils.deferred_updates import DeferredNodeRunner
+from utils.token_counter import TokenCounter
+
+PROFILE = "support"
+LLM_BASE_LATENCY = 0.05  # seconds
+LLM_SECONDS_PER_TOKEN = 0.00002
+THINK_TIMES = [0.1, 0.0]
+
+
+class SleepingLLM:
+    """Stands in for the script's llm: sleeps like a real call and counts what it summarized."""
+
+    def __init__(self, chunk_prompt: str):
+        self.chunk_prompt = chunk_prompt
+        self.counter = TokenCounter()
+        self.summarized_ids = set()
+        self.summary_calls = 0
+
+    def invoke(self, messages, **kwargs):
+        time.sleep(LLM_BASE_LATENCY + self.counter.count_messages(messages) * LLM_SECONDS_PER_TOKEN)
+        if messages[-1].content == self.chunk_prompt:
+            self.summary_calls += 1
+            self.summarized_ids.update(m.id for m in messages[:-1])
+            return AIMessage(content="Summary: " + "the user and assistant discussed things " * 25,
+                             id=str(uuid.uuid4()))
+        return AIMessage(content="Here is what I found. " * 20, id=str(uuid.uuid4()))
+
+
+def build(namespace: dict, background: bool):
+    workflow = StateGraph(namespace["State"])
+    workflow.add_node("conversation", namespace["call_model"])
+    workflow.add_node(namespace["summarize_conversation"])
+    workflow.add_edge(START, "conversation")
+    if background:
+        workflow.add_edge("conversation", END)
+    else:
+        workflow.add_conditional_edges("conversation", namespace["should_continue"])
+    workflow.add_edge("summarize_conversation", END)
+    return workflow.compile(checkpointer=MemorySaver())
+
+
+def run(namespace: dict, background: bool, think_time: float) -> dict:
+    llm = namespace["llm"] = SleepingLLM(namespace["CHUNK_SUMMARY_PROMPT"])
+    namespace["token_counter"] = TokenCounter()
+    graph = build(namespace, background)
+    runner = None
+    if background:
+        runner = DeferredNodeRunner(graph, namespace["summarize_conversation"],
+                                    should_run=lambda s: namespace["should_continue"](s) == "summarize_conversation")
+
+    config = {"configurable": {"thread_id": "bench"}}
+    latencies, sent = [], 0
+    for message, _ in transcript(PROFILE):
+        start = time.perf_counter()
+        if runner:
+            runner.invoke({"messages": [HumanMessage(content=message)]}, config)
+        else:
+            graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+        latencies.append(time.perf_counter() - start)
+        sent += 2
+        time.sleep(think_time)
+    if runner:
+        runner.close()
+
+    messages = graph.get_state(config).values["messages"]
+    kept = {m.id for m in messages}
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p90": latencies[int(len(latencies) * 0.9)],
+        "max": latencies[-1],
+        "summaries": llm.summary_calls,
+        "lost": sent - len(kept | llm.summarized_ids),
+        "kept": len(messages),
+    }
+
+
+def main():
+    namespace = run_script_startup("5-SummaryInputGraph.py", include_stop=False)
+    print(f"'{PROFILE}' transcript, budget {namespace['SUMMARY_TOKEN_BUDGET']} tokens, "
+          f"simulated LLM {LLM_BASE_LATENCY * 1000:.0f} ms + {LLM_SECONDS_PER_TOKEN * 1000:.2f} ms per token\n")
+    print(f"{'mode':12} {'think s':>8} {'p50 ms':>8} {'p90 ms':>8} {'max ms':>8} "
+          f"{'summaries':>10} {'lost msgs':>10} {'kept msgs':>10}")
+    for think_time in THINK_TIMES:
+        for background in (False, True):
+            r = run(namespace, background, think_time)
+            mode = "background" if background else "inline"
+            print(f"{mode:12} {think_time:>8.1f} {r['p50'] * 1000:>8.0f} {r['p90'] * 1000:>8.0f} "
+                  f"{r['max'] * 1000:>8.0f} {r['summaries']:>10} {r['lost']:>10} {r['kept']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput of 1-SimpleGraph.py with the batch runner, 1 core vs all cores.
+
+SimpleGraph has no LLM or I/O, so the time per invocation is pure framework
+overhead plus two tiny node steps (node_1, then node_2 or node_3, picked by the
+decide_mood routing function). Calling the functions directly gives the
+baseline, and the difference is the per-step cost of LangGraph.
+
+Run from the project root:
+    python -m benchmarks.batch_throughput
+"""
+import os
+import io
+import time
+import random
+import functools
+import contextlib
+
+from benchmarks.script_loader import load_script_graph, run_script_startup
+from utils.batch_runner import run_batch
+from utils.text_channel import append_text
+
+N_STATES = 20_000
+SEED = 42
+STEPS_PER_RUN = 2  # node_1, then node_2 or node_3 (decide_mood only routes, it is not a step)
+
+simple_graph_factory = functools.partial(load_script_graph, "1-SimpleGraph.py")
+
+
+def run_direct(states: list) -> float:
+    """Calls the SimpleGraph node functions directly, without LangGraph. Returns seconds."""
+    namespace = run_script_startup("1-SimpleGraph.py", include_stop=False)
+    node_1, node_2, node_3 = namespace["node_1"], namespace["node_2"], namespace["node_3"]
+    decide_mood = namespace["decide_mood"]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, state in enumerate(states):
+            random.seed(f"{SEED}-{index}")
+            state = {"graph_state": append_text(state["graph_state"], node_1(state)["graph_state"])}
+            next_node = node_2 if decide_mood(state) == "node_2" else node_3
+            state = {"graph_state": append_text(state["graph_state"], next_node(state)["graph_state"])}
+    return time.perf_counter() - start
+
+
+def run_timed(states: list, processes: int):
+    start = time.perf_counter()
+    results = run_batch(simple_graph_factory, states, processes=processes, seed=SEED, quiet=True)
+    return results, time.perf_counter() - start
+
+
+def main():
+    states = [{"graph_state": f"Hi, this is user {i}."} for i in range(N_STATES)]
+    cores = os.cpu_count() or 1
+
+    direct = run_direct(states)
+    serial_results, serial = run_timed(states, processes=1)
+    parallel_results, parallel = run_timed(states, processes=cores)
+    assert serial_results == parallel_results, "seeded results must not depend on the number of processes"
+
+    print(f"{N_STATES} invocations of SimpleGraph")
+    print(f"{'mode':28} {'seconds':>9} {'invocations/s':>14}")
+    print(f"{'direct function calls':28} {direct:>9.3f} {N_STATES / direct:>14.0f}")
+    print(f"{'run_batch, 1 process':28} {serial:>9.3f} {N_STATES / serial:>14.0f}")
+    print(f"{f'run_batch, {cores} processes':28} {parallel:>9.3f} {N_STATES / parallel:>14.0f}")
+
+    overhead_us = (serial - direct) / (N_STATES * STEPS_PER_RUN) * 1e6
+    print(f"\nFramework overhead per step: {overhead_us:.1f} us")
+    print(f"Parallel speed-up on {cores} cores: {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Soak test: process memory of MemorySaver vs BoundedMemorySaver over many turns.
+
+Runs TURNS chat turns spread randomly over THREADS thread ids through a
+one-node chat graph (like 9-StreamingChatGraph.py, with an instant fake reply)
+and samples the process RSS every SAMPLE_EVERY turns. Every saver runs in its
+own subprocess so the RSS numbers do not influence each other. MemorySaver
+grows with every turn, so it only runs the first BASELINE_TURNS turns.
+
+Run from the project root:
+    python -m benchmarks.checkpointer_soak
+    python -m benchmarks.checkpointer_soak --turns 20000 --threads 2000   # quicker
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.script_loader import PROJECT_ROOT
+
+TURNS = 100_000
+THREADS = 10_000
+BASELINE_TURNS = 20_000
+SAMPLE_EVERY = 10_000
+
+REPLY = "Sure, here is a short answer that is about as long as a typical chat reply from the assistant. " * 2
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    import resource  # not Linux: peak RSS is the best we have
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_saver(name: str, spill_dir: str):
+    if name == "MemorySaver":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    from utils.bounded_checkpointer import BoundedMemorySaver
+    if name == "bounded":
+        return BoundedMemorySaver(keep_checkpoints=4, max_threads=1000)
+    # Spilled threads come back with their whole (growing) history, so also cap the bytes
+    return BoundedMemorySaver(keep_checkpoints=4, max_threads=1000, max_bytes=8 * 2**20, spill_dir=spill_dir)
+
+
+def soak(name: str, turns: int, threads: int):
+    """Runs in the subprocess: prints one JSON line per sample."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.graph import StateGraph, START, END, MessagesState
+
+    def assistant(state: MessagesState):
+        return {"messages": AIMessage(content=REPLY)}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", END)
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        saver = make_saver(name, spill_dir)
+        graph = builder.compile(checkpointer=saver)
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for turn in range(1, turns + 1):
+            config = {"configurable": {"thread_id": f"user-{rng.randrange(threads)}"}}
+            graph.invoke({"messages": [HumanMessage(content=f"Question number {turn}, what do you think?")]}, config)
+            if turn % SAMPLE_EVERY == 0 or turn == turns:
+                sample = {"turn": turn, "rss_mb": rss_mb(), "seconds": time.perf_counter() - start}
+                if hasattr(saver, "stats"):
+                    sample["stats"] = saver.stats()
+                print(json.dumps(sample), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=TURNS)
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--baseline-turns", type=int, default=BASELINE_TURNS)
+    parser.add_argument("--saver", help=argparse.SUPPRESS)  # internal: run one saver in this process
+    args = parser.parse_args()
+
+    if args.saver:
+        soak(args.saver, args.turns, args.threads)
+        return
+
+    print(f"{args.turns} turns over {args.threads} threads (MemorySaver: first {args.baseline_turns} turns)\n")
+    for name in ["MemorySaver", "bounded", "bounded + spill"]:
+        turns = min(args.turns, args.baseline_turns) if name == "MemorySaver" else args.turns
+        command = [sys.executable, "-m", "benchmarks.checkpointer_soak", "--saver", name,
+                   "--turns", str(turns), "--threads", str(args.threads)]
+        print(f"{name}:")
+        print(f"  {'turn':>7} {'RSS MB':>8} {'secs':>7}  saver stats")
+        process = subprocess.Popen(command, cwd=PROJECT_ROOT, stdout=subprocess.PIPE, text=True,
+                                   stderr=subprocess.DEVNULL, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+        for line in process.stdout:
+            sample = json.loads(line)
+            stats = sample.get("stats")
+            detail = ""
+            if stats:
+                detail = (f"threads {stats['threads']}, checkpoints {stats['checkpoints']}, "
+                          f"{stats['bytes'] / 2**20:.1f} MB stored, evicted {stats['evicted_threads']}, "
+                          f"restored {stats['restored_threads']}")
+            print(f"  {sample['turn']:>7} {sample['rss_mb']:>8.1f} {sample['seconds']:>7.1f}  {detail}")
+        process.wait()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Prompt tokens and answer latency of script 8 with the whole context vs ContextPacker.
+
+Runs QUESTIONS questions through the graph of 8-ParallelWebSearchGraph.py with
+fixture search results instead of the network: for every question two
+Wikipedia pages (truncated to `page_chars`, like WikipediaSearchClient) and
+three web results, one of which quotes a paragraph of the first page. Every
+page holds KEY_FACTS sentences about the question among paragraphs on other
+subjects. The fake LLM waits LLM_BASE_LATENCY + prompt tokens *
+LLM_SECONDS_PER_TOKEN, so the answer latency follows the prompt size.
+  - full context: the original generate_answer, all documents in the prompt
+  - packed: the graph of the script (select_context with its ContextPacker)
+for pages of 4,000 characters (the default) and 20,000 characters.
+Reported: prompt tokens of the answer call, key facts that made it into the
+prompt, time spent packing, and the latency per question.
+
+Run from the project root:
+    python -m benchmarks.context_packer
+"""
+import time
+import random
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.graph import StateGraph, START, END
+
+from benchmarks.script_loader import run_script_startup
+from utils.token_counter import load_encoder
+
+QUESTIONS = 10
+KEY_FACTS = 4  # per page
+PAGE_CHARS = [4000, 20000]
+LLM_BASE_LATENCY = 0.25  # seconds
+LLM_SECONDS_PER_TOKEN = 0.0001
+
+TOPICS = ["Chakra", "Vishnu", "Ganesha", "Shiva", "Lakshmi", "Hanuman", "Durga", "Krishna", "Brahma", "Kali",
+          "Garuda", "Indra"]
+OTHER_WORDS = ("river valley trade route harbour dynasty census railway festival monsoon textile museum "
+               "university parliament coastline province mineral export bridge cathedral orchestra league "
+               "election currency glacier forest vineyard airport ferry harvest lantern market").split()
+
+
+def filler_paragraph(rng: random.Random) -> str:
+    sentences = []
+    for _ in range(rng.randint(3, 6)):
+        words = rng.sample(OTHER_WORDS, rng.randint(8, 14))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def key_fact(topic: str, page: int, i: int) -> str:
+    return (f"Fact {page}-{i}: in hindu mythology {topic} is linked to the chakra of "
+            f"{OTHER_WORDS[(page * 7 + i) % len(OTHER_WORDS)]} and its devotees.")
+
+
+def fixture_pages(topic: str, page_chars: int, rng: random.Random) -> tuple:
+    """Two Wikipedia pages with KEY_FACTS facts each (the rest on other subjects) and their facts."""
+    pages, facts = [], []
+    for page in range(2):
+        page_facts = [key_fact(topic, page, i) for i in range(KEY_FACTS)]
+        paragraphs = [f"{topic} (page {page})"]
+        while sum(len(p) for p in paragraphs) < page_chars:
+            paragraphs.append(filler_paragraph(rng))
+        # The facts are spread over the truncated page
+        slots = rng.sample(range(1, len(paragraphs) - 1), KEY_FACTS)
+        for slot, fact in zip(sorted(slots), page_facts):
+            paragraphs[slot] = fact + " " + paragraphs[slot]
+        pages.append("\n\n".join(paragraphs)[:page_chars])
+        facts.extend(f for f in page_facts if f in pages[-1])
+    return pages, facts
+
+
+class FixtureSearch:
+    """Stand-in for both search clients, serving the fixture pages of the current question."""
+
+    def __init__(self, page_chars: int):
+        self.page_chars = page_chars
+        self.fixtures = {}
+        self.facts = {}
+
+    def _pages(self, query: str) -> list:
+        if query not in self.fixtures:
+            topic = query.split()[-1]
+            self.fixtures[query], self.facts[query] = fixture_pages(topic, self.page_chars, random.Random(query))
+        return self.fixtures[query]
+
+    def load(self, query: str, load_max_docs: int = 2) -> list:
+        return [Document(page_content=text, metadata={"source": f"https://en.wikipedia.org/wiki/{i}"})
+                for i, text in enumerate(self._pages(query)[:load_max_docs])]
+
+    def search(self, query: str, max_results: int = 3) -> list:
+        pages = self._pages(query)
+        rng = random.Random(query + "web")
+        quoted = pages[0].split("\n\n")[2]  # the web often quotes Wikipedia
+        contents = [quoted] + [filler_paragraph(rng) + " " + filler_paragraph(rng) for _ in range(max_results - 1)]
+        return [{"url": f"https://example.com/{i}", "content": c} for i, c in enumerate(contents)]
+
+
+class NoCache:
+    def get_or_fetch(self, source, question, fetch):
+        return fetch()
+
+
+class TimedLLM:
+    """Answers after a latency that grows with the prompt, and records the prompt."""
+
+    def __init__(self, count):
+        self.count = count
+        self.prompts = []
+
+    def invoke(self, messages):
+        text = "\n".join(m.content for m in messages)
+        self.prompts.append(text)
+        time.sleep(LLM_BASE_LATENCY + self.count(text) * LLM_SECONDS_PER_TOKEN)
+        return AIMessage(content="answer")
+
+
+def full_context_graph(namespace: dict):
+    """The graph before ContextPacker: every document goes into the answer prompt."""
+
+    def generate_answer(state):
+        answer_template = """Answer the question {question} using this context: {context}"""
+        answer_instructions = answer_template.format(question=state["question"], context=state["context"])
+        answer = namespace["llm"].invoke([SystemMessage(content=answer_instructions)]
+                                         + [HumanMessage(content="Answer the question.")])
+        return {"answer": answer}
+
+    builder = StateGraph(namespace["State"])
+    builder.add_node("search_web", namespace["search_web"])
+    builder.add_node("search_wikipedia", namespace["search_wikipedia"])
+    builder.add_node("generate_answer", generate_answer)
+    builder.add_edge(START, "search_wikipedia")
+    builder.add_edge(START, "search_web")
+    builder.add_edge("search_wikipedia", "generate_answer")
+    builder.add_edge("search_web", "generate_answer")
+    builder.add_edge("generate_answer", END)
+    return builder.compile()
+
+
+def run(graph, namespace: dict, search: FixtureSearch, count) -> dict:
+    llm = namespace["llm"] = TimedLLM(count)
+    packer = namespace["context_packer"]
+    pack_seconds, latencies, found, total = 0.0, [], 0, 0
+    for i in range(QUESTIONS):
+        question = f"Tell me about hindu mythology and {TOPICS[i % len(TOPICS)]}"
+        start = time.perf_counter()
+        result = graph.invoke({"question": question})
+        latencies.append(time.perf_counter() - start)
+        if "selected_context" in result:
+            pack_seconds += packer.last_stats["seconds"]
+        found += sum(1 for fact in search.facts[question] if fact in llm.prompts[-1])
+        total += len(search.facts[question])
+    return {"tokens": sum(count(p) for p in llm.prompts) / QUESTIONS, "facts": found / total,
+            "pack_ms": pack_seconds / QUESTIONS * 1000, "latency": sum(latencies) / QUESTIONS}
+
+
+def main():
+    namespace = run_script_startup("8-ParallelWebSearchGraph.py", include_stop=False)
+    namespace["retrieval_cache"] = NoCache()
+    count = load_encoder()
+    packer = namespace["context_packer"]
+
+    print(f"{QUESTIONS} questions, 2 Wikipedia pages + 3 web results each, context budget {packer.max_tokens} "
+          f"tokens, LLM {LLM_BASE_LATENCY * 1000:.0f} ms + {LLM_SECONDS_PER_TOKEN * 1e6:.0f} ms per 1k tokens\n")
+    print(f"{'page chars':>10} {'context':13} {'prompt tokens':>14} {'key facts':>10} {'pack ms':>8} "
+          f"{'latency ms':>11}")
+    for page_chars in PAGE_CHARS:
+        for name, make_graph in [("full", full_context_graph), ("packed", lambda ns: ns["builder"].compile())]:
+            search = FixtureSearch(page_chars)
+            namespace["tavily_search"] = namespace["wikipedia_search"] = search
+            r = run(make_graph(namespace), namespace, search, count)
+            print(f"{page_chars:>10} {name:13} {r['tokens']:>14.0f} {r['facts']:>10.0%} {r['pack_ms']:>8.1f} "
+                  f"{r['latency'] * 1000:>11.0f}")
+        print(f"{'':>10} last pack: {packer.last_stats}")
+
+
+if __name__ == "__main__":
+    main()
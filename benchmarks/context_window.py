@@ -0,0 +1,137 @@
+"""
+Prompt size and latency per turn on a 200-turn thread, full history vs ContextWindow.
+
+Replays a synthetic 200-turn thread (arithmetic turns with tool calls and
+chatty turns with long messages) through the assistant <-> tools loop of
+4-AgentGraph_withMemory.py with a MemorySaver, once with
+`[sys_msg] + state["messages"]` and once with the script's ContextWindow
+(with and without the per-message token cache).
+
+For every turn it reports the prompt tokens of the last LLM call, the time
+spent assembling the prompt, the measured turn time (the scripted LLM itself
+answers instantly) and a modelled LLM latency of
+LLM_BASE_LATENCY + prompt tokens * LLM_SECONDS_PER_TOKEN.
+
+Run from the project root:
+    python -m benchmarks.context_window
+"""
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, MessagesState
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from utils.context_window import ContextWindow
+from utils.token_counter import TokenCounter
+
+TURNS = 200
+BUDGET = 4000  # same as the scripts
+LLM_BASE_LATENCY = 0.25  # seconds
+LLM_SECONDS_PER_TOKEN = 0.0001
+REPORT_AT = [1, 25, 50, 100, 150, 200]
+
+FILLER = ("I am planning the budget for our team offsite and want to double check a few numbers "
+          "before I send the sheet to finance, so please keep the earlier results in mind. ") * 3
+
+
+def synthetic_turns() -> list:
+    prompts = []
+    for i in range(TURNS):
+        if i % 2 == 0:
+            prompts.append(f"({i % 7 + 1}+{i % 5 + 2})*({i % 3 + 1}+4)-{i % 9}")
+        else:
+            prompts.append(f"Turn {i}: {FILLER}")
+    return prompts
+
+
+class FullHistory:
+    """The scripts' original prompt: the system message plus every message of the thread."""
+
+    def build_prompt(self, system_message, messages):
+        return [system_message] + messages
+
+
+class Recorder:
+    """Wraps the scripted LLM and the prompt builder to measure every call."""
+
+    def __init__(self, window, counter: TokenCounter):
+        self.window = window
+        self.counter = counter
+        self.script = ScriptedToolCallingLLM(latency=0.0, parallel_tool_calls=True)
+        self.prompt_tokens = 0
+        self.assemble_seconds = 0.0
+
+    def build_prompt(self, system_message, messages):
+        start = time.perf_counter()
+        prompt = self.window.build_prompt(system_message, messages)
+        self.assemble_seconds += time.perf_counter() - start
+        return prompt
+
+    def invoke(self, messages):
+        self.prompt_tokens = self.counter.count_messages(messages)  # not timed
+        return self.script.invoke(messages)
+
+
+def run(namespace: dict, window) -> list:
+    recorder = Recorder(window, TokenCounter())
+    namespace["llm_with_tools"] = recorder
+    namespace["context_window"] = recorder
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    config = {"configurable": {"thread_id": "long-thread"}}
+    rows = []
+    for prompt in synthetic_turns():
+        recorder.assemble_seconds = 0.0
+        start = time.perf_counter()
+        graph.invoke({"messages": [HumanMessage(content=prompt)]}, config)
+        turn_seconds = time.perf_counter() - start
+        rows.append((recorder.prompt_tokens, recorder.assemble_seconds, turn_seconds))
+    return rows
+
+
+def main():
+    namespace = run_script_startup("4-AgentGraph_withMemory.py", include_stop=False)
+    counter = TokenCounter()
+    encoder = "tiktoken" if counter.encode.__module__ != "utils.token_counter" else "estimate (tiktoken encoding not available)"
+
+    variants = {
+        "full history": run(namespace, FullHistory()),
+        "window": run(namespace, ContextWindow(BUDGET)),
+        "window, no cache": run(namespace, ContextWindow(BUDGET, TokenCounter(max_cached=0))),
+    }
+
+    print(f"{TURNS} turns, budget {BUDGET} tokens, token counts: {encoder}")
+    print(f"modelled LLM latency: {LLM_BASE_LATENCY * 1000:.0f} ms + {LLM_SECONDS_PER_TOKEN * 1000:.1f} ms per prompt token\n")
+    header = f"{'turn':>5}"
+    for name in variants:
+        header += f" | {name + ' tokens':>24} {'asm ms':>7} {'turn ms':>8} {'LLM ms':>7}"
+    print(header)
+    for turn in REPORT_AT:
+        line = f"{turn:>5}"
+        for rows in variants.values():
+            tokens, assemble, turn_seconds = rows[turn - 1]
+            llm = LLM_BASE_LATENCY + tokens * LLM_SECONDS_PER_TOKEN
+            line += f" | {tokens:>24} {assemble * 1000:>7.2f} {turn_seconds * 1000:>8.1f} {llm * 1000:>7.0f}"
+        print(line)
+
+    print()
+    for name, rows in variants.items():
+        tokens = sum(r[0] for r in rows)
+        assemble = sum(r[1] for r in rows)
+        turns = sum(r[2] for r in rows)
+        llm = sum(LLM_BASE_LATENCY + r[0] * LLM_SECONDS_PER_TOKEN for r in rows)
+        print(f"{name:18} total prompt tokens {tokens:>9}  assemble {assemble:6.3f}s  turns {turns:6.2f}s  modelled LLM {llm:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
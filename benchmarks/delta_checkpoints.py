@@ -0,0 +1,161 @@
+"""
+Bytes written per turn and read latency with full vs delta-encoded checkpoints.
+
+Runs a TURNS-turn chat thread (like 10-MongoDBCheckpointer.py, with an instant
+fake reply) and counts the serialized bytes every checkpointer writes:
+  - MemorySaver: writes the messages blob whenever the list changes
+  - full-checkpoint layout: what MongoDBSaver writes, the whole checkpoint
+    (all channel values) per put; measured in memory
+  - the same two wrapped in DeltaCheckpointSaver
+When MONGO_URI is set (and the server answers), the real MongoDBSaver is
+measured too, in a throwaway database.
+
+Read latency is get_state() of the latest checkpoint, warm (rebuilt list
+cached) and cold (a fresh wrapper, so the deltas are replayed from storage).
+
+Run from the project root:
+    python -m benchmarks.delta_checkpoints
+"""
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import StateGraph, START, END, MessagesState
+
+from config.secret_keys import settings
+from utils.delta_checkpointer import DeltaCheckpointSaver
+
+TURNS = 100
+REPORT_AT = [1, 10, 50, 100]
+READS = 50
+
+REPLY = "Sure! Here is a reply of typical length, with a bit of detail so that it is not trivially short. " * 3
+
+
+class CountingSerializer(JsonPlusSerializer):
+    """Counts the bytes of everything serialized for storage."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_written = 0
+
+    def dumps_typed(self, obj):
+        type_, data = super().dumps_typed(obj)
+        self.bytes_written += len(data)
+        return type_, data
+
+
+class FullCheckpointLayout(MemorySaver):
+    """MemorySaver that also counts what a whole-checkpoint store such as MongoDBSaver writes per put."""
+
+    def __init__(self):
+        super().__init__()
+        self.counter = CountingSerializer()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.counter.dumps_typed(checkpoint)
+        self.counter.dumps_typed(metadata)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        for _, value in writes:
+            self.counter.dumps_typed(value)
+        return super().put_writes(config, writes, task_id, task_path)
+
+    @property
+    def bytes_written(self):
+        return self.counter.bytes_written
+
+
+class CountedMemorySaver(MemorySaver):
+    def __init__(self):
+        super().__init__(serde=CountingSerializer())
+
+    @property
+    def bytes_written(self):
+        return self.serde.bytes_written
+
+
+def build_graph(checkpointer):
+    def assistant(state: MessagesState):
+        return {"messages": AIMessage(content=REPLY)}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def mongo_savers():
+    """Returns [(name, saver factory, cleanup)] for a real MongoDB, or [] when none is configured."""
+    if not settings.MONGO_URI:
+        return []
+    from pymongo import MongoClient
+    from langgraph.checkpoint.mongodb import MongoDBSaver
+
+    client = MongoClient(settings.MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"MongoDB not reachable, skipping it: {e}\n")
+        return []
+    db_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+
+    def factory():
+        saver = MongoDBSaver(client, db_name=db_name)
+        saver.serde = CountingSerializer()  # MongoDBSaver serializes the whole checkpoint with it
+        return saver
+
+    return [("MongoDBSaver", factory, lambda: client.drop_database(db_name))]
+
+
+def measure(saver, delta: bool):
+    inner = saver
+    checkpointer = DeltaCheckpointSaver(inner) if delta else inner
+    graph = build_graph(checkpointer)
+    config = {"configurable": {"thread_id": f"thread-{uuid.uuid4().hex[:8]}"}}
+
+    def written():
+        return inner.bytes_written if hasattr(inner, "bytes_written") else inner.serde.bytes_written
+
+    per_turn = []
+    for turn in range(1, TURNS + 1):
+        before = written()
+        graph.invoke({"messages": [HumanMessage(content=f"Question {turn}: what do you think about it?")]}, config)
+        per_turn.append(written() - before)
+
+    start = time.perf_counter()
+    for _ in range(READS):
+        graph.get_state(config)
+    warm = (time.perf_counter() - start) / READS
+
+    start = time.perf_counter()
+    for _ in range(READS):
+        cold_graph = build_graph(DeltaCheckpointSaver(inner) if delta else inner)
+        cold_graph.get_state(config)
+    cold = (time.perf_counter() - start) / READS
+    return per_turn, warm, cold
+
+
+def main():
+    savers = [("MemorySaver", CountedMemorySaver, None), ("full-checkpoint layout", FullCheckpointLayout, None)]
+    savers += mongo_savers()
+
+    print(f"{TURNS}-turn chat thread, bytes written per turn (checkpoints + pending writes)\n")
+    header = f"{'saver':36}" + "".join(f" {'turn ' + str(t):>10}" for t in REPORT_AT)
+    print(header + f" {'total KB':>10} {'warm read ms':>13} {'cold read ms':>13}")
+    for name, factory, cleanup in savers:
+        for delta in (False, True):
+            per_turn, warm, cold = measure(factory(), delta)
+            label = f"{name} + delta" if delta else name
+            cells = "".join(f" {per_turn[t - 1]:>10}" for t in REPORT_AT)
+            print(f"{label:36}{cells} {sum(per_turn) / 1024:>10.0f} {warm * 1000:>13.2f} {cold * 1000:>13.2f}")
+        if cleanup:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Scripted stand-in for the tool-calling LLM used by the agent graphs.
+
+It behaves like gpt-4o-mini on the arithmetic prompts: with
+`parallel_tool_calls=False` one tool call per operation, with
+`parallel_tool_calls=True` every operation whose operands are known in one
+turn (so (1+2)*(3+4) takes two turns: both additions, then the
+multiplication), then a final answer. Every call has a fixed simulated
+latency. This lets the benchmarks count LLM round trips and wall time without
+an API key or network access.
+"""
+import ast
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.arithmetic_fast_path import OPERATOR_TOOLS, normalize_expression
+
+
+def plan_operations(text: str):
+    """
+    Returns the operations of an arithmetic prompt in evaluation order, or None.
+
+    Each operation is (tool name, a, b, level): a / b are the operand values and
+    level is 0 for operations on numbers of the prompt, else one more than the
+    highest level of the operations that compute its operands.
+    """
+    expression = normalize_expression(text)
+    if expression is None:
+        return None
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        return None
+
+    operations = []
+
+    def walk(node):
+        # Returns (value, level of the operation that computes it, -1 for a number)
+        if isinstance(node, ast.Constant):
+            return node.value, -1
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value, level = walk(node.operand)
+            return -value, level
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATOR_TOOLS:
+            (left, left_level), (right, right_level) = walk(node.left), walk(node.right)
+            name = OPERATOR_TOOLS[type(node.op)]
+            result = {"add": left + right, "subtract": left - right,
+                      "multiply": left * right, "divide": left / right}[name]
+            level = max(left_level, right_level) + 1
+            operations.append((name, left, right, level))
+            return result, level
+        raise ValueError("unsupported")
+
+    try:
+        result, _ = walk(tree.body)
+        return operations, result
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+class ScriptedToolCallingLLM:
+    """Fake `llm_with_tools` for the arithmetic agent graphs."""
+
+    def __init__(self, latency: float = 0.3, parallel_tool_calls: bool = False):
+        self.latency = latency
+        self.parallel_tool_calls = parallel_tool_calls
+        self.calls = 0
+
+    def invoke(self, messages: list) -> AIMessage:
+        self.calls += 1
+        time.sleep(self.latency)
+
+        # Work on the latest user turn only
+        last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        done = sum(1 for m in messages[last_human:] if isinstance(m, ToolMessage))
+        plan = plan_operations(messages[last_human].content)
+        if plan is None:
+            return AIMessage(content="Here is my answer in natural language.")
+
+        operations, result = plan
+        if done >= len(operations):
+            return AIMessage(content=f"The result is {result}.")
+
+        if self.parallel_tool_calls:
+            # Every operation whose operands are known: the next level, in one turn
+            by_level = sorted(operations, key=lambda op: op[3])
+            level = by_level[done][3]
+            calls = [(name, a, b) for name, a, b, op_level in by_level if op_level == level]
+        else:
+            name, a, b, _ = operations[done]
+            calls = [(name, a, b)]
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": name, "args": {"a": a, "b": b}, "id": f"call_{done + i}", "type": "tool_call"}
+                for i, (name, a, b) in enumerate(calls)
+            ],
+        )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    ScriptedToolCallingLLM as a real chat model, so callback handlers see the LLM
+    calls. The reported token usage is a rough estimate (4 characters per token).
+    """
+
+    script: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self.script.invoke(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 3 * len(messages)
+        completion_tokens = len(str(message.content)) // 4 + 10 * len(message.tool_calls) + 1
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
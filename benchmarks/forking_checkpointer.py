@@ -0,0 +1,109 @@
+"""
+Memory and latency of many forks of one long thread: full copies vs copy-on-write.
+
+Compiles the graph of 7-EditBreakpointGraph.py with each checkpointer, puts a
+thread of MESSAGES messages at the assistant breakpoint, and then forks it
+FORKS times from that checkpoint, each fork editing one message (same id, new
+content) with update_state(), like the edit step of the script or time travel.
+Reported per checkpointer:
+  - memory: traced allocations still alive after the forks (tracemalloc)
+  - update_state latency per fork (p50 / p90, separate run without tracemalloc)
+  - get_state of a fork
+For ForkingMemorySaver also the time to list the branches and diff two forks.
+
+Run from the project root:
+    python -m benchmarks.forking_checkpointer
+"""
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.script_loader import run_script_startup
+from utils.bounded_checkpointer import BoundedMemorySaver
+from utils.forking_checkpointer import ForkingMemorySaver
+
+MESSAGES = 500
+FORKS = 1000
+
+
+def history(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(content=f"message {i}: " + "some words " * 30,
+                                                          id=str(uuid.uuid4()))
+            for i in range(n)]
+
+
+def make_savers() -> list:
+    return [
+        ("MemorySaver", MemorySaver()),
+        ("BoundedMemorySaver", BoundedMemorySaver(keep_checkpoints=None, max_threads=None)),
+        ("ForkingMemorySaver", ForkingMemorySaver(keep_checkpoints=None, max_threads=None)),
+    ]
+
+
+def fork_many(graph, messages: list) -> tuple:
+    """Creates the thread and its forks. Returns (base config, fork configs, update_state seconds per fork)."""
+    config = {"configurable": {"thread_id": "long-thread"}}
+    base = graph.update_state(config, {"messages": messages}, as_node="tools")  # paused before the assistant
+    rng = random.Random(0)
+    forks, seconds = [], []
+    for i in range(FORKS):
+        target = messages[rng.randrange(len(messages))]
+        edit = type(target)(content=f"edited in fork {i}", id=target.id)
+        start = time.perf_counter()
+        forks.append(graph.update_state(base, {"messages": edit}))
+        seconds.append(time.perf_counter() - start)
+    return base, forks, sorted(seconds)
+
+
+def main():
+    namespace = run_script_startup("7-EditBreakpointGraph.py", include_stop=False)
+    builder = namespace["builder"]
+    messages = history(MESSAGES)
+
+    print(f"{FORKS} forks of a {MESSAGES}-message thread, each editing one message\n")
+    print(f"{'checkpointer':20} {'memory MB':>10} {'p50 ms':>8} {'p90 ms':>8} {'total s':>8} {'get_state ms':>13}")
+    for index, (name, _) in enumerate(make_savers()):
+        # Memory: a fresh saver, everything it still holds after the forks
+        saver = make_savers()[index][1]
+        graph = builder.compile(interrupt_before=["assistant"], checkpointer=saver)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        fork_many(graph, messages)
+        gc.collect()
+        memory_mb = (tracemalloc.get_traced_memory()[0] - before) / 1e6
+        tracemalloc.stop()
+        del graph, saver
+
+        # Latency: another fresh saver, not traced
+        saver = make_savers()[index][1]
+        graph = builder.compile(interrupt_before=["assistant"], checkpointer=saver)
+        _, forks, seconds = fork_many(graph, messages)
+        start = time.perf_counter()
+        for config in forks[:50]:
+            graph.get_state(config)
+        get_ms = (time.perf_counter() - start) / 50 * 1000
+        print(f"{name:20} {memory_mb:>10.1f} {seconds[len(seconds) // 2] * 1000:>8.2f} "
+              f"{seconds[int(len(seconds) * 0.9)] * 1000:>8.2f} {sum(seconds):>8.2f} {get_ms:>13.2f}")
+
+        if isinstance(saver, ForkingMemorySaver):
+            start = time.perf_counter()
+            branches = saver.branches("long-thread")
+            branches_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            diff = saver.diff(forks[0], forks[1])
+            diff_ms = (time.perf_counter() - start) * 1000
+            stats = saver.stats()
+            print(f"\nForkingMemorySaver: {len(branches)} branches listed in {branches_ms:.1f} ms; "
+                  f"diff of two forks in {diff_ms:.2f} ms ({diff.common} + {diff.common_tail} common messages, "
+                  f"{len(diff.only_a)} / {len(diff.only_b)} differing); "
+                  f"{stats['stored_messages']} messages stored, {stats['shared_messages']} shared")
+
+
+if __name__ == "__main__":
+    main()
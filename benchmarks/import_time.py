@@ -0,0 +1,128 @@
+"""
+Import-time profile of every entry script.
+
+Runs only the top-level import statements of each script in a fresh
+interpreter with `python -X importtime` and reports the cumulative import cost
+of the heavy packages. A package is charged to the first import that pulls it
+in, which is what a cold-starting batch job pays.
+
+Run from the project root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 2.5   # exit 1 if a script is slower
+"""
+import os
+import sys
+import ast
+import glob
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.script_loader import PROJECT_ROOT, ensure_dummy_keys
+
+TRACKED_PACKAGES = ["langchain_openai", "langchain_community", "langgraph", "config.secret_keys"]
+
+
+def entry_scripts() -> list:
+    """Returns the numbered entry scripts in the project root, in order."""
+    paths = glob.glob(os.path.join(PROJECT_ROOT, "[0-9]*-*.py"))
+    return sorted((os.path.basename(p) for p in paths), key=lambda name: int(name.split("-")[0]))
+
+
+def import_statements(script_name: str) -> str:
+    """Extracts the top-level import statements of a script as source code."""
+    with open(os.path.join(PROJECT_ROOT, script_name), "r") as f:
+        tree = ast.parse(f.read())
+    imports = [stmt for stmt in tree.body if isinstance(stmt, (ast.Import, ast.ImportFrom))]
+    return ast.unparse(ast.Module(body=imports, type_ignores=[]))
+
+
+def parse_importtime(stderr: str, packages: list = TRACKED_PACKAGES) -> dict:
+    """
+    Parses `-X importtime` output.
+
+    A package's cost is the cumulative time of its outermost modules (e.g.
+    langgraph.graph, langgraph.checkpoint.memory), so nested imports inside the
+    package are not counted twice.
+
+    Returns:
+        {"total": seconds, "<package>": cumulative seconds, ...}
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, raw_name = line.split(":", 1)[1].split("|")
+        depth = len(raw_name) - len(raw_name.lstrip())
+        entries.append((depth, raw_name.strip(), int(cumulative_us) / 1e6))
+
+    profile = {"total": 0.0}
+    min_depth = min((depth for depth, _, _ in entries), default=0)
+    ancestors = []  # (depth, packages matched by that ancestor)
+
+    # Children are printed before their parent, so walk backwards to see parents first
+    for depth, module, cumulative in reversed(entries):
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        if depth == min_depth:
+            profile["total"] += cumulative
+
+        matched = {pkg for pkg in packages if module == pkg or module.startswith(pkg + ".")}
+        inherited = set().union(*(pkgs for _, pkgs in ancestors)) if ancestors else set()
+        for pkg in matched - inherited:
+            profile[pkg] = profile.get(pkg, 0.0) + cumulative
+        ancestors.append((depth, matched | inherited))
+    return profile
+
+
+def profile_script(script_name: str) -> dict:
+    """Runs a script's imports under -X importtime and returns the parsed profile."""
+    ensure_dummy_keys()
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        # Includes `from config.secret_keys import ...`, so config side effects are measured too
+        f.write(import_statements(script_name) + "\n")
+        source_path = f.name
+    try:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", source_path],
+            cwd=PROJECT_ROOT,
+            env=dict(os.environ, PYTHONPATH=PROJECT_ROOT),
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.remove(source_path)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="*", help="scripts to profile (default: every entry script)")
+    parser.add_argument("--budget", type=float, help="fail if a script's imports take longer (seconds)")
+    args = parser.parse_args()
+
+    header = "".join(f"{name:>22}" for name in TRACKED_PACKAGES)
+    print(f"{'script':32} {'total (s)':>10}{header}")
+
+    over_budget = []
+    for script_name in args.scripts or entry_scripts():
+        profile = profile_script(script_name)
+        if "error" in profile:
+            print(f"{script_name:32} failed: {profile['error']}")
+            continue
+        columns = "".join(
+            f"{profile[name]:>22.3f}" if name in profile else f"{'-':>22}" for name in TRACKED_PACKAGES
+        )
+        print(f"{script_name:32} {profile['total']:>10.3f}{columns}")
+        if args.budget is not None and profile["total"] > args.budget:
+            over_budget.append(script_name)
+
+    if over_budget:
+        print(f"\nOver the {args.budget}s import budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Timing benchmark: local offline renderer vs draw_mermaid_png().
+
+Run from the project root:
+    python -m benchmarks.local_renderer
+"""
+import time
+import statistics
+
+from benchmarks.script_loader import GRAPH_SCRIPTS, load_script_graph
+from utils.graph_local_renderer import render_graph_png, render_graph_svg
+
+REPEATS = 20
+
+
+def time_call(func, repeats: int) -> float:
+    """Returns the median wall time of `func()` in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'script':32} {'local png':>10} {'local svg':>10} {'mermaid api':>12}  (median ms)")
+    for script_name in GRAPH_SCRIPTS:
+        graph = load_script_graph(script_name)
+
+        local_png = time_call(lambda: render_graph_png(graph), REPEATS)
+        local_svg = time_call(lambda: render_graph_svg(graph), REPEATS)
+
+        # The Mermaid path needs the external service, so only try it once per graph
+        try:
+            mermaid = f"{time_call(lambda: graph.get_graph().draw_mermaid_png(), 1):>12.1f}"
+        except Exception as e:
+            mermaid = f"{'failed':>12}"
+            print(f"  draw_mermaid_png() failed for {script_name}: {type(e).__name__}")
+
+        print(f"{script_name:32} {local_png:>10.2f} {local_svg:>10.2f} {mermaid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Evicting and appending messages: add_messages with RemoveMessage fan-out vs MessageWindow.
+
+For histories of 1k and 10k messages it times:
+  - reducer only: deleting all but the last 2 messages with one RemoveMessage
+    per message (add_messages, and the same updates on MessageWindow), with
+    TruncateBefore / KeepLast on MessageWindow, and appending one message
+  - one graph step (MemorySaver, like 5-SummaryInputGraph.py): a summarize
+    node that deletes all but the last 2 messages, and a node that appends
+    one message; the checkpoint write is included, so this is what a turn
+    costs end to end
+
+Run from the project root:
+    python -m benchmarks.message_window
+"""
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END, MessagesState
+from langgraph.graph.message import add_messages
+
+from utils.message_window import MessageWindow, KeepLast, TruncateBefore, WindowedMessages, add_to_window
+
+SIZES = [1_000, 10_000]
+REPEATS = 20
+
+
+class WindowState(MessagesState):
+    messages: WindowedMessages
+
+
+def history(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(content=f"message {i} " * 10, id=str(uuid.uuid4()))
+            for i in range(n)]
+
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    """Best time of `repeats` runs in ms (func gets a fresh setup each time)."""
+    best = float("inf")
+    for _ in range(repeats):
+        run = func()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def reducer_rows(n: int) -> list:
+    messages = history(n)
+    window = MessageWindow(messages)
+    fan_out = [RemoveMessage(id=m.id) for m in messages[:-2]]
+    new = [HumanMessage(content="one more", id=str(uuid.uuid4()))]
+    return [
+        ("evict, RemoveMessage fan-out", best_of(lambda: lambda: add_messages(messages, fan_out)),
+         best_of(lambda: lambda: add_to_window(window, fan_out))),
+        ("evict, TruncateBefore", None,
+         best_of(lambda: lambda: add_to_window(window, TruncateBefore(messages[-2].id)))),
+        ("evict, KeepLast(2)", None, best_of(lambda: lambda: add_to_window(window, KeepLast(2)))),
+        ("append 1 message", best_of(lambda: lambda: add_messages(messages, new)),
+         best_of(lambda: lambda: add_to_window(window, new))),
+    ]
+
+
+def graph_step(n: int, windowed: bool, evict: bool) -> float:
+    def summarize(state):
+        if windowed:
+            return {"messages": TruncateBefore(state["messages"][-2].id)}
+        return {"messages": [RemoveMessage(id=m.id) for m in state["messages"][:-2]]}
+
+    def reply(state):
+        return {"messages": AIMessage(content="one more reply")}
+
+    builder = StateGraph(WindowState if windowed else MessagesState)
+    builder.add_node("step", summarize if evict else reply)
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    messages = history(n)
+
+    def setup():
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        graph.update_state(config, {"messages": messages})  # not timed
+        return lambda: graph.invoke(None if evict else {"messages": [HumanMessage(content="hi")]}, config)
+
+    return best_of(setup, repeats=5)
+
+
+def main():
+    print("Reducer only (best of %d, ms)\n" % REPEATS)
+    print(f"{'history':>8} {'operation':34} {'add_messages':>13} {'MessageWindow':>14}")
+    for n in SIZES:
+        for name, baseline, window in reducer_rows(n):
+            baseline = f"{baseline:.3f}" if baseline is not None else "-"
+            print(f"{n:>8} {name:34} {baseline:>13} {window:>14.3f}")
+
+    print("\nOne graph step with MemorySaver (best of 5, ms)\n")
+    print(f"{'history':>8} {'step':34} {'add_messages':>13} {'MessageWindow':>14}")
+    for n in SIZES:
+        for name, evict in (("summarize (delete all but 2)", True), ("append 1 message", False)):
+            print(f"{n:>8} {name:34} {graph_step(n, False, evict):>13.2f} {graph_step(n, True, evict):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
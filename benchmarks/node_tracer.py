@@ -0,0 +1,81 @@
+"""
+Per-node report and overhead of NodeTracer.
+
+Runs arithmetic prompts through the assistant <-> tools loop of
+4-AgentGraph_withMemory.py (without the fast path, so every prompt reaches
+the assistant) on one long thread, with the scripted
+LLM wrapped as a chat model so the tracer sees the LLM calls and token usage.
+Prints the per-node totals and the time the tracer adds per node execution,
+with and without measuring the state size.
+
+Run from the project root:
+    python -m benchmarks.node_tracer
+"""
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, MessagesState
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedChatModel, ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from utils.node_tracer import NodeTracer
+
+ROUNDS = 20
+REPEATS = 3  # best of
+PROMPTS = ["7+3+4-2", "(5+3)*(2+4)", "(1+2)*(3+4)-(5+6)", "What did I ask first?"]
+
+
+def build_graph(namespace: dict):
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile(checkpointer=MemorySaver())
+
+
+def run(namespace: dict, tracer=None) -> float:
+    graph = build_graph(namespace)
+    if tracer is not None:
+        graph = tracer.attach(graph)
+    config = {"configurable": {"thread_id": "benchmark"}}
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for prompt in PROMPTS:
+            graph.invoke({"messages": [HumanMessage(content=prompt)]}, config)
+    return time.perf_counter() - start
+
+
+def main():
+    namespace = run_script_startup("4-AgentGraph_withMemory.py", include_stop=False)
+    script = ScriptedToolCallingLLM(latency=0.0, parallel_tool_calls=True)
+    namespace["llm_with_tools"] = ScriptedChatModel(script=script)
+
+    run(namespace)  # warm-up
+    baseline = min(run(namespace) for _ in range(REPEATS))
+    light_time = min(run(namespace, NodeTracer(measure_state=False)) for _ in range(REPEATS))
+    full_time = min(run(namespace, NodeTracer()) for _ in range(REPEATS))
+
+    # The report itself comes from one more traced run
+    tracer = NodeTracer()
+    run(namespace, tracer)
+
+    totals = tracer.totals()
+    executions = sum(t["executions"] for t in totals.values())
+    print(f"{ROUNDS * len(PROMPTS)} turns on one thread, {executions} node executions\n")
+    print(f"{'node':22} {'runs':>5} {'secs':>7} {'llm':>5} {'tools':>6} {'prompt tok':>11} {'compl tok':>10} {'avg state KB':>13}")
+    for node, t in sorted(totals.items()):
+        print(f"{node:22} {t['executions']:>5} {t['duration_seconds']:>7.3f} {t['llm_calls']:>5} {t['tool_calls']:>6} "
+              f"{t['prompt_tokens']:>11} {t['completion_tokens']:>10} {t['state_bytes'] / t['executions'] / 1024:>13.1f}")
+
+    print(f"\nno tracer:                {baseline:.2f}s")
+    print(f"tracer, no state size:    {light_time:.2f}s  (+{(light_time - baseline) / executions * 1e6:.0f} us per node)")
+    print(f"tracer with state size:   {full_time:.2f}s  (+{(full_time - baseline) / executions * 1e6:.0f} us per node)")
+    print("\n" + "\n".join(tracer.to_prometheus().splitlines()[:6]) + "\n...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+assistant <-> tools iterations with parallel_tool_calls=False vs True.
+
+Runs multi-operation prompts through the agent graph of 3-AgentGraph.py
+(without the arithmetic fast path, so every prompt reaches the LLM), with the
+same ToolNode on both sides:
+  - parallel_tool_calls=False: one LLM turn per operation
+  - parallel_tool_calls=True: the independent operations of each step in one
+    turn, which ToolNode runs concurrently
+The LLM is a scripted fake with a fixed latency per call, and every tool call
+sleeps TOOL_LATENCY to stand in for a real tool.
+
+Run from the project root:
+    python -m benchmarks.parallel_tool_calls
+"""
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph, START, MessagesState
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+
+LLM_LATENCY = 0.3  # seconds per simulated LLM call
+TOOL_LATENCY = 0.05  # seconds per tool call
+
+PROMPTS = [
+    "7+3+4-2",
+    "(5+3)*(2+4)",
+    "(1+2)*(3+4)-(5+6)",
+    "100/4/5+3*7",
+    "(2*3)+(4*5)+(6*7)+(8*9)",
+]
+
+
+def slow(tool):
+    def wrapper(a, b):
+        time.sleep(TOOL_LATENCY)
+        return tool(a, b)
+    wrapper.__name__, wrapper.__doc__ = tool.__name__, tool.__doc__
+    wrapper.__annotations__ = tool.__annotations__
+    return wrapper
+
+
+def build_graph(namespace: dict, tool_node):
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", tool_node)
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile()
+
+
+def run(graph, llm, prompt: str):
+    llm.calls = 0
+    start = time.perf_counter()
+    result = graph.invoke({"messages": [HumanMessage(content=prompt)]})
+    return llm.calls, time.perf_counter() - start, result["messages"][-1].content
+
+
+def main():
+    namespace = run_script_startup("3-AgentGraph.py", include_stop=False)
+    tools = [slow(t) for t in namespace["tools"]]
+    sequential_llm = ScriptedToolCallingLLM(latency=LLM_LATENCY, parallel_tool_calls=False)
+    parallel_llm = ScriptedToolCallingLLM(latency=LLM_LATENCY, parallel_tool_calls=True)
+
+    print(f"{LLM_LATENCY}s per LLM call, {TOOL_LATENCY}s per tool call\n")
+    print(f"{'prompt':28} {'sequential calls':>16} {'secs':>6} {'parallel calls':>14} {'secs':>6}  answer")
+    totals = [0, 0.0, 0, 0.0]
+    for prompt in PROMPTS:
+        namespace["llm_with_tools"] = sequential_llm
+        seq_calls, seq_time, seq_answer = run(build_graph(namespace, ToolNode(tools)), sequential_llm, prompt)
+        namespace["llm_with_tools"] = parallel_llm
+        par_calls, par_time, par_answer = run(build_graph(namespace, ToolNode(tools)), parallel_llm, prompt)
+        assert seq_answer == par_answer, (seq_answer, par_answer)
+
+        totals = [totals[0] + seq_calls, totals[1] + seq_time, totals[2] + par_calls, totals[3] + par_time]
+        print(f"{prompt:28} {seq_calls:>16} {seq_time:>6.2f} {par_calls:>14} {par_time:>6.2f}  {par_answer}")
+
+    print(f"{'total':28} {totals[0]:>16} {totals[1]:>6.2f} {totals[2]:>14} {totals[3]:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
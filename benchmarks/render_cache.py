@@ -0,0 +1,74 @@
+"""
+Cold vs warm start-up benchmark for the graph image render cache.
+
+Every measurement runs in a fresh interpreter, so import time is included just
+like a real worker restart. The children run inside a temporary directory, so
+the images in GraphImages/ are never touched.
+
+Run from the project root:
+    python -m benchmarks.render_cache
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+from benchmarks.script_loader import GRAPH_SCRIPTS, PROJECT_ROOT
+from utils.graph_img_generation import CACHE_MANIFEST
+
+CHILD_CODE = """
+import time, json
+start = time.perf_counter()
+from benchmarks.script_loader import run_script_startup
+from utils.graph_img_generation import get_render_cache_stats
+run_script_startup({script!r})
+print(json.dumps({{"seconds": time.perf_counter() - start, **get_render_cache_stats()}}))
+"""
+
+
+def measure_startup(script_name: str, work_dir: str) -> dict:
+    """Runs one script's start-up in a child process and returns its timing."""
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE.format(script=script_name)],
+        cwd=work_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="render_cache_bench_")
+    manifest_path = os.path.join(work_dir, CACHE_MANIFEST)
+
+    print(f"{'script':32} {'cold (s)':>10} {'warm (s)':>10} {'speed-up':>9}  cache")
+    for script_name in GRAPH_SCRIPTS:
+        # Cold: forget every fingerprint so the image has to be rendered again
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        cold = measure_startup(script_name, work_dir)
+
+        # Warm: same topology, the image on disk is reused
+        warm = measure_startup(script_name, work_dir)
+
+        if "error" in cold or "error" in warm:
+            print(f"{script_name:32} failed: {cold.get('error') or warm.get('error')}")
+            continue
+
+        speed_up = cold["seconds"] / warm["seconds"] if warm["seconds"] else float("inf")
+        print(
+            f"{script_name:32} {cold['seconds']:>10.3f} {warm['seconds']:>10.3f} {speed_up:>8.1f}x"
+            f"  miss={cold['misses']} hit={warm['hits']}"
+        )
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"\nTotal benchmark time: {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,139 @@
+"""
+Upstream searches and latency of repeated questions with and without RetrievalCache.
+
+Runs QUESTIONS questions through the graph of 8-ParallelWebSearchGraph.py
+(CONCURRENCY at a time, instant fake LLM) with stand-in search clients that
+take UPSTREAM_LATENCY per search. The questions are drawn from TOPICS topics
+with a Zipf distribution (a few topics are asked very often), each asked in
+one of three phrasings ("Tell me about X", "what is x?", "X").
+  - no cache: every question searches both sources
+  - cold cache: an empty cache file
+  - warm restart: a new RetrievalCache on the file of the cold run (like a restarted process)
+  - short TTL: results are fresh for STALE_TTL_RUN seconds only, stale ones are
+    served while they are refreshed in the background
+Reported: upstream searches (API quota), p50 / p95 latency per question and
+the cache metrics.
+
+Run from the project root:
+    python -m benchmarks.retrieval_cache
+"""
+import os
+import time
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from benchmarks.script_loader import run_script_startup
+from utils.retrieval_cache import RetrievalCache
+
+QUESTIONS = 600
+CONCURRENCY = 8
+TOPICS = 80
+UPSTREAM_LATENCY = 0.15  # seconds per search
+STALE_TTL_RUN = 0.5  # seconds results stay fresh in the short TTL run
+PHRASINGS = ["Tell me about {topic}", "what is {lower}?", "{topic}"]
+
+
+class SlowSearch:
+    """Stand-in for the Tavily and Wikipedia clients: fixed latency, counts the searches."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(UPSTREAM_LATENCY)
+
+    def search(self, query: str, max_results: int = 3) -> list:
+        self._wait()
+        return [{"url": f"https://example.com/{i}", "content": f"{query} result {i}. " * 30}
+                for i in range(max_results)]
+
+    def load(self, query: str, load_max_docs: int = 2) -> list:
+        self._wait()
+        return [Document(page_content=f"{query} page {i}. " * 200, metadata={"source": f"https://wiki/{i}"})
+                for i in range(load_max_docs)]
+
+
+class NoCache:
+    def get_or_fetch(self, source, question, fetch):
+        return fetch()
+
+    def stats(self):
+        return {}
+
+
+class InstantLLM:
+    def invoke(self, messages):
+        return AIMessage(content="answer")
+
+
+def workload(seed: int = 0) -> list:
+    rng = random.Random(seed)
+    topics = [f"Topic {i} Mythology" for i in range(TOPICS)]
+    weights = [1 / (rank + 1) for rank in range(TOPICS)]
+    questions = []
+    for topic in rng.choices(topics, weights=weights, k=QUESTIONS):
+        questions.append(rng.choice(PHRASINGS).format(topic=topic, lower=topic.lower()))
+    return questions
+
+
+def replay(namespace: dict, graph, cache, questions: list) -> dict:
+    search = SlowSearch()
+    namespace["tavily_search"] = namespace["wikipedia_search"] = search
+    namespace["retrieval_cache"] = cache
+
+    def ask(question: str) -> float:
+        start = time.perf_counter()
+        graph.invoke({"question": question})
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        latencies = sorted(pool.map(ask, questions))
+    seconds = time.perf_counter() - start
+    return {"search": search, "searches": search.calls, "p50": latencies[len(latencies) // 2],
+            "p95": latencies[int(len(latencies) * 0.95)], "seconds": seconds, "stats": cache.stats()}
+
+
+def main():
+    namespace = run_script_startup("8-ParallelWebSearchGraph.py", include_stop=False)
+    namespace["llm"] = InstantLLM()
+    graph = namespace["builder"].compile()
+    questions = workload()
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "search.sqlite")
+
+    print(f"{QUESTIONS} questions over {TOPICS} topics (Zipf, 3 phrasings), {CONCURRENCY} at a time, "
+          f"upstream {UPSTREAM_LATENCY * 1000:.0f} ms per search\n")
+    print(f"{'run':16} {'searches':>9} {'p50 ms':>8} {'p95 ms':>8} {'seconds':>8}  cache")
+
+    cold = RetrievalCache(path)
+    runs = [("no cache", lambda: NoCache()), ("cold cache", lambda: cold)]
+    for name, make in runs:
+        r = replay(namespace, graph, make(), questions)
+        print(f"{name:16} {r['searches']:>9} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f} {r['seconds']:>8.2f}  "
+              f"{r['stats']}")
+    cold.close()
+
+    warm = RetrievalCache(path)  # reopened, as after a restart
+    r = replay(namespace, graph, warm, workload(seed=1))
+    print(f"{'warm restart':16} {r['searches']:>9} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f} "
+          f"{r['seconds']:>8.2f}  {r['stats']}")
+    warm.close()
+
+    short = RetrievalCache(os.path.join(folder, "short.sqlite"), ttl=STALE_TTL_RUN, stale_ttl=3600)
+    r = replay(namespace, graph, short, questions)
+    short.close()  # waits for the background refreshes, so they are counted
+    print(f"{'short TTL':16} {r['search'].calls:>9} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f} "
+          f"{r['seconds']:>8.2f}  {short.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Summary tokens and summarization latency over a 2,000-turn session: one extended summary vs rolling levels.
+
+Replays TURNS turns of the "support" transcript of benchmarks.summary_trigger
+through the graph of 5-SummaryInputGraph.py (inline summarization, MemorySaver)
+with a scripted LLM:
+  - extend: the original summarize_conversation, which asks the LLM to extend
+    one summary string. The scripted LLM returns the old summary plus
+    EXTEND_GROWTH_WORDS new words, so the summary grows with the conversation
+  - rolling: the script's chunk summaries rolled up by level
+    (utils.rolling_summary); every summary the scripted LLM writes has
+    SUMMARY_WORDS words
+
+Summarization latency is modelled as
+LLM_BASE_LATENCY + prompt tokens * LLM_SECONDS_PER_TOKEN per LLM call.
+
+Run from the project root:
+    python -m benchmarks.rolling_summary
+"""
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+
+from benchmarks.script_loader import run_script_startup
+from benchmarks.summary_trigger import transcript
+from utils.token_counter import TokenCounter
+
+TURNS = 2000
+REPORT_AT = [250, 500, 1000, 2000]
+SUMMARY_WORDS = 150
+EXTEND_GROWTH_WORDS = 60
+LLM_BASE_LATENCY = 0.3  # seconds
+LLM_SECONDS_PER_TOKEN = 0.0001
+
+EXTEND_PROMPT = "Extend the summary by taking into account the new messages above:"
+CREATE_PROMPT = "Create a summary of the conversation above:"
+
+
+class ScriptedLLM:
+    """Stands in for the script's llm and records every summarization call."""
+
+    def __init__(self, namespace: dict):
+        self.counter = TokenCounter()
+        self.chunk_prompt = namespace["CHUNK_SUMMARY_PROMPT"]
+        self.rollup_prompt = namespace["ROLLUP_SUMMARY_PROMPT"]
+        self.calls = []  # (turn, prompt tokens, seconds) of every summarization call
+        self.turn = 0
+        self.summary_prompt_tokens = 0  # summary part of the last conversation prompt
+
+    def reply(self, text: str) -> AIMessage:
+        return AIMessage(content=text, id=str(uuid.uuid4()))
+
+    def invoke(self, messages, **kwargs):
+        last = messages[-1].content
+        if last.startswith((self.chunk_prompt, self.rollup_prompt, CREATE_PROMPT)) or last.endswith(EXTEND_PROMPT):
+            tokens = self.counter.count_messages(messages)
+            self.calls.append((self.turn, tokens, LLM_BASE_LATENCY + tokens * LLM_SECONDS_PER_TOKEN))
+            if last.endswith(EXTEND_PROMPT):
+                old = last.split("conversation to date: ", 1)[1].rsplit("\n\n", 1)[0]
+                return self.reply(old + " more" * EXTEND_GROWTH_WORDS)
+            return self.reply("summary" + " words" * SUMMARY_WORDS)
+
+        if isinstance(messages[0], SystemMessage):
+            self.summary_prompt_tokens = self.counter.encode(messages[0].content)
+        return self.reply("Here is what I found. " * 20)
+
+
+def extend_nodes(namespace: dict):
+    """The original call_model / summarize_conversation with one `summary` string (and the token count)."""
+    State, llm_holder, counter = namespace["State"], namespace, namespace["token_counter"]
+
+    class ExtendState(State):
+        summary: str
+
+    def call_model(state):
+        summary = state.get("summary", "")
+        messages = state["messages"]
+        if summary:
+            messages = [SystemMessage(content=f"Summary of conversation earlier: {summary}")] + messages
+        response = llm_holder["llm"].invoke(messages)
+        added = counter.count_messages(namespace["new_input_messages"](state["messages"]) + [response])
+        return {"messages": response, "message_tokens": added}
+
+    def summarize_conversation(state):
+        summary = state.get("summary", "")
+        if summary:
+            prompt = f"This is summary of the conversation to date: {summary}\n\n{EXTEND_PROMPT}"
+        else:
+            prompt = CREATE_PROMPT
+        response = llm_holder["llm"].invoke(state["messages"] + [HumanMessage(content=prompt)])
+        removed = counter.count_messages(state["messages"][:-2])
+        return {"summary": response.content, "messages": [RemoveMessage(id=m.id) for m in state["messages"][:-2]],
+                "message_tokens": -removed}
+
+    return ExtendState, call_model, summarize_conversation
+
+
+def run(namespace: dict, variant: str) -> dict:
+    llm = namespace["llm"] = ScriptedLLM(namespace)
+    namespace["token_counter"] = TokenCounter()
+    if variant == "extend":
+        state, call_model, summarize = extend_nodes(namespace)
+    else:
+        state, call_model, summarize = namespace["State"], namespace["call_model"], namespace["summarize_conversation"]
+
+    workflow = StateGraph(state)
+    workflow.add_node("conversation", call_model)
+    workflow.add_node("summarize_conversation", summarize)
+    workflow.add_edge(START, "conversation")
+    workflow.add_conditional_edges("conversation", namespace["should_continue"])
+    graph = workflow.compile(checkpointer=MemorySaver())
+
+    config = {"configurable": {"thread_id": variant}}
+    prompt_tokens_at = {}
+    for turn, (message, _) in enumerate(transcript("support", TURNS), start=1):
+        llm.turn = turn
+        graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+        if turn in REPORT_AT:
+            prompt_tokens_at[turn] = llm.summary_prompt_tokens
+
+    values = graph.get_state(config).values
+    if variant == "extend":
+        stored = llm.counter.encode(values.get("summary", ""))
+        levels = "1 string"
+    else:
+        stored = sum(llm.counter.encode(s["text"]) for s in values["summaries"])
+        levels = " ".join(str(s["level"]) for s in values["summaries"])
+    return {"calls": llm.calls, "prompt_tokens_at": prompt_tokens_at, "stored": stored, "levels": levels}
+
+
+def window(calls: list, turn: int) -> list:
+    """Summarization calls in the REPORT_AT window that ends at `turn`."""
+    start = max([t for t in REPORT_AT if t < turn], default=0)
+    return [c for c in calls if start < c[0] <= turn]
+
+
+def main():
+    namespace = run_script_startup("5-SummaryInputGraph.py", include_stop=False)
+    print(f"{TURNS} turns ('support' transcript), summarize over {namespace['SUMMARY_TOKEN_BUDGET']} tokens, "
+          f"fan-out {namespace['SUMMARY_FANOUT']}, modelled LLM {LLM_BASE_LATENCY * 1000:.0f} ms + "
+          f"{LLM_SECONDS_PER_TOKEN * 1000:.1f} ms per token\n")
+    results = {variant: run(namespace, variant) for variant in ("extend", "rolling")}
+
+    print(f"{'variant':8} {'turns':>11} {'LLM calls':>10} {'avg tokens':>11} {'max tokens':>11} "
+          f"{'latency s':>10} {'summary in prompt':>18}")
+    for variant, r in results.items():
+        for turn in REPORT_AT:
+            calls = window(r["calls"], turn)
+            start = max([t for t in REPORT_AT if t < turn], default=0)
+            avg = sum(c[1] for c in calls) / len(calls) if calls else 0
+            print(f"{variant:8} {f'{start + 1}-{turn}':>11} {len(calls):>10} {avg:>11.0f} "
+                  f"{max((c[1] for c in calls), default=0):>11} {sum(c[2] for c in calls):>10.1f} "
+                  f"{r['prompt_tokens_at'][turn]:>18}")
+    print()
+    for variant, r in results.items():
+        total = sum(c[1] for c in r["calls"])
+        seconds = sum(c[2] for c in r["calls"])
+        print(f"{variant:8} summarization calls {len(r['calls']):>4}  tokens {total:>8}  "
+              f"modelled latency {seconds:6.1f}s  stored summary {r['stored']:>6} tokens  levels: {r['levels']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Helpers to run the start-up part of the numbered example scripts.
+
+The example scripts build their graph at import time and then go straight into
+an input() loop or an LLM call. For benchmarking we only want the start-up part,
+so we execute the top-level statements up to (and including) the
+save_and_show_graph(...) call and stop there.
+"""
+import os
+import ast
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Scripts 1 to 8 all build a graph and render it at start-up
+GRAPH_SCRIPTS = [
+    "1-SimpleGraph.py",
+    "2-ToolGraph.py",
+    "3-AgentGraph.py",
+    "4-AgentGraph_withMemory.py",
+    "5-SummaryInputGraph.py",
+    "6-BreakpointGraph.py",
+    "7-EditBreakpointGraph.py",
+    "8-ParallelWebSearchGraph.py",
+]
+
+
+def ensure_dummy_keys():
+    """Sets placeholder API keys so config.secret_keys can be imported offline."""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+    os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark-placeholder")
+
+
+def _is_call_to(stmt, func_name: str) -> bool:
+    return (
+        isinstance(stmt, ast.Expr)
+        and isinstance(stmt.value, ast.Call)
+        and getattr(stmt.value.func, "id", None) == func_name
+    )
+
+
+def run_script_startup(script_name: str, stop_at: str = "save_and_show_graph", include_stop: bool = True) -> dict:
+    """
+    Executes a script's top-level statements up to the first call to `stop_at`.
+
+    Args:
+        script_name: File name of the script inside the project root.
+        stop_at: Name of the function call that marks the end of start-up.
+        include_stop: Whether the `stop_at` call itself is executed.
+
+    Returns:
+        The module namespace after start-up (graph objects, tools, nodes...).
+    """
+    ensure_dummy_keys()
+    path = os.path.join(PROJECT_ROOT, script_name)
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    body = []
+    for stmt in tree.body:
+        if _is_call_to(stmt, stop_at):
+            if include_stop:
+                body.append(stmt)
+            break
+        body.append(stmt)
+    else:
+        raise ValueError(f"{script_name} never calls {stop_at}()")
+
+    namespace = {"__name__": "__benchmark__", "__file__": path}
+    code = compile(ast.Module(body=body, type_ignores=[]), path, "exec")
+    exec(code, namespace)
+    return namespace
+
+
+def load_script_graph(script_name: str):
+    """Builds a script's compiled graph without rendering or running it."""
+    from langgraph.graph.state import CompiledStateGraph
+
+    namespace = run_script_startup(script_name, include_stop=False)
+    graphs = [value for value in namespace.values() if isinstance(value, CompiledStateGraph)]
+    return graphs[-1]
@@ -0,0 +1,182 @@
+"""
+Load test of the search nodes against a local stub server: new connections vs pooled clients.
+
+Starts a stub HTTP/1.1 server (keep-alive, STUB_LATENCY per request) that
+answers like the Tavily search API and the Wikipedia API, and runs QUESTIONS
+questions through the graph of 8-ParallelWebSearchGraph.py (generate_answer
+uses an instant fake LLM) with CONCURRENCY questions at a time:
+  - per request: a new connection for every request, and one search plus
+    3 requests per page for Wikipedia, like TavilySearchResults and the
+    `wikipedia` package behind WikipediaLoader
+  - pooled: the same requests over a shared PooledSession
+  - pooled + batched: the clients of utils/search_clients.py (the info of all
+    pages in one request, then one continuation request per page extract)
+Reported: questions per second, p50 / p95 latency per question, HTTP requests
+and TCP connections the server saw. The stub is plain HTTP on localhost, so
+this leaves out the TLS handshakes and network round trips a new connection
+costs against the real APIs.
+
+Run from the project root:
+    python -m benchmarks.search_clients
+"""
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from benchmarks.script_loader import run_script_startup
+from utils.search_clients import PooledSession, TavilySearchClient, WikipediaSearchClient
+
+QUESTIONS = 400
+CONCURRENCY = 16
+STUB_LATENCY = 0.005  # seconds per request
+PAGE_TEXT = "Lorem ipsum dolor sit amet. " * 150
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    stats = {"requests": 0, "connections": 0}
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            self.stats["connections"] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, data: dict):
+        time.sleep(STUB_LATENCY)
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.lock:
+            self.stats["requests"] += 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._send({"results": [{"title": f"Result {i}", "url": f"https://example.com/{i}",
+                                 "content": f"{request['query']} result {i}. " * 20, "score": 0.9}
+                                for i in range(request["max_results"])]})
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        if params.get("list") == "search":
+            self._send({"query": {"search": [{"title": f"Page {i}"} for i in range(int(params["srlimit"]))]}})
+        else:
+            # Like TextExtracts: only one whole-page extract per request, the next one via excontinue
+            titles = params["titles"].split("|")
+            extracts = "extracts" in params.get("prop", "")
+            whole = extracts and "exintro" not in params
+            offset = int(params.get("excontinue", 0))
+            pages = {}
+            for i, t in enumerate(titles):
+                pages[str(i)] = {"title": t, "fullurl": f"https://en.wikipedia.org/wiki/{t}"}
+                if extracts and (not whole or i == offset):
+                    pages[str(i)]["extract"] = f"{t}\n\n{PAGE_TEXT}"
+            response = {"query": {"pages": pages}}
+            if whole and offset + 1 < len(titles):
+                response["continue"] = {"excontinue": str(offset + 1), "continue": "||info|pageprops"}
+            self._send(response)
+
+
+class NewConnectionSession:
+    """Like requests.post / requests.get: a new connection for every request."""
+
+    timeout = 20.0
+
+    def request_json(self, method: str, url: str, **kwargs) -> dict:
+        response = requests.request(method, url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+class PerPageWikipediaClient(WikipediaSearchClient):
+    """The request pattern of WikipediaLoader: a search, then page info, summary and content per page."""
+
+    def load(self, query: str, load_max_docs: int = 2, doc_content_chars_max: int = 4000) -> list:
+        hits = self.http.request_json("GET", self.api_url, params={
+            "action": "query", "list": "search", "srsearch": query, "srlimit": load_max_docs, "format": "json"})
+        documents = []
+        for hit in hits["query"]["search"]:
+            pages = [self.http.request_json("GET", self.api_url, params={
+                "action": "query", "prop": prop, "titles": hit["title"], "format": "json"})
+                for prop in ("info", "extracts", "extracts")]  # page info, summary, content
+            page = next(iter(pages[2]["query"]["pages"].values()))
+            documents.append(Document(page_content=page["extract"][:doc_content_chars_max],
+                                      metadata={"title": hit["title"], "source": page["fullurl"]}))
+        return documents
+
+
+class NoCache:
+    """Every search goes to the clients (the retrieval cache would hide them)."""
+
+    def get_or_fetch(self, source, question, fetch):
+        return fetch()
+
+
+class InstantLLM:
+    def invoke(self, messages):
+        return AIMessage(content="answer")
+
+
+def run_load(graph) -> dict:
+    def ask(i: int) -> float:
+        start = time.perf_counter()
+        graph.invoke({"question": f"Question number {i} about hindu mythology"})
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        ask(-1)  # warm up
+        start = time.perf_counter()
+        latencies = sorted(pool.map(ask, range(QUESTIONS)))
+        seconds = time.perf_counter() - start
+    return {"qps": QUESTIONS / seconds, "p50": latencies[len(latencies) // 2],
+            "p95": latencies[int(len(latencies) * 0.95)]}
+
+
+def main():
+    ThreadingHTTPServer.request_queue_size = 256  # new connections per request overflow the default backlog of 5
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    namespace = run_script_startup("8-ParallelWebSearchGraph.py", include_stop=False)
+    namespace["llm"] = InstantLLM()
+    namespace["retrieval_cache"] = NoCache()
+    graph = namespace["builder"].compile()
+
+    pooled = PooledSession(pool_size=32, max_concurrency=CONCURRENCY * 2)
+    setups = [
+        ("per request", NewConnectionSession(), PerPageWikipediaClient),
+        ("pooled", pooled, PerPageWikipediaClient),
+        ("pooled + batched", pooled, WikipediaSearchClient),
+    ]
+
+    print(f"{QUESTIONS} questions, {CONCURRENCY} at a time, stub server {STUB_LATENCY * 1000:.0f} ms per request\n")
+    print(f"{'clients':18} {'questions/s':>12} {'p50 ms':>8} {'p95 ms':>8} {'requests':>9} {'connections':>12}")
+    for name, http, wikipedia_client in setups:
+        namespace["tavily_search"] = TavilySearchClient(http, "tvly-stub", base_url=base_url)
+        namespace["wikipedia_search"] = wikipedia_client(http, base_url=f"{base_url}/w/api.php")
+        before = dict(StubHandler.stats)
+        result = run_load(graph)
+        requests_made = StubHandler.stats["requests"] - before["requests"]
+        connections = StubHandler.stats["connections"] - before["connections"]
+        print(f"{name:18} {result['qps']:>12.1f} {result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} "
+              f"{requests_made:>9} {connections:>12}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
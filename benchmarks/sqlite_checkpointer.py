@@ -0,0 +1,205 @@
+"""
+Checkpoint throughput and restart recovery of SQLiteWALSaver vs MemorySaver (and MongoDBSaver).
+
+Throughput: WORKERS Python threads each run TURNS chat turns on their own
+thread id through a one-node chat graph (instant fake reply), and every put()
+is counted. The same threads then call put() directly RAW_PUTS times each
+(no graph), which shows the storage cost alone. SQLiteWALSaver runs with
+group commit and without it (max_batch=1, one write per transaction), both
+with synchronous=FULL.
+
+Recovery: a subprocess writes RECOVERY_TURNS turns and is killed (os._exit,
+so nothing is flushed or closed). A new saver is then opened on the same file
+and the state of every thread is read back. MemorySaver loses everything.
+
+When MONGO_URI is set (and the server answers), MongoDBSaver is measured too,
+in a throwaway database.
+
+Run from the project root:
+    python -m benchmarks.sqlite_checkpointer
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+import threading
+import subprocess
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END, MessagesState
+
+from benchmarks.script_loader import PROJECT_ROOT
+from config.secret_keys import settings
+from utils.sqlite_checkpointer import SQLiteWALSaver
+
+WORKERS = 8
+TURNS = 50
+RAW_PUTS = 200
+RECOVERY_THREADS = 50
+RECOVERY_TURNS = 20
+
+REPLY = "Sure, here is a short answer that is about as long as a typical chat reply from the assistant. " * 2
+
+
+def build_graph(checkpointer):
+    def assistant(state: MessagesState):
+        return {"messages": AIMessage(content=REPLY)}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_edge(START, "assistant")
+    builder.add_edge("assistant", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def mongo_factory():
+    """Returns (saver factory, cleanup) for a real MongoDB, or None when none is configured."""
+    if not settings.MONGO_URI:
+        return None
+    from pymongo import MongoClient
+    from langgraph.checkpoint.mongodb import MongoDBSaver
+
+    client = MongoClient(settings.MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"MongoDB not reachable, skipping it: {e}\n")
+        return None
+    db_name = f"benchmark_{uuid.uuid4().hex[:8]}"
+    return (lambda: MongoDBSaver(MongoClient(settings.MONGO_URI), db_name=db_name),
+            lambda: client.drop_database(db_name))
+
+
+def throughput(saver) -> tuple:
+    """Returns (checkpoints per second, puts) for WORKERS threads running TURNS turns each."""
+    graph = build_graph(saver)
+    puts = [0]
+    put = saver.put
+
+    def counted_put(*args, **kwargs):
+        puts[0] += 1
+        return put(*args, **kwargs)
+
+    saver.put = counted_put
+
+    def worker(i):
+        config = {"configurable": {"thread_id": f"worker-{i}-{uuid.uuid4().hex[:6]}"}}
+        for turn in range(TURNS):
+            graph.invoke({"messages": [HumanMessage(content=f"Question number {turn}, what do you think?")]}, config)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(WORKERS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return puts[0] / (time.perf_counter() - start), puts[0]
+
+
+def raw_puts(saver) -> float:
+    """Returns checkpoints per second for WORKERS threads calling put() RAW_PUTS times each."""
+    def worker(i):
+        config = {"configurable": {"thread_id": f"raw-{i}-{uuid.uuid4().hex[:6]}", "checkpoint_ns": ""}}
+        version = None
+        for step in range(RAW_PUTS):
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"messages": REPLY}
+            checkpoint["channel_versions"] = {"messages": version}
+            config = saver.put(config, checkpoint, {"step": step}, {"messages": version})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(WORKERS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return WORKERS * RAW_PUTS / (time.perf_counter() - start)
+
+
+def crash_writer(path: str):
+    """Runs in the subprocess: writes the turns, then dies without closing anything."""
+    graph = build_graph(SQLiteWALSaver(path))
+    for thread in range(RECOVERY_THREADS):
+        config = {"configurable": {"thread_id": f"user-{thread}"}}
+        for turn in range(RECOVERY_TURNS):
+            graph.invoke({"messages": [HumanMessage(content=f"Question number {turn}, what do you think?")]}, config)
+    os._exit(0)
+
+
+def recover(open_saver) -> tuple:
+    """Returns (seconds to open, seconds to read every thread, threads with all their messages)."""
+    start = time.perf_counter()
+    saver = open_saver()
+    opened = time.perf_counter() - start
+    graph = build_graph(saver)
+    complete = 0
+    start = time.perf_counter()
+    for thread in range(RECOVERY_THREADS):
+        state = graph.get_state({"configurable": {"thread_id": f"user-{thread}"}})
+        complete += len(state.values.get("messages", [])) == 2 * RECOVERY_TURNS
+    return opened, time.perf_counter() - start, complete
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crash-writer", help=argparse.SUPPRESS)  # internal: write to this file and die
+    args = parser.parse_args()
+    if args.crash_writer:
+        crash_writer(args.crash_writer)
+        return
+
+    mongo = mongo_factory()
+    with tempfile.TemporaryDirectory() as tmp:
+        savers = [
+            ("MemorySaver", MemorySaver),
+            ("SQLiteWALSaver, group commit", lambda: SQLiteWALSaver(os.path.join(tmp, "group.db"))),
+            ("SQLiteWALSaver, no group commit",
+             lambda: SQLiteWALSaver(os.path.join(tmp, "single.db"), max_batch=1)),
+        ]
+        if mongo:
+            savers.append(("MongoDBSaver", mongo[0]))
+
+        print(f"Throughput: {WORKERS} threads x {TURNS} turns\n")
+        print(f"{'saver':34} {'checkpoints':>12} {'graph /s':>9} {'transactions':>13} {'raw put /s':>11}")
+        for name, factory in savers:
+            saver = factory()
+            rate, puts = throughput(saver)
+            commits = saver.commits if isinstance(saver, SQLiteWALSaver) else "-"
+            raw = raw_puts(saver)
+            print(f"{name:34} {puts:>12} {rate:>9.0f} {commits:>13} {raw:>11.0f}")
+            if isinstance(saver, SQLiteWALSaver):
+                saver.close()
+
+        print(f"\nRecovery after a crash: {RECOVERY_THREADS} threads x {RECOVERY_TURNS} turns\n")
+        path = os.path.join(tmp, "crash.db")
+        subprocess.run([sys.executable, "-m", "benchmarks.sqlite_checkpointer", "--crash-writer", path],
+                       cwd=PROJECT_ROOT, check=True, stderr=subprocess.DEVNULL,
+                       env={**os.environ, "PYTHONWARNINGS": "ignore"})
+        wal = os.path.getsize(path + "-wal") if os.path.exists(path + "-wal") else 0
+        print(f"database {os.path.getsize(path) / 1024:.0f} KB, unflushed WAL {wal / 1024:.0f} KB\n")
+        print(f"{'saver':34} {'open ms':>9} {'read all ms':>12} {'complete threads':>17}")
+        rows = [("MemorySaver", MemorySaver), ("SQLiteWALSaver", lambda: SQLiteWALSaver(path))]
+        if mongo:
+            # The throughput run used other thread ids; write the same threads first (Mongo has no crash to recover)
+            saver = mongo[0]()
+            graph = build_graph(saver)
+            for thread in range(RECOVERY_THREADS):
+                config = {"configurable": {"thread_id": f"user-{thread}"}}
+                for turn in range(RECOVERY_TURNS):
+                    graph.invoke({"messages": [HumanMessage(content=f"Question {turn}")]}, config)
+            rows.append(("MongoDBSaver (reconnect)", mongo[0]))
+        for name, open_saver in rows:
+            opened, read, complete = recover(open_saver)
+            print(f"{name:34} {opened * 1000:>9.1f} {read * 1000:>12.1f} {complete:>11}/{RECOVERY_THREADS}")
+
+    if mongo:
+        mongo[1]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Bytes on the wire and server CPU per event: full-value streaming vs state diffs.
+
+Builds the graph of 6-BreakpointGraph.py (no arithmetic fast path, scripted
+tool-calling LLM), fills a thread with HISTORY messages and serves it with
+StateStreamServer. For SUBSCRIBERS clients subscribed with ?mode=values (the
+whole message list after every step, like stream_mode="values") and then with
+the default diff mode, it runs one turn: the user message, the assistant's
+tool calls, the interrupt before the tools, the resume, the tool results and
+the final answer. Reported:
+  - bytes each subscriber received for the turn (after its snapshot) and per event
+  - server CPU per event: encoding it once, and writing it to every subscriber
+  - time from starting the turn until every subscriber got the end event
+
+Run from the project root:
+    python -m benchmarks.state_stream
+"""
+import json
+import time
+import uuid
+import asyncio
+import urllib.request
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from utils.state_stream import StateStreamServer
+
+HISTORY = 200
+SUBSCRIBERS = [100, 2000]
+LLM_LATENCY = 0.02  # seconds per call
+
+
+def build_graph(namespace: dict):
+    builder = StateGraph(namespace["MessagesState"])
+    builder.add_node("assistant", namespace["assistant"])
+    builder.add_node("tools", ToolNode(namespace["tools"]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    return builder.compile(interrupt_before=["tools"], checkpointer=MemorySaver())
+
+
+def history(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(content=f"earlier message {i}: " + "text " * 40,
+                                                          id=str(uuid.uuid4()))
+            for i in range(n)]
+
+
+def post(port: int, path: str, data: dict):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=json.dumps(data).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    urllib.request.urlopen(request).read()
+
+
+class Subscriber:
+    """Counts the bytes of an SSE stream after the snapshot, until the given event."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.events = 0
+        self.seen: asyncio.Event = asyncio.Event()
+        self.wanted = b""
+
+    async def run(self, port: int, thread_id: str, mode: str, connected: asyncio.Event):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 24)
+        writer.write(f"GET /threads/{thread_id}/stream?mode={mode} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")  # response headers
+        await reader.readuntil(b"\n\n")  # snapshot
+        connected.set()
+        while True:
+            event = await reader.readuntil(b"\n\n")
+            self.bytes += len(event)
+            self.events += 1
+            if event.startswith(self.wanted):
+                self.seen.set()
+                if self.wanted == b"event: end":
+                    break
+        writer.close()
+
+
+async def turn(port: int, thread_id: str, mode: str, subscribers: int) -> dict:
+    clients = [Subscriber() for _ in range(subscribers)]
+    connected = [asyncio.Event() for _ in clients]
+    tasks = [asyncio.create_task(c.run(port, thread_id, mode, e)) for c, e in zip(clients, connected)]
+    for event in connected:
+        await event.wait()
+
+    start = time.perf_counter()
+    for c in clients:
+        c.wanted = b"event: interrupt"
+    await asyncio.to_thread(post, port, f"/threads/{thread_id}/runs", {"input": "12*34"})
+    for c in clients:
+        await c.seen.wait()
+        c.seen.clear()
+        c.wanted = b"event: end"
+    await asyncio.to_thread(post, port, f"/threads/{thread_id}/runs", {"input": None})  # approve the tools
+    await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - start
+    return {"bytes": clients[0].bytes, "events": clients[0].events, "seconds": seconds}
+
+
+def main():
+    namespace = run_script_startup("6-BreakpointGraph.py", include_stop=False)
+    namespace["llm_with_tools"] = ScriptedToolCallingLLM(latency=LLM_LATENCY, parallel_tool_calls=True)
+
+    print(f"One turn (user message -> tool calls -> interrupt -> resume -> answer) on a thread "
+          f"with {HISTORY} messages\n")
+    print(f"{'subscribers':>11} {'mode':7} {'events':>7} {'KB/subscriber':>14} {'bytes/event':>12} "
+          f"{'encode us/event':>16} {'send us/event':>14} {'seconds':>8}")
+    for subscribers in SUBSCRIBERS:
+        for mode in ("values", "diff"):
+            graph = build_graph(namespace)
+            thread_id = f"{mode}-{subscribers}"
+            graph.update_state({"configurable": {"thread_id": thread_id}}, {"messages": history(HISTORY)},
+                               as_node="assistant")
+            server = StateStreamServer(graph, port=0).start()
+            result = asyncio.run(turn(server.port, thread_id, mode, subscribers))
+            stats = server.stats()
+            server.stop()
+            events = stats["events"]
+            print(f"{subscribers:>11} {mode:7} {result['events']:>7} {result['bytes'] / 1024:>14.1f} "
+                  f"{result['bytes'] / result['events']:>12.0f} "
+                  f"{stats['encode_cpu_seconds'] / events * 1e6:>16.0f} "
+                  f"{stats['send_cpu_seconds'] / events * 1e6:>14.0f} {result['seconds']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
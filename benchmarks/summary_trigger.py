@@ -0,0 +1,156 @@
+"""
+Summarization calls and LLM tokens with the message-count vs token-budget trigger.
+
+Replays synthetic chat transcripts through the graph of 5-SummaryInputGraph.py
+(with a MemorySaver and a scripted LLM whose replies have realistic lengths):
+  - small talk: short questions and short answers
+  - support: questions with pasted logs and stack traces now and then
+  - coding: pasted code and long answers
+once with the original trigger (summarize when there are more than 6 messages)
+and with the script's trigger (message_tokens > SUMMARY_TOKEN_BUDGET) for a
+few budgets.
+
+It reports the summarization calls, the tokens sent to the LLM (conversation
+and summarization prompts), the largest conversation prompt, and how many
+messages the token counter had to tokenize (each message once) vs how many
+counts came from its cache. At the end it prints the break-even budget: the
+largest budget that still sends fewer tokens in total than the 6-message
+trigger on every transcript.
+
+Run from the project root:
+    python -m benchmarks.summary_trigger
+"""
+import uuid
+import random
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from benchmarks.script_loader import run_script_startup
+from utils.token_counter import TokenCounter
+
+TURNS = 60
+BUDGETS = [500, 750, 1000, 1250, 1500, 2000, 4000]
+
+SENTENCE = "The service restarted again after the deploy and the queue is backing up for a while. "
+LOG_LINE = "2024-05-01T12:00:03Z ERROR worker-3 task=sync_orders retry=4 error=TimeoutError('upstream 504')\n"
+CODE_LINE = "    result = [transform(item, options=options) for item in batch if item.enabled]\n"
+
+PROFILES = {
+    # (probability of a long message, long message, short reply words, long reply words)
+    "small talk": (0.05, SENTENCE * 8, 25, 120),
+    "support": (0.3, LOG_LINE * 40, 40, 250),
+    "coding": (0.6, CODE_LINE * 60, 60, 400),
+}
+
+
+def transcript(profile: str, turns: int = TURNS) -> list:
+    """Returns [(user message, reply words)] for `turns` turns."""
+    long_chance, long_message, short_reply, long_reply = PROFILES[profile]
+    rng = random.Random(profile)
+    messages = []
+    for i in range(turns):
+        if rng.random() < long_chance:
+            messages.append((f"Turn {i}, can you look at this?\n{long_message}", long_reply))
+        else:
+            messages.append((rng.choice(["ok thanks", "why?", f"And what about step {i}?", "sounds good"]), short_reply))
+    return messages
+
+
+class RecordingLLM:
+    """Stands in for the script's llm: replies with the scripted length and records every prompt."""
+
+    def __init__(self, counter: TokenCounter, summary_prompts: tuple):
+        self.counter = counter
+        self.summary_prompts = summary_prompts
+        self.reply_words = 20
+        self.summary_calls = 0
+        self.summary_tokens = 0
+        self.conversation_tokens = 0
+        self.largest_prompt = 0
+
+    def invoke(self, messages, **kwargs):
+        tokens = self.counter.count_messages(messages)
+        if messages[-1].content.startswith(self.summary_prompts):
+            self.summary_calls += 1
+            self.summary_tokens += tokens
+            return AIMessage(content="Summary: " + "the user and assistant discussed things " * 25,
+                             id=str(uuid.uuid4()))
+        self.conversation_tokens += tokens
+        self.largest_prompt = max(self.largest_prompt, tokens)
+        # Real chat model replies come with an id
+        return AIMessage(content="word " * self.reply_words, id=str(uuid.uuid4()))
+
+
+def count_trigger(state):
+    # The original trigger of 5-SummaryInputGraph.py
+    if len(state["messages"]) > 6:
+        return "summarize_conversation"
+    return END
+
+
+def run(namespace: dict, profile: str, trigger) -> dict:
+    # The recorder counts with its own counter, so the script's cache stats stay its own
+    prompts = (namespace["CHUNK_SUMMARY_PROMPT"], namespace["ROLLUP_SUMMARY_PROMPT"])
+    llm = namespace["llm"] = RecordingLLM(TokenCounter(), prompts)
+    namespace["token_counter"] = counter = TokenCounter()
+
+    workflow = StateGraph(namespace["State"])
+    workflow.add_node("conversation", namespace["call_model"])
+    workflow.add_node(namespace["summarize_conversation"])
+    workflow.add_edge(START, "conversation")
+    workflow.add_conditional_edges("conversation", trigger)
+    workflow.add_edge("summarize_conversation", END)
+    graph = workflow.compile(checkpointer=MemorySaver())
+
+    config = {"configurable": {"thread_id": profile}}
+    for message, reply_words in transcript(profile):
+        llm.reply_words = reply_words
+        graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+
+    state = graph.get_state(config).values
+    stats = counter.stats()
+    return {
+        "summaries": llm.summary_calls,
+        "conversation": llm.conversation_tokens,
+        "summary": llm.summary_tokens,
+        "largest": llm.largest_prompt,
+        "tokenized": stats["misses"],
+        "cached": stats["hits"],
+        "tracked": state.get("message_tokens", 0),
+        "actual": TokenCounter().count_messages(state["messages"]),
+    }
+
+
+def main():
+    namespace = run_script_startup("5-SummaryInputGraph.py", include_stop=False)
+    print(f"{TURNS} turns per transcript (script default budget: {namespace['SUMMARY_TOKEN_BUDGET']})\n")
+    print(f"{'transcript':12} {'trigger':14} {'summaries':>10} {'conv tokens':>12} {'summ tokens':>12} "
+          f"{'total':>9} {'max prompt':>11} {'tokenized':>10} {'cached':>7}")
+    cheaper = set(BUDGETS)
+    for profile in PROFILES:
+        variants = [("> 6 msgs", count_trigger, None)]
+        variants += [(f"> {budget} tokens", namespace["should_continue"], budget) for budget in BUDGETS]
+        for name, trigger, budget in variants:
+            if budget:
+                namespace["SUMMARY_TOKEN_BUDGET"] = budget
+            r = run(namespace, profile, trigger)
+            # The running count must match a full recount of the remaining messages
+            assert r["tracked"] == r["actual"], (r["tracked"], r["actual"])
+            total = r["conversation"] + r["summary"]
+            if budget is None:
+                baseline = total
+            elif total >= baseline:
+                cheaper.discard(budget)
+            print(f"{profile:12} {name:14} {r['summaries']:>10} {r['conversation']:>12} {r['summary']:>12} "
+                  f"{total:>9} {r['largest']:>11} {r['tokenized']:>10} {r['cached']:>7}")
+        print()
+    # Past the break-even budget, at least one transcript costs more than with the 6-message trigger
+    below = [budget for budget in BUDGETS if all(b in cheaper for b in BUDGETS if b <= budget)]
+    print(f"break-even budget: {max(below) if below else 'none'} tokens "
+          f"(cheaper than '> 6 msgs' on every transcript up to there)")
+
+
+if __name__ == "__main__":
+    main()
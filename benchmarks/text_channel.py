@@ -0,0 +1,116 @@
+"""
+Append-only text channel vs plain str concatenation.
+
+Builds a looped variant of 1-SimpleGraph.py (node_1 -> node_2 / node_3 -> back
+to node_1) and runs it for 10k and 40k iterations with both state types, then
+repeats the comparison for the reducer alone to show how each one scales.
+
+Run from the project root:
+    python -m benchmarks.text_channel
+"""
+import time
+import random
+import tracemalloc
+from typing import TypedDict
+
+from langgraph.graph import StateGraph, START, END
+
+from utils.text_channel import AppendOnlyText, TextRope, append_text
+
+GRAPH_ITERATIONS = (10_000, 40_000)
+
+
+class StrState(TypedDict):
+    graph_state: str
+    iterations: int
+
+
+class RopeState(TypedDict):
+    graph_state: AppendOnlyText
+    iterations: int
+
+
+def build_looped_graph(append_only: bool, iterations: int):
+    """Looped SimpleGraph: stops after `iterations` passes through node_1."""
+
+    def fragment(state, text):
+        # Plain str state has to rebuild the whole string, the channel only needs the fragment
+        return text if append_only else state["graph_state"] + text
+
+    def node_1(state):
+        return {"graph_state": fragment(state, " I am"), "iterations": state["iterations"] + 1}
+
+    def node_2(state):
+        return {"graph_state": fragment(state, " happy :)  ")}
+
+    def node_3(state):
+        return {"graph_state": fragment(state, " Sad :(  ")}
+
+    def decide_mood(state):
+        return "node_2" if random.random() < 0.5 else "node_3"
+
+    def loop_or_end(state):
+        return "node_1" if state["iterations"] < iterations else END
+
+    builder = StateGraph(RopeState if append_only else StrState)
+    builder.add_node("node_1", node_1)
+    builder.add_node("node_2", node_2)
+    builder.add_node("node_3", node_3)
+    builder.add_edge(START, "node_1")
+    builder.add_conditional_edges("node_1", decide_mood, ["node_2", "node_3"])
+    builder.add_conditional_edges("node_2", loop_or_end, ["node_1", END])
+    builder.add_conditional_edges("node_3", loop_or_end, ["node_1", END])
+    return builder.compile()
+
+
+def measure(func):
+    """Returns (seconds, peak traced MB, result) of func()."""
+    random.seed(0)
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+
+    random.seed(0)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6, result
+
+
+def run_graph(append_only: bool, iterations: int):
+    graph = build_looped_graph(append_only, iterations)
+    config = {"recursion_limit": iterations * 2 + 10}
+    return lambda: graph.invoke({"graph_state": "Hi, this is Lance.", "iterations": 0}, config)
+
+
+def reducer_only(n: int, append_only: bool):
+    def run():
+        value = TextRope(["Hi"]) if append_only else "Hi"
+        for i in range(n):
+            value = append_text(value, " I am") if append_only else value + " I am"
+        return str(value)
+    return run
+
+
+def main():
+    print("Looped SimpleGraph (2 node steps per iteration)")
+    print(f"{'iterations':>10} {'state type':>16} {'seconds':>9} {'peak MB':>9}")
+    for iterations in GRAPH_ITERATIONS:
+        results = {}
+        for label, append_only in (("str", False), ("AppendOnlyText", True)):
+            seconds, peak, result = measure(run_graph(append_only, iterations))
+            results[label] = str(result["graph_state"])
+            print(f"{iterations:>10} {label:>16} {seconds:>9.3f} {peak:>9.2f}")
+        assert results["str"] == results["AppendOnlyText"], "both variants must produce the same text"
+
+    print("\nReducer only (no framework overhead)")
+    print(f"{'appends':>9} {'str (s)':>10} {'rope (s)':>10} {'str MB':>9} {'rope MB':>9}")
+    for n in (10_000, 100_000, 1_000_000):
+        str_seconds, str_peak, _ = measure(reducer_only(n, append_only=False))
+        rope_seconds, rope_peak, _ = measure(reducer_only(n, append_only=True))
+        print(f"{n:>9} {str_seconds:>10.3f} {rope_seconds:>10.3f} {str_peak:>9.2f} {rope_peak:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Tool executions and wall time with and without the pure-tool result cache.
+
+Replays a workload like the one 6-BreakpointGraph.py sees: arithmetic prompts
+that share sub-expressions, and about half of them retried after the user
+rejected the tool call at the breakpoint. The graph is the agent graph of
+3-AgentGraph.py with parallel tool calls (without the fast path, so every prompt
+reaches the LLM). The LLM is the scripted fake, and every tool execution
+sleeps TOOL_LATENCY to stand in for a real tool.
+
+Run from the project root:
+    python -m benchmarks.tool_cache
+"""
+import random
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.prebuilt import ToolNode
+
+from benchmarks.fake_llm import ScriptedToolCallingLLM
+from benchmarks.script_loader import run_script_startup
+from benchmarks.parallel_tool_calls import build_graph
+from utils.tool_cache import ToolResultCache, pure_tool, with_result_cache
+
+TOOL_LATENCY = 0.05  # seconds per tool execution
+PROMPTS = 40
+RETRY_RATE = 0.5  # share of prompts the user runs a second time
+CACHE_SIZES = [None, 8, 256]  # None = no cache
+
+executions = 0
+
+
+def slow(tool):
+    def wrapper(a, b):
+        global executions
+        executions += 1
+        time.sleep(TOOL_LATENCY)
+        return tool(a, b)
+    wrapper.__name__, wrapper.__doc__ = tool.__name__, tool.__doc__
+    wrapper.__annotations__ = tool.__annotations__
+    return pure_tool(wrapper)
+
+
+def workload(seed: int = 0) -> list:
+    # Small operands so different prompts share sub-expressions like (2+3)
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(PROMPTS):
+        a, b, c, d = (rng.randint(1, 4) for _ in range(4))
+        prompt = rng.choice([f"({a}+{b})*({c}+{d})", f"{a}*{b}+{c}*{d}", f"({a}+{b})*{c}-{d}"])
+        prompts.append(prompt)
+        if rng.random() < RETRY_RATE:
+            prompts.append(prompt)
+    return prompts
+
+
+def main():
+    global executions
+    namespace = run_script_startup("3-AgentGraph.py", include_stop=False)
+    namespace["llm_with_tools"] = ScriptedToolCallingLLM(latency=0.0, parallel_tool_calls=True)
+    tools = [slow(t) for t in namespace["tools"]]
+    prompts = workload()
+
+    print(f"{len(prompts)} runs ({PROMPTS} prompts + {len(prompts) - PROMPTS} retries), {TOOL_LATENCY}s per tool execution\n")
+    print(f"{'cache':>10} {'tool calls':>10} {'executed':>9} {'hit rate':>9} {'evictions':>10} {'secs':>7}")
+    answers = None
+    for size in CACHE_SIZES:
+        cache = ToolResultCache(maxsize=size) if size else None
+        graph = build_graph(namespace, ToolNode(with_result_cache(tools, cache) if cache else tools))
+
+        executions = 0
+        start = time.perf_counter()
+        results = [graph.invoke({"messages": [HumanMessage(content=p)]})["messages"][-1].content for p in prompts]
+        elapsed = time.perf_counter() - start
+        assert answers is None or results == answers
+        answers = results
+
+        if cache:
+            stats = cache.stats()
+            calls = stats["hits"] + stats["misses"]
+            print(f"{size:>10} {calls:>10} {executions:>9} {stats['hit_rate']:>9.0%} {stats['evictions']:>10} {elapsed:>7.2f}")
+        else:
+            print(f"{'off':>10} {executions:>10} {executions:>9} {'-':>9} {'-':>10} {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
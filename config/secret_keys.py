@@ -1,19 +1,13 @@
 """
 Load environment variables and sensitive keys.
+
+Nothing happens at import time: the .env file is loaded and each key is
+resolved (and validated) the first time it is accessed, then cached. This way
+`from config.secret_keys import OPENAI_API_KEY` never fails because of a key
+the script does not use, such as TAVILY_API_KEY.
 """
-import sys
 import os
-
-# Get the absolute path to the project root
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, project_root)
-
-# Ensure the current directory is also in the path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, current_dir)
-sys.path.insert(0, os.path.dirname(current_dir))
-
-from dotenv import load_dotenv
+from functools import cached_property
 from pathlib import Path
 
 # Get the parent directory of AIEngine
@@ -22,16 +16,53 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 # Construct path to .env file
 ENV_PATH = BASE_DIR / '.env'
 
-# Load environment variables from .env file
-load_dotenv(ENV_PATH)
 
-# Get API key from environment variable
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in environment variables. Please check your .env file in the parent directory.")
+class Settings:
+    """Lazily evaluated, cached access to the project's keys."""
+
+    def __init__(self, env_path: Path = ENV_PATH):
+        self.env_path = env_path
+        self._env_loaded = False
+
+    def _load_env(self):
+        # Load environment variables from .env file (only once)
+        if not self._env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv(self.env_path)
+            self._env_loaded = True
+
+    def _get(self, name: str, required: bool):
+        self._load_env()
+        value = os.getenv(name)
+        if required and not value:
+            raise ValueError(f"{name} not found in environment variables. Please check your .env file in the parent directory.")
+        return value
+
+    @cached_property
+    def OPENAI_API_KEY(self) -> str:
+        return self._get("OPENAI_API_KEY", required=True)
+
+    @cached_property
+    def MONGO_URI(self) -> str:
+        return self._get("MONGO_URI", required=False)
+
+    @cached_property
+    def TAVILY_API_KEY(self) -> str:
+        return self._get("TAVILY_API_KEY", required=True)
+
+
+settings = Settings()
+
+KEY_NAMES = ("OPENAI_API_KEY", "MONGO_URI", "TAVILY_API_KEY")
+
+
+def __getattr__(name: str):
+    # Module level attribute access (PEP 562): resolve the key on first use
+    if name in KEY_NAMES:
+        return getattr(settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-MONGO_URI = os.getenv("MONGO_URI")
 
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-if not TAVILY_API_KEY:
-    raise ValueError("TAVILY_API_KEY not found in environment variables. Please check your .env file in the parent directory.")
\ No newline at end of file
+def get_setting(name: str, default: str = None) -> str:
+    """Returns an optional setting from the environment or the .env file, e.g. GRAPH_RENDERER."""
+    return settings._get(name, required=False) or default
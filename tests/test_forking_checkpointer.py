@@ -0,0 +1,75 @@
+"""
+Tests of utils.forking_checkpointer.ForkingMemorySaver: edits in place, shared
+blobs between forks, branches and diffs.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, MessagesState
+
+from utils.forking_checkpointer import ForkingMemorySaver
+
+
+def echo_graph(saver):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", lambda state: {"messages": [AIMessage(content=state["messages"][-1].content)]})
+    builder.add_edge(START, "echo")
+    return builder.compile(checkpointer=saver)
+
+
+@pytest.mark.parametrize("saver", [
+    MemorySaver(),
+    ForkingMemorySaver(keep_checkpoints=None),
+    ForkingMemorySaver(keep_checkpoints=None, max_cached_messages=1),  # blobs evicted right away
+], ids=["MemorySaver", "ForkingMemorySaver", "ForkingMemorySaver-evicting"])
+def test_message_edited_in_place_is_stored_and_older_checkpoints_keep_theirs(saver):
+    graph = echo_graph(saver)
+    config = {"configurable": {"thread_id": "t"}}
+    graph.invoke({"messages": [HumanMessage(content="orig", id="h1")]}, config)
+    before = graph.get_state(config)
+
+    # The usual edit flow: take the message from get_state(), change it, update_state()
+    message = before.values["messages"][0]
+    message.content = "edited"
+    graph.update_state(config, {"messages": [message]})
+
+    assert [m.content for m in graph.get_state(config).values["messages"]] == ["edited", "orig"]
+    assert [m.content for m in graph.get_state(before.config).values["messages"]] == ["orig", "orig"]
+    contents = [[m.content for m in s.values["messages"]] for s in graph.get_state_history(config)]
+    assert contents[0] == ["edited", "orig"]
+    assert all("edited" not in c for c in contents[1:])
+
+
+def test_forks_share_unchanged_messages():
+    saver = ForkingMemorySaver(keep_checkpoints=None)
+    graph = echo_graph(saver)
+    config = {"configurable": {"thread_id": "t"}}
+    for i in range(5):
+        graph.invoke({"messages": [HumanMessage(content=f"q{i}", id=f"h{i}")]}, config)
+    base = graph.get_state(config)
+    stored = saver.stats()["stored_messages"]
+
+    forks = [graph.update_state(base.config, {"messages": [HumanMessage(content=f"edit {i}", id="h2")]})
+             for i in range(3)]
+
+    # Each fork stores its edit only, the other 9 messages are shared
+    assert saver.stats()["stored_messages"] == stored + 3
+    diff = saver.diff(forks[0], forks[1])
+    assert (diff.common, diff.common_tail) == (4, 5)
+    assert [m.content for m in diff.only_a] == ["edit 0"]
+    assert [m.content for m in diff.only_b] == ["edit 1"]
+    assert len([b for b in saver.branches("t") if b.fork_point == base.config["configurable"]["checkpoint_id"]]) == 3
+
+
+def test_loads_return_new_objects():
+    saver = ForkingMemorySaver(keep_checkpoints=None)
+    graph = echo_graph(saver)
+    config = {"configurable": {"thread_id": "t"}}
+    graph.invoke({"messages": [HumanMessage(content="hi", id="h1")]}, config)
+
+    first, second = graph.get_state(config).values["messages"], graph.get_state(config).values["messages"]
+    assert first == second
+    assert all(a is not b for a, b in zip(first, second))
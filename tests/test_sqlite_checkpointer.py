@@ -0,0 +1,188 @@
+"""
+Tests of utils.sqlite_checkpointer.SQLiteWALSaver: round trips, group commit,
+reader connections and the writer thread's failure paths.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import StateGraph, START, MessagesState
+
+from utils.sqlite_checkpointer import SQLiteWALSaver
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+def put_checkpoint(saver: SQLiteWALSaver, thread_id: str, value: str = "v") -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"value": value}
+    checkpoint["channel_versions"] = {"value": saver.get_next_version(None, None)}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, checkpoint, {"source": "input", "step": 0}, checkpoint["channel_versions"])
+
+
+def echo_graph(saver: SQLiteWALSaver):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", lambda state: {"messages": [AIMessage(content=state["messages"][-1].content)]})
+    builder.add_edge(START, "echo")
+    return builder.compile(checkpointer=saver)
+
+
+def test_graph_round_trip_and_reopen(path):
+    with SQLiteWALSaver(path) as saver:
+        graph = echo_graph(saver)
+        config = {"configurable": {"thread_id": "t"}}
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, config)
+        graph.invoke({"messages": [HumanMessage(content="again")]}, config)
+        history = list(graph.get_state_history(config))
+
+    with SQLiteWALSaver(path) as saver:
+        state = echo_graph(saver).get_state(config)
+        assert [m.content for m in state.values["messages"]] == ["hi", "hi", "again", "again"]
+        assert len(list(saver.list(config))) == len(history)
+        assert len(list(saver.list(config, limit=2))) == 2
+
+
+def test_concurrent_puts_are_group_committed(path):
+    with SQLiteWALSaver(path, group_commit_ms=5) as saver:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            configs = list(pool.map(lambda i: put_checkpoint(saver, f"t{i % 4}", str(i)), range(200)))
+        assert saver.committed_writes == 200
+        assert saver.commits < 200
+        for config in configs:
+            assert saver.get_tuple(config) is not None
+
+
+def test_failed_batch_raises_and_writer_keeps_running(path):
+    with SQLiteWALSaver(path) as saver:
+        with pytest.raises(sqlite3.OperationalError):
+            saver._submit([("INSERT INTO missing_table VALUES (?)", [(1,)])])
+        assert saver._writer.is_alive()
+        config = put_checkpoint(saver, "t")
+        assert saver.get_tuple(config).checkpoint["channel_values"] == {"value": "v"}
+
+
+def test_rolled_back_transaction_does_not_kill_the_writer(path):
+    # On a full database SQLite rolls the transaction back itself, and a second ROLLBACK raises
+    with SQLiteWALSaver(path) as saver:
+        pages = saver._writer_conn.execute("PRAGMA page_count").fetchone()[0]
+        saver._writer_conn.execute(f"PRAGMA max_page_count = {pages + 1}")
+        error = _put_error(saver, "t", "x" * 100_000)
+        assert isinstance(error, sqlite3.OperationalError)
+        assert "full" in str(error)
+        assert saver._writer.is_alive()
+
+        saver._writer_conn.execute("PRAGMA max_page_count = 1073741823")
+        assert saver.get_tuple(put_checkpoint(saver, "t")) is not None
+
+
+def test_locked_database_fails_the_write(path):
+    with SQLiteWALSaver(path) as saver:
+        saver._writer_conn.execute("PRAGMA busy_timeout = 0")
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        try:
+            assert isinstance(_put_error(saver, "t"), sqlite3.OperationalError)
+        finally:
+            blocker.execute("ROLLBACK")
+            blocker.close()
+
+        assert saver._writer.is_alive()
+        assert saver.get_tuple(put_checkpoint(saver, "t")) is not None
+
+
+def test_one_bad_write_fails_its_whole_batch_only(path):
+    with SQLiteWALSaver(path, group_commit_ms=50) as saver:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            bad = pool.submit(_error_of, saver._submit, [("INSERT INTO missing_table VALUES (?)", [(1,)])])
+            others = [pool.submit(_error_of, put_checkpoint, saver, f"t{i}") for i in range(3)]
+            assert isinstance(bad.result(timeout=10), sqlite3.OperationalError)
+            for other in others:
+                other.result(timeout=10)  # resolved, committed or failed with the batch
+        assert saver.get_tuple(put_checkpoint(saver, "after")) is not None
+
+
+def test_readers_see_commits_from_other_threads(path):
+    with SQLiteWALSaver(path) as saver:
+        config = put_checkpoint(saver, "t", "first")
+        assert saver.get_tuple(config) is not None
+        seen = []
+        reader = threading.Thread(target=lambda: seen.append(saver.get_tuple(config)))
+        reader.start()
+        reader.join()
+        assert seen[0].checkpoint["channel_values"] == {"value": "first"}
+        assert len(saver._readers) == 2
+
+
+def test_read_cost_does_not_grow_with_the_thread(path):
+    with SQLiteWALSaver(path) as saver:
+        steps = {}
+        config, version = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, None
+        for turn in range(1, 401):
+            # Every turn writes a new version of the channel, like a growing message list
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"messages": ["m"] * 10}
+            checkpoint["channel_versions"] = {"messages": version}
+            config = saver.put(config, checkpoint, {"source": "loop", "step": turn}, {"messages": version})
+            if turn in (50, 400):
+                steps[turn] = _vm_steps(saver, config)
+        assert saver.get_tuple(config).checkpoint["channel_values"] == {"messages": ["m"] * 10}
+        assert steps[400] < steps[50] * 1.5, steps
+
+
+def test_close_flushes_and_rejects_later_writes(path):
+    saver = SQLiteWALSaver(path)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: put_checkpoint(saver, f"t{i}"), range(50)))
+    saver.close()
+    assert not saver._writer.is_alive()
+    with pytest.raises(RuntimeError):
+        put_checkpoint(saver, "late")
+
+    with SQLiteWALSaver(path) as reopened:
+        assert len(list(reopened.list(None))) == 50
+
+
+def _put_error(saver: SQLiteWALSaver, thread_id: str, value: str = "v"):
+    """Returns the error of a put, failing the test instead of hanging when the put never returns."""
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(error=_error_of(put_checkpoint, saver, thread_id, value)),
+                              daemon=True)
+    waiter.start()
+    waiter.join(timeout=10)
+    assert not waiter.is_alive(), "put() never returned"
+    return result["error"]
+
+
+def _error_of(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        return e
+    return None
+
+
+def _vm_steps(saver: SQLiteWALSaver, config: dict) -> int:
+    """Counts the SQLite virtual machine steps of one get_tuple on the calling thread's reader."""
+    conn = saver._reader()
+    steps = [0]
+
+    def count():
+        steps[0] += 1
+
+    conn.set_progress_handler(count, 1)
+    try:
+        saver.get_tuple(config)
+    finally:
+        conn.set_progress_handler(None, 1)
+    return steps[0]
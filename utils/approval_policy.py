@@ -0,0 +1,149 @@
+"""
+Rule-based auto-approval of tool calls paused at a breakpoint.
+
+With interrupt_before=["tools"] every tool call waits for a human, also
+trivially safe ones like add(2, 3). ApprovalPolicy decides a tool call from:
+  1. declarative rules: tool names, allowed argument ranges / values, and
+     callers (thread id patterns); the first matching rule wins
+  2. decisions a human already made for the exact same step (the same tool
+     calls with the same arguments) from the same caller, kept in a bounded
+     LRU cache; a decision on a whole step is never reused for a single call
+     of it, nor for another caller
+and returns "approve", "reject", or None when a human has to look at it.
+ApprovalQueue(graph, policy=...) resumes auto-approved threads right away, so
+they never show up as paused.
+
+Usage:
+
+    policy = ApprovalPolicy([
+        ApprovalRule(tools=["add", "subtract", "multiply"], args={"a": (-1e6, 1e6), "b": (-1e6, 1e6)}),
+        ApprovalRule(tools=["divide"], args={"b": [0]}, decision="reject"),
+    ])
+    approvals = ApprovalQueue(breakpoint_graph, policy=policy)
+"""
+import json
+import fnmatch
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+APPROVE = "approve"
+REJECT = "reject"
+
+
+@dataclass
+class ApprovalRule:
+    """
+    Decision for the tool calls it matches.
+
+    Attributes:
+        tools: Tool names the rule applies to ("*" for any tool).
+        args: Argument constraints: (min, max) for a numeric range (inclusive), or a list of allowed values.
+            A call missing a constrained argument does not match.
+        callers: fnmatch patterns of the callers the rule applies to (the thread ids in ApprovalQueue,
+            unless it is given a `caller` function).
+        decision: APPROVE or REJECT.
+    """
+
+    tools: tuple = ("*",)
+    args: dict = field(default_factory=dict)
+    callers: tuple = ("*",)
+    decision: str = APPROVE
+
+    def matches(self, tool_call: dict, caller: str) -> bool:
+        if "*" not in self.tools and tool_call["name"] not in self.tools:
+            return False
+        if not any(fnmatch.fnmatchcase(caller, pattern) for pattern in self.callers):
+            return False
+        call_args = tool_call.get("args", {})
+        for name, allowed in self.args.items():
+            if name not in call_args:
+                return False
+            value = call_args[name]
+            if isinstance(allowed, tuple):
+                low, high = allowed
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+                    return False
+            elif value not in allowed:
+                return False
+        return True
+
+
+class ApprovalPolicy:
+    """Decides tool calls with rules and remembered human decisions."""
+
+    def __init__(self, rules: list, max_cached: int = 10000):
+        """
+        Args:
+            rules: ApprovalRules, checked in order.
+            max_cached: Number of human decisions remembered (least recently used are dropped).
+        """
+        self.rules = list(rules)
+        self.max_cached = max_cached
+        self._cache: OrderedDict = OrderedDict()  # (caller, step key) -> decision
+        self._lock = threading.Lock()
+        self.counts = {"rule": 0, "cached": 0, "human": 0}
+
+    @staticmethod
+    def _key(tool_calls: list, caller: str) -> tuple:
+        # The calls of a step, in any order, together with who made them
+        calls = sorted((call["name"], json.dumps(call.get("args", {}), sort_keys=True, default=str))
+                       for call in tool_calls)
+        return caller, tuple(calls)
+
+    def _rule_decision(self, tool_call: dict, caller: str) -> Optional[str]:
+        for rule in self.rules:
+            if rule.matches(tool_call, caller):
+                return rule.decision
+        return None
+
+    def _cached(self, tool_calls: list, caller: str) -> Optional[str]:
+        key = self._key(tool_calls, caller)
+        with self._lock:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+        return decision
+
+    def decide_call(self, tool_call: dict, caller: str = "") -> Optional[str]:
+        """Returns APPROVE, REJECT or None (ask a human) for one tool call."""
+        return self._rule_decision(tool_call, caller) or self._cached([tool_call], caller)
+
+    def decide(self, tool_calls: list, caller: str = "") -> Optional[str]:
+        """
+        Decides all tool calls of one paused step together.
+
+        Args:
+            tool_calls: The tool calls of the AI message.
+            caller: Who made the calls (the thread id).
+
+        Returns:
+            REJECT if any call is rejected, APPROVE if every call is approved, otherwise None (ask a human).
+        """
+        decisions = [self._rule_decision(call, caller) for call in tool_calls]
+        source = "rule"
+        if REJECT in decisions:
+            result = REJECT
+        elif decisions and None not in decisions:
+            result = APPROVE
+        else:
+            result, source = self._cached(tool_calls, caller), "cached"
+        with self._lock:
+            self.counts["human" if result is None else source] += 1
+        return result
+
+    def remember(self, tool_calls: list, decision: str, caller: str = ""):
+        """Caches a human decision on the whole step, for this caller only."""
+        if not tool_calls or self.max_cached <= 0:
+            return
+        key = self._key(tool_calls, caller)
+        with self._lock:
+            self._cache[key] = decision
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counts, "cached_decisions": len(self._cache)}
@@ -0,0 +1,279 @@
+"""
+Approval queue for many graph threads paused at a breakpoint.
+
+The breakpoint scripts ask for approval with input() and resume one thread at
+a time. ApprovalQueue keeps every thread paused at an interrupt_before node in
+a pending queue (in pause order, indexed by node and by tool name), lets a
+reviewer approve, reject or edit any number of them at once, and resumes the
+approved threads on a pool of `max_parallel` worker threads. A resumed thread
+that pauses again goes back into the queue.
+
+Each pending entry remembers the checkpoint it paused at; a decision for a
+thread that has moved on since (e.g. resumed elsewhere) is skipped instead of
+resuming it twice.
+
+With a policy (utils/approval_policy.py), a thread run through the queue whose
+tool calls the policy approves (or rejects) is decided right away and never
+enters the pending queue; reviewer decisions are remembered by the policy for
+the same step of the same caller (the thread id, or `caller(thread_id)`).
+
+Usage:
+
+    approvals = ApprovalQueue(breakpoint_graph, max_parallel=16)
+    approvals.start(thread_id, {"messages": HumanMessage(content=user_msg)})   # runs until the breakpoint
+    for entry in approvals.pending(tool="divide"):
+        ...
+    approvals.approve([entry.thread_id for entry in approvals.pending(node="tools")])
+    approvals.reject(["thread-7"], reason="Not allowed")
+    approvals.edit({"thread-9": {"messages": HumanMessage(content="Multiply 2 and 3")}})
+    approvals.wait()
+
+    approvals = ApprovalQueue(breakpoint_graph, policy=ApprovalPolicy([ApprovalRule(tools=["add"])]))
+"""
+import time
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from utils.approval_policy import APPROVE, REJECT
+
+
+@dataclass
+class PendingApproval:
+    """A thread paused at a breakpoint."""
+
+    thread_id: str
+    node: str  # the node that runs next, e.g. "tools" or "assistant"
+    checkpoint_id: str
+    tool_calls: list = field(default_factory=list)  # tool calls waiting to run (tools breakpoint)
+    paused_at: float = field(default_factory=time.time)
+
+    @property
+    def tools(self) -> set:
+        return {call["name"] for call in self.tool_calls}
+
+
+class ApprovalQueue:
+    """Pending approvals of paused threads, with bulk decisions and concurrent resumes."""
+
+    def __init__(self, graph, max_parallel: int = 8, policy=None,
+                 caller: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            graph: Compiled graph with a checkpointer and interrupt_before nodes.
+            max_parallel: Maximum number of threads resumed at the same time.
+            policy: Optional ApprovalPolicy that decides tool calls without a reviewer.
+            caller: Maps a thread id to the caller the policy sees (e.g. the user of the thread),
+                the thread id itself by default.
+        """
+        self.graph = graph
+        self.max_parallel = max_parallel
+        self.policy = policy
+        self.caller = caller or (lambda thread_id: thread_id)
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="approval")
+        self._lock = threading.Lock()
+        self._pending: dict = {}  # thread id -> PendingApproval, in pause order
+        self._by_node: defaultdict = defaultdict(set)
+        self._by_tool: defaultdict = defaultdict(set)
+        self._running: dict = {}  # thread id -> Future of the run
+        self.results: dict = {}  # thread id -> state after the last run (or the exception)
+        self.counts = {"paused": 0, "approved": 0, "rejected": 0, "edited": 0, "finished": 0,
+                       "stale": 0, "errors": 0, "auto_approved": 0, "auto_rejected": 0}
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counts[key] += n
+
+    @staticmethod
+    def _config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    # --- pending queue ---
+
+    def _add(self, entry: PendingApproval):
+        with self._lock:
+            self._remove(entry.thread_id)
+            self._pending[entry.thread_id] = entry
+            self._by_node[entry.node].add(entry.thread_id)
+            for tool in entry.tools:
+                self._by_tool[tool].add(entry.thread_id)
+            self.counts["paused"] += 1
+
+    def _remove(self, thread_id: str) -> Optional[PendingApproval]:
+        # Caller holds the lock
+        entry = self._pending.pop(thread_id, None)
+        if entry is not None:
+            self._by_node[entry.node].discard(thread_id)
+            for tool in entry.tools:
+                self._by_tool[tool].discard(thread_id)
+        return entry
+
+    def _paused(self, thread_id: str) -> Optional[PendingApproval]:
+        """Returns the entry of the thread if it is paused at a breakpoint (without queueing it)."""
+        snapshot = self.graph.get_state(self._config(thread_id))
+        if not snapshot.next:
+            return None
+        messages = snapshot.values.get("messages", [])
+        last = messages[-1] if messages else None
+        tool_calls = list(last.tool_calls) if isinstance(last, AIMessage) and "tools" in snapshot.next else []
+        return PendingApproval(thread_id, snapshot.next[0], snapshot.config["configurable"]["checkpoint_id"],
+                               tool_calls)
+
+    def track(self, thread_id: str) -> Optional[PendingApproval]:
+        """Adds the thread to the queue if it is paused at a breakpoint. Returns its entry."""
+        entry = self._paused(thread_id)
+        if entry is not None:
+            self._add(entry)
+        return entry
+
+    def pending(self, node: Optional[str] = None, tool: Optional[str] = None) -> list:
+        """Returns the pending approvals in pause order, optionally only those at `node` / calling `tool`."""
+        with self._lock:
+            ids = None
+            if node is not None:
+                ids = set(self._by_node.get(node, ()))
+            if tool is not None:
+                tool_ids = self._by_tool.get(tool, set())
+                ids = tool_ids if ids is None else ids & tool_ids
+            if ids is None:
+                return list(self._pending.values())
+            return [entry for thread_id, entry in self._pending.items() if thread_id in ids]
+
+    def get(self, thread_id: str) -> Optional[PendingApproval]:
+        """Returns the pending approval of the thread, or None when it is not waiting for a decision."""
+        with self._lock:
+            return self._pending.get(thread_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # --- running ---
+
+    def start(self, thread_id: str, input: Any) -> Future:
+        """Runs the graph on the thread (in the pool) until it finishes or pauses at a breakpoint."""
+        return self._submit(thread_id, input)
+
+    def _submit(self, thread_id: str, input: Any) -> Future:
+        future = self._executor.submit(self._run, thread_id, input)
+        with self._lock:
+            self._running[thread_id] = future
+        return future
+
+    def _run(self, thread_id: str, input: Any):
+        try:
+            result = self.graph.invoke(input, self._config(thread_id))
+            # Keep going while the policy decides the breakpoints on its own
+            while True:
+                entry = self._paused(thread_id)
+                if entry is None:
+                    self._count("finished")
+                    break
+                decision = None
+                if self.policy is not None and entry.tool_calls:
+                    decision = self.policy.decide(entry.tool_calls, caller=self.caller(thread_id))
+                if decision == APPROVE:
+                    self._count("auto_approved")
+                    result = self.graph.invoke(None, self._config(thread_id))
+                elif decision == REJECT:
+                    self._answer(entry, "Rejected by the approval policy.")
+                    self._count("auto_rejected")
+                    result = self.graph.get_state(self._config(thread_id)).values
+                    break
+                else:
+                    self._add(entry)
+                    break
+        except Exception as e:
+            self.results[thread_id] = e
+            self._count("errors")
+            raise
+        self.results[thread_id] = result
+        return result
+
+    def _take(self, thread_ids: Iterable[str]) -> list:
+        """Removes the threads from the queue and returns the entries that are still current."""
+        entries = []
+        with self._lock:
+            taken = [entry for entry in (self._remove(t) for t in thread_ids) if entry is not None]
+        for entry in taken:
+            snapshot = self.graph.get_state(self._config(entry.thread_id))
+            if snapshot.config["configurable"]["checkpoint_id"] != entry.checkpoint_id:
+                self._count("stale")  # the thread moved on since it paused
+                continue
+            entries.append(entry)
+        return entries
+
+    # --- decisions ---
+
+    def _remember(self, entries: list, decision: str):
+        if self.policy is not None:
+            for entry in entries:
+                if entry.tool_calls:
+                    self.policy.remember(entry.tool_calls, decision, caller=self.caller(entry.thread_id))
+
+    def _answer(self, entry: PendingApproval, reason: str):
+        # Answer the pending tool calls, so the conversation stays valid for the next user message
+        answers = [ToolMessage(content=reason, tool_call_id=call["id"]) for call in entry.tool_calls]
+        self.graph.update_state(self._config(entry.thread_id), {"messages": answers}, as_node=entry.node)
+
+    def approve(self, thread_ids: Iterable[str]) -> list:
+        """Resumes the threads (at most max_parallel at a time). Returns their futures."""
+        entries = self._take(thread_ids)
+        self._remember(entries, APPROVE)
+        self._count("approved", len(entries))
+        return [self._submit(entry.thread_id, None) for entry in entries]
+
+    def reject(self, thread_ids: Iterable[str], reason: str = "Rejected by the reviewer.") -> int:
+        """
+        Drops the threads from the queue without resuming them. Returns how many were rejected.
+
+        Pending tool calls are answered with a ToolMessage carrying `reason`, so the
+        conversation stays valid for the next user message.
+        """
+        entries = self._take(thread_ids)
+        self._remember(entries, REJECT)
+        for entry in entries:
+            if entry.tool_calls:
+                self._answer(entry, reason)
+        self._count("rejected", len(entries))
+        return len(entries)
+
+    def edit(self, updates: dict, resume: bool = True) -> list:
+        """
+        Applies a state update to each thread ({thread id: update}) and, by default, resumes it.
+
+        Returns the futures of the resumed threads.
+        """
+        entries = self._take(updates)
+        for entry in entries:
+            self.graph.update_state(self._config(entry.thread_id), updates[entry.thread_id])
+        self._count("edited", len(entries))
+        if not resume:
+            for entry in entries:
+                self.track(entry.thread_id)
+            return []
+        return [self._submit(entry.thread_id, None) for entry in entries]
+
+    def wait(self, thread_ids: Optional[Iterable[str]] = None):
+        """Waits until the runs of the given threads (default: all) are done."""
+        while True:
+            with self._lock:
+                futures = [f for t, f in self._running.items() if thread_ids is None or t in thread_ids]
+            if all(f.done() for f in futures):
+                return
+            for future in futures:
+                future.exception()
+
+    def close(self):
+        """Waits for running threads and stops the worker pool."""
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for f in self._running.values() if not f.done())
+            return {**self.counts, "pending": len(self._pending), "running": running}
@@ -0,0 +1,137 @@
+"""
+Local fast path for pure arithmetic inputs in the agent graphs.
+
+An input like "7+3+4-2" costs one LLM round trip per operation through the
+assistant <-> tools loop: each step needs the result of the previous one, so
+even with `parallel_tool_calls=True` the calls come one turn at a time. The
+fast path node runs before the assistant: if the latest human message is a
+plain arithmetic expression it is evaluated locally with the graph's own tool
+functions (add, subtract, multiply, divide) and the graph ends. Anything else
+goes to the LLM unchanged; a "0x" hex prefix is not read as a multiplication.
+
+Usage:
+
+    builder.add_node("arithmetic_fast_path", make_arithmetic_fast_path(tools))
+    builder.add_edge(START, "arithmetic_fast_path")
+    builder.add_conditional_edges("arithmetic_fast_path", arithmetic_fast_path_condition)
+"""
+import ast
+import re
+from typing import Literal, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, MessagesState
+
+# Only digits, operators, brackets and spaces (plus "x" / unicode signs for multiply and divide)
+ARITHMETIC_PATTERN = re.compile(r"^[\d\s.+\-*/()x×÷]+$")
+
+# Python operator -> name of the tool that performs it
+OPERATOR_TOOLS = {
+    ast.Add: "add",
+    ast.Sub: "subtract",
+    ast.Mult: "multiply",
+    ast.Div: "divide",
+}
+
+# Name used to mark answers produced by the fast path
+FAST_PATH_NAME = "arithmetic_fast_path"
+
+# "x" right after a number's leading 0 is a hex prefix ("0x10"), not a multiplication
+HEX_PREFIX_PATTERN = re.compile(r"(?<![\d.])0x")
+
+# Longest expression we evaluate locally, anything bigger goes to the LLM
+MAX_EXPRESSION_LENGTH = 200
+
+
+def normalize_expression(text: str) -> Optional[str]:
+    """
+    Returns `text` as a Python arithmetic expression, or None if it is not pure arithmetic.
+
+    Trailing "=", "?" and "." are dropped and "x" / "×" / "÷" become "*" / "/", e.g. "7x3=" -> "7*3".
+    """
+    expression = text.strip().rstrip("=?.").strip()
+    if not expression or len(expression) > MAX_EXPRESSION_LENGTH or not ARITHMETIC_PATTERN.match(expression):
+        return None
+    if not any(ch.isdigit() for ch in expression) or HEX_PREFIX_PATTERN.search(expression):
+        return None
+    return expression.replace("x", "*").replace("×", "*").replace("÷", "/")
+
+
+def _evaluate(node, tools: dict):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _evaluate(node.operand, tools)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATOR_TOOLS:
+        left = _evaluate(node.left, tools)
+        right = _evaluate(node.right, tools)
+        return tools[OPERATOR_TOOLS[type(node.op)]](left, right)
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def evaluate_arithmetic(text: str, tools: list):
+    """
+    Evaluates `text` with the given tool functions if it is a pure arithmetic expression.
+
+    Args:
+        text: The user's message, e.g. "7+3+4-2."
+        tools: The graph's tool functions; add, subtract, multiply and divide are used by name.
+
+    Returns:
+        The result, or None if the text is not pure arithmetic (or cannot be evaluated safely).
+    """
+    expression = normalize_expression(text)
+    if expression is None:
+        return None
+
+    tools_by_name = {tool.__name__: tool for tool in tools}
+    needed = {OPERATOR_TOOLS[op] for op in OPERATOR_TOOLS}
+    if not needed.issubset(tools_by_name):
+        return None
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+        if not isinstance(tree.body, ast.BinOp):
+            return None  # a lone number is not a calculation
+        return _evaluate(tree.body, tools_by_name)
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError):
+        return None
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def make_arithmetic_fast_path(tools: list):
+    """
+    Builds the pre-routing node for a graph that uses the given arithmetic tools.
+
+    Args:
+        tools: The same tool functions the assistant is bound to.
+    """
+
+    def arithmetic_fast_path(state: MessagesState):
+        last_message = state["messages"][-1]
+        if not isinstance(last_message, HumanMessage) or not isinstance(last_message.content, str):
+            return {"messages": []}
+
+        result = evaluate_arithmetic(last_message.content, tools)
+        if result is None:
+            return {"messages": []}
+
+        expression = last_message.content.strip().rstrip("=?.").strip()
+        answer = AIMessage(content=f"{expression} = {_format_number(result)}", name=FAST_PATH_NAME)
+        return {"messages": [answer]}
+
+    return arithmetic_fast_path
+
+
+def arithmetic_fast_path_condition(state: MessagesState) -> Literal["assistant", "__end__"]:
+    """Ends the graph if the fast path answered, otherwise routes to the assistant."""
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and last_message.name == FAST_PATH_NAME:
+        return END
+    return "assistant"
@@ -0,0 +1,75 @@
+"""
+Batch execution of a graph over many initial states.
+
+Meant for graphs whose nodes are pure CPU (like 1-SimpleGraph.py). The states
+are split into chunks and run across a process pool. Compiled graphs cannot be
+pickled, so every worker builds its own graph once from `graph_factory`, which
+must be a picklable callable (a module-level function or a functools.partial).
+"""
+import os
+import sys
+import random
+from multiprocessing import Pool
+
+# The graph built by graph_factory in each worker process
+_worker_graph = None
+_worker_config = None
+
+
+def _seed_for(seed, index: int):
+    # Per-input seed, so results do not depend on how inputs are chunked or on the number of processes
+    return None if seed is None else f"{seed}-{index}"
+
+
+def _init_worker(graph_factory, config, quiet: bool):
+    global _worker_graph, _worker_config
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    _worker_graph = graph_factory()
+    _worker_config = config
+
+
+def _invoke_one(job):
+    index, state, seed = job
+    if seed is not None:
+        random.seed(_seed_for(seed, index))
+    return _worker_graph.invoke(state, _worker_config)
+
+
+def run_batch(graph_factory, states: list, processes: int = None, chunksize: int = None,
+              seed: int = None, config: dict = None, quiet: bool = False) -> list:
+    """
+    Invokes a graph once per initial state and returns the results in input order.
+
+    Args:
+        graph_factory: Picklable callable that returns the compiled graph.
+        states: List of initial states, one graph.invoke per state.
+        processes: Number of worker processes (default: all cores). 1 runs in this process.
+        chunksize: Number of states sent to a worker at a time (default: about 4 chunks per worker).
+        seed: Seeds the `random` module before each invocation, so random routing
+            such as decide_mood is reproducible and identical for any number of processes.
+        config: Optional RunnableConfig passed to every invocation.
+        quiet: Silence print() output from the nodes.
+
+    Returns:
+        The list of final states, in the same order as `states`.
+    """
+    processes = processes or os.cpu_count() or 1
+    jobs = [(index, state, seed) for index, state in enumerate(states)]
+
+    # Single process: no pool, no pickling
+    if processes == 1:
+        stdout = sys.stdout
+        try:
+            _init_worker(graph_factory, config, quiet)
+            return [_invoke_one(job) for job in jobs]
+        finally:
+            if quiet:
+                sys.stdout.close()
+                sys.stdout = stdout
+
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (processes * 4))
+
+    with Pool(processes, initializer=_init_worker, initargs=(graph_factory, config, quiet)) as pool:
+        return pool.map(_invoke_one, jobs, chunksize=chunksize)
@@ -0,0 +1,412 @@
+"""
+Bounded replacement for MemorySaver.
+
+MemorySaver keeps every checkpoint of every thread for the lifetime of the
+process. BoundedMemorySaver stores the same data, but:
+  - keeps only the latest `keep_checkpoints` checkpoints per thread (older
+    checkpoints, their pending writes and the channel values only they use are dropped)
+  - evicts the least recently used threads once there are more than
+    `max_threads` threads or the stored data is above `max_bytes`
+  - optionally spills evicted threads to `spill_dir` and loads them back the
+    next time the thread is used (also after a restart)
+
+Usage:
+
+    memory = BoundedMemorySaver(keep_checkpoints=10, max_threads=1000)
+    graph = builder.compile(checkpointer=memory)
+    print(memory.stats())
+
+Note: get_state_history() (and time travel) only reach back `keep_checkpoints` checkpoints.
+"""
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+# Rough bookkeeping cost of one stored entry (dict slot, tuple, key) on top of its payload
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class _ThreadStore:
+    """Everything stored for one thread, so a thread can be evicted or spilled as a whole."""
+
+    def __init__(self):
+        self.checkpoints: dict = {}  # ns -> {checkpoint id -> (checkpoint, metadata, parent id)}
+        self.versions: dict = {}  # (ns, checkpoint id) -> channel versions of that checkpoint
+        self.writes: dict = {}  # (ns, checkpoint id) -> {(task id, idx) -> (task id, channel, value, task path)}
+        self.blobs: dict = {}  # (ns, channel, version) -> serialized value
+        self.nbytes = 0
+
+
+def _typed_size(typed: tuple) -> int:
+    return len(typed[1]) + ENTRY_OVERHEAD_BYTES
+
+
+class BoundedMemorySaver(BaseCheckpointSaver[str]):
+    """In-memory checkpointer with per-thread retention and LRU thread eviction."""
+
+    def __init__(
+        self,
+        *,
+        keep_checkpoints: Optional[int] = 10,
+        max_threads: Optional[int] = 1000,
+        max_bytes: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            keep_checkpoints: Checkpoints kept per thread (and namespace), None keeps all.
+            max_threads: Threads kept in memory, None for no limit.
+            max_bytes: Approximate size limit of the stored data, None for no limit.
+            spill_dir: Folder evicted threads are written to, None drops them.
+            serde: Serializer, as for MemorySaver.
+        """
+        super().__init__(serde=serde)
+        if keep_checkpoints is not None and keep_checkpoints < 1:
+            raise ValueError("keep_checkpoints must be at least 1")
+        self.keep_checkpoints = keep_checkpoints
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._threads: OrderedDict = OrderedDict()  # thread id -> _ThreadStore, least recently used first
+        self._lock = threading.RLock()
+        self._nbytes = 0
+        self._checkpoint_count = 0
+        self._counters = dict.fromkeys(
+            ("pruned_checkpoints", "evicted_threads", "spilled_threads", "restored_threads"), 0
+        )
+
+    # --- thread bookkeeping ---
+
+    def _spill_path(self, thread_id: str) -> str:
+        name = hashlib.sha256(str(thread_id).encode()).hexdigest()[:32]
+        return os.path.join(self.spill_dir, f"{name}.pkl")
+
+    def _get_store(self, thread_id: str, create: bool = False) -> Optional[_ThreadStore]:
+        store = self._threads.get(thread_id)
+        if store is None and self.spill_dir:
+            path = self._spill_path(thread_id)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    store = pickle.load(f)
+                os.remove(path)
+                self._counters["restored_threads"] += 1
+                self._add_store(thread_id, store)
+                self._evict(thread_id)
+        if store is None and create:
+            store = _ThreadStore()
+            self._threads[thread_id] = store
+        if store is not None:
+            self._threads.move_to_end(thread_id)
+        return store
+
+    def _add_store(self, thread_id: str, store: _ThreadStore):
+        self._threads[thread_id] = store
+        self._nbytes += store.nbytes
+        self._checkpoint_count += sum(len(c) for c in store.checkpoints.values())
+
+    def _drop_store(self, thread_id: str) -> _ThreadStore:
+        store = self._threads.pop(thread_id)
+        self._nbytes -= store.nbytes
+        self._checkpoint_count -= sum(len(c) for c in store.checkpoints.values())
+        return store
+
+    def _add_bytes(self, store: _ThreadStore, nbytes: int):
+        store.nbytes += nbytes
+        self._nbytes += nbytes
+
+    def _evict(self, keep_thread_id: str):
+        """Evicts least recently used threads (never `keep_thread_id`) until within the limits."""
+        while len(self._threads) > 1 and (
+            (self.max_threads is not None and len(self._threads) > self.max_threads)
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            thread_id = next(iter(self._threads))
+            if thread_id == keep_thread_id:
+                self._threads.move_to_end(thread_id)
+                thread_id = next(iter(self._threads))
+            store = self._drop_store(thread_id)
+            self._counters["evicted_threads"] += 1
+            if self.spill_dir:
+                tmp_path = self._spill_path(thread_id) + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._spill_path(thread_id))
+                self._counters["spilled_threads"] += 1
+
+    def _prune(self, store: _ThreadStore, checkpoint_ns: str):
+        """Keeps the latest `keep_checkpoints` checkpoints of a namespace, with only the data they need."""
+        checkpoints = store.checkpoints[checkpoint_ns]
+        if self.keep_checkpoints is None or len(checkpoints) <= self.keep_checkpoints:
+            return
+
+        freed = 0
+        # Checkpoint ids increase over time, the oldest sort first
+        for checkpoint_id in sorted(checkpoints)[: len(checkpoints) - self.keep_checkpoints]:
+            checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+            freed += _typed_size(checkpoint) + _typed_size(metadata)
+            store.versions.pop((checkpoint_ns, checkpoint_id), None)
+            for _, _, value, _ in store.writes.pop((checkpoint_ns, checkpoint_id), {}).values():
+                freed += _typed_size(value)
+            self._checkpoint_count -= 1
+            self._counters["pruned_checkpoints"] += 1
+
+        # Channel values no remaining checkpoint of this namespace refers to
+        used = {
+            (channel, version)
+            for (ns, _), versions in store.versions.items()
+            if ns == checkpoint_ns
+            for channel, version in versions.items()
+        }
+        for key in [k for k in store.blobs if k[0] == checkpoint_ns and (k[1], k[2]) not in used]:
+            freed += self._blob_size(store.blobs.pop(key))
+        self._add_bytes(store, -freed)
+
+    # --- channel values (subclasses can store them differently) ---
+
+    def _dumps_blob(self, value: Any) -> tuple:
+        return self.serde.dumps_typed(value)
+
+    def _loads_blob(self, blob: tuple) -> Any:
+        return self.serde.loads_typed(blob)
+
+    def _blob_size(self, blob: tuple) -> int:
+        return _typed_size(blob)
+
+    # --- reading ---
+
+    def _load_blobs(self, store: _ThreadStore, checkpoint_ns: str, versions: ChannelVersions) -> dict:
+        channel_values = {}
+        for channel, version in versions.items():
+            value = store.blobs.get((checkpoint_ns, channel, version))
+            if value is not None and value[0] != "empty":
+                channel_values[channel] = self._loads_blob(value)
+        return channel_values
+
+    def _make_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, store: _ThreadStore,
+                    metadata: Optional[dict] = None) -> CheckpointTuple:
+        checkpoint, metadata_b, parent_checkpoint_id = store.checkpoints[checkpoint_ns][checkpoint_id]
+        writes = store.writes.get((checkpoint_ns, checkpoint_id), {}).values()
+        sends = []
+        if parent_checkpoint_id:
+            sends = sorted(
+                ((*w, k[1]) for k, w in store.writes.get((checkpoint_ns, parent_checkpoint_id), {}).items()
+                 if w[1] == TASKS),
+                key=lambda w: (w[3], w[0], w[4]),
+            )
+        checkpoint_: Checkpoint = self.serde.loads_typed(checkpoint)
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint_,
+                "channel_values": self._load_blobs(store, checkpoint_ns, checkpoint_["channel_versions"]),
+                "pending_sends": [self.serde.loads_typed(s[2]) for s in sends],
+            },
+            metadata=metadata if metadata is not None else self.serde.loads_typed(metadata_b),
+            pending_writes=[(task_id, c, self.serde.loads_typed(v)) for task_id, c, v, _ in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            store = self._get_store(thread_id)
+            if store is None or not store.checkpoints.get(checkpoint_ns):
+                return None
+            checkpoints = store.checkpoints[checkpoint_ns]
+            checkpoint_id = get_checkpoint_id(config) or max(checkpoints)
+            if checkpoint_id not in checkpoints:
+                return None
+            return self._make_tuple(thread_id, checkpoint_ns, checkpoint_id, store)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Lists checkpoints, newest first. Without a config only threads currently in memory are listed."""
+        with self._lock:
+            if config:
+                thread_ids = [config["configurable"]["thread_id"]]
+                self._get_store(thread_ids[0])
+            else:
+                thread_ids = list(self._threads)
+            config_checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+            config_checkpoint_id = get_checkpoint_id(config) if config else None
+            before_checkpoint_id = get_checkpoint_id(before) if before else None
+
+            results = []
+            for thread_id in thread_ids:
+                store = self._threads.get(thread_id)
+                if store is None:
+                    continue
+                for checkpoint_ns, checkpoints in store.checkpoints.items():
+                    if config_checkpoint_ns is not None and checkpoint_ns != config_checkpoint_ns:
+                        continue
+                    for checkpoint_id in sorted(checkpoints, reverse=True):
+                        if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                            continue
+                        if before_checkpoint_id and checkpoint_id >= before_checkpoint_id:
+                            continue
+                        metadata = self.serde.loads_typed(checkpoints[checkpoint_id][1])
+                        if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                            continue
+                        if limit is not None and len(results) >= limit:
+                            break
+                        results.append(self._make_tuple(thread_id, checkpoint_ns, checkpoint_id, store, metadata))
+        yield from results
+
+    # --- writing ---
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: dict[str, Any] = c.pop("channel_values")
+
+        with self._lock:
+            store = self._get_store(thread_id, create=True)
+            added = 0
+            for channel, version in new_versions.items():
+                blob = self._dumps_blob(values[channel]) if channel in values else ("empty", b"")
+                previous = store.blobs.get((checkpoint_ns, channel, version))
+                added += self._blob_size(blob) - (self._blob_size(previous) if previous else 0)
+                store.blobs[(checkpoint_ns, channel, version)] = blob
+
+            checkpoints = store.checkpoints.setdefault(checkpoint_ns, {})
+            entry = (
+                self.serde.dumps_typed(c),
+                self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                config["configurable"].get("checkpoint_id"),  # parent
+            )
+            if checkpoint["id"] in checkpoints:
+                old = checkpoints[checkpoint["id"]]
+                added -= _typed_size(old[0]) + _typed_size(old[1])
+            else:
+                self._checkpoint_count += 1
+            checkpoints[checkpoint["id"]] = entry
+            store.versions[(checkpoint_ns, checkpoint["id"])] = dict(checkpoint["channel_versions"])
+            self._add_bytes(store, added + _typed_size(entry[0]) + _typed_size(entry[1]))
+
+            self._prune(store, checkpoint_ns)
+            self._evict(thread_id)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            store = self._get_store(thread_id, create=True)
+            outer_writes = store.writes.setdefault((checkpoint_ns, checkpoint_id), {})
+            added = 0
+            for idx, (channel, value) in enumerate(writes):
+                inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if inner_key[1] >= 0 and inner_key in outer_writes:
+                    continue
+                if inner_key in outer_writes:
+                    added -= _typed_size(outer_writes[inner_key][2])
+                typed = self.serde.dumps_typed(value)
+                outer_writes[inner_key] = (task_id, channel, typed, task_path)
+                added += _typed_size(typed)
+            self._add_bytes(store, added)
+            self._evict(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            if thread_id in self._threads:
+                self._drop_store(thread_id)
+            if self.spill_dir and os.path.exists(self._spill_path(thread_id)):
+                os.remove(self._spill_path(thread_id))
+
+    # Same version scheme as MemorySaver
+    get_next_version = InMemorySaver.get_next_version
+
+    # --- async versions (everything is in memory, so they just call the sync methods) ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    # --- statistics ---
+
+    def stats(self) -> dict:
+        """Returns the memory footprint (threads, checkpoints, approximate bytes) and eviction counters."""
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "checkpoints": self._checkpoint_count,
+                "bytes": self._nbytes,
+                "keep_checkpoints": self.keep_checkpoints,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                **self._counters,
+            }
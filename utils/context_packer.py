@@ -0,0 +1,230 @@
+"""
+Relevance-ranked context within a token budget for the answer node of script 8.
+
+The search nodes return whole documents (full Wikipedia pages and the web
+results, which often quote the same pages), and sending all of them makes the
+answer prompt large and slow. ContextPacker builds the context instead:
+  - splits every document into passages of about `passage_tokens` tokens
+    (whole paragraphs when they fit, else sentences)
+  - drops duplicate and near-duplicate passages (word 3-gram overlap of at
+    least `dedup_threshold`), keeping the first one
+  - scores the passages against the question with BM25
+  - adds the best passages while they fit in `max_tokens`, and writes them
+    back in document order under their document's header
+
+Usage:
+
+    context_packer = ContextPacker(max_tokens=1500)
+
+    def select_context(state):
+        return {"selected_context": context_packer.pack(state["question"], state["context"])}
+"""
+import re
+import math
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from utils.token_counter import load_encoder
+
+# The format of the search nodes: <Document href="..."/>\n...\n</Document>, joined by ---
+DOCUMENT_PATTERN = re.compile(r"<Document(?P<header>[^>]*?)/>\n(?P<content>.*?)\n</Document>", re.S)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Words that match any passage and say nothing about the question
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "by", "as", "at", "from", "is", "are",
+    "was", "were", "be", "it", "its", "this", "that", "what", "which", "who", "how", "why", "when", "where",
+    "tell", "me", "about", "please", "can", "you", "do", "does", "i",
+}
+
+
+def terms(text: str) -> list:
+    """Lowercased words of `text` without stop words."""
+    return [w for w in re.findall(r"\w+", text.casefold()) if w not in STOP_WORDS]
+
+
+@dataclass
+class Passage:
+    """A piece of a document and its place in the context."""
+
+    document: int  # index of the document in the context
+    position: int  # index of the passage in its document
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+def parse_documents(context: list) -> list:
+    """
+    Returns the documents of the search nodes' output as (header, content) pairs.
+
+    Text that is not wrapped in <Document> tags is returned as one document with an empty header.
+    """
+    documents = []
+    for block in context:
+        found = [(m.group("header"), m.group("content")) for m in DOCUMENT_PATTERN.finditer(block)]
+        documents.extend(found or [("", block)])
+    return documents
+
+
+def split_passages(text: str, max_tokens: int, count: Callable[[str], int]) -> list:
+    """
+    Splits `text` into passages of at most about `max_tokens` tokens.
+
+    Paragraphs are packed together while they fit, longer paragraphs are split between sentences
+    (a single sentence longer than `max_tokens` stays whole).
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(s for s in SENTENCE_END.split(paragraph) if s)
+
+    passages, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = count(piece)
+        if current and current_tokens + tokens > max_tokens:
+            passages.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def _shingles(words: list) -> set:
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+class ContextPacker:
+    """Chunks, deduplicates and BM25-ranks search documents into a token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        passage_tokens: int = 120,
+        dedup_threshold: float = 0.8,
+        k1: float = 1.5,
+        b: float = 0.75,
+        encoder: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Args:
+            max_tokens: Token budget of the packed context (document headers included).
+            passage_tokens: Target size of a passage.
+            dedup_threshold: Share of word 3-grams two passages must have in common to count as duplicates.
+            k1: BM25 term frequency saturation.
+            b: BM25 length normalization.
+            encoder: Function that counts the tokens of a string (tiktoken or an estimate by default).
+        """
+        self.max_tokens = max_tokens
+        self.passage_tokens = passage_tokens
+        self.dedup_threshold = dedup_threshold
+        self.k1 = k1
+        self.b = b
+        self.count = encoder or load_encoder()
+        self._lock = threading.Lock()
+        self.last_stats: dict = {}
+
+    # --- stages ---
+
+    def chunk(self, documents: list) -> list:
+        """Splits the (header, content) documents into Passages."""
+        return [
+            Passage(document=d, position=p, text=text, tokens=self.count(text))
+            for d, (_, content) in enumerate(documents)
+            for p, text in enumerate(split_passages(content, self.passage_tokens, self.count))
+        ]
+
+    def deduplicate(self, passages: list) -> list:
+        """Drops passages whose 3-grams mostly appear in an earlier kept passage (exact copies included)."""
+        kept, kept_shingles, seen_text = [], [], set()
+        for passage in passages:
+            key = " ".join(passage.text.casefold().split())
+            if key in seen_text:
+                continue
+            shingles = _shingles(re.findall(r"\w+", key))
+            if any(len(shingles & other) >= self.dedup_threshold * min(len(shingles), len(other))
+                   for other in kept_shingles):
+                continue
+            seen_text.add(key)
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept
+
+    def score(self, question: str, passages: list) -> list:
+        """Sets the BM25 score of every passage for the question and returns the passages."""
+        query = set(terms(question))
+        if not passages or not query:
+            return passages
+        passage_terms = [Counter(terms(p.text)) for p in passages]
+        lengths = [sum(t.values()) for t in passage_terms]
+        average_length = sum(lengths) / len(lengths) or 1.0
+        n = len(passages)
+        idf = {}
+        for term in query:
+            df = sum(1 for t in passage_terms if term in t)
+            idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for passage, counts, length in zip(passages, passage_terms, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            passage.score = sum(idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                                for term in query if counts[term])
+        return passages
+
+    def select(self, passages: list, headers: list) -> list:
+        """Returns the best scored passages that fit in the budget, in document order."""
+        ranked = sorted(passages, key=lambda p: (-p.score, p.document, p.position))
+        if ranked and ranked[0].score > 0:
+            ranked = [p for p in ranked if p.score > 0]  # nothing that doesn't match the question
+        header_tokens = {d: self.count(f"<Document{h}/>\n\n</Document>\n\n---\n\n") for d, h in enumerate(headers)}
+        selected, used, opened = [], 0, set()
+        for passage in ranked:
+            cost = passage.tokens + (0 if passage.document in opened else header_tokens[passage.document])
+            if used + cost > self.max_tokens:
+                continue  # a shorter passage further down may still fit
+            selected.append(passage)
+            opened.add(passage.document)
+            used += cost
+        return sorted(selected, key=lambda p: (p.document, p.position))
+
+    # --- all together ---
+
+    def pack(self, question: str, context: list) -> str:
+        """
+        Returns the context for the answer prompt: the passages of `context` most relevant to the question.
+
+        Args:
+            question: The user's question.
+            context: The search nodes' output (formatted documents).
+        """
+        start = time.perf_counter()
+        documents = parse_documents(context)
+        passages = self.chunk(documents)
+        unique = self.deduplicate(passages)
+        selected = self.select(self.score(question, unique), [h for h, _ in documents])
+
+        by_document: dict = {}
+        for passage in selected:
+            by_document.setdefault(passage.document, []).append(passage.text)
+        packed = "\n\n---\n\n".join(
+            f"<Document{documents[d][0]}/>\n" + "\n\n".join(texts) + "\n</Document>" for d, texts in by_document.items()
+        )
+        with self._lock:
+            self.last_stats = {
+                "documents": len(documents),
+                "passages": len(passages),
+                "duplicates": len(passages) - len(unique),
+                "selected": len(selected),
+                "tokens_before": self.count("\n\n---\n\n".join(context)),
+                "tokens_after": self.count(packed),
+                "seconds": time.perf_counter() - start,
+            }
+        return packed
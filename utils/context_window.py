@@ -0,0 +1,85 @@
+"""
+Token-budgeted prompt assembly for the assistant nodes.
+
+`[sys_msg] + state["messages"]` grows with every turn of a thread. ContextWindow
+builds the prompt within a token budget instead:
+  - the system message is always kept
+  - the current turn (the latest human message and everything after it, i.e. the
+    pending tool calls and their results) is always kept whole
+  - older turns are added newest first, as long as they fit
+
+Turns are never split, so a tool call is never sent without its tool results
+(or the other way round), which the OpenAI API rejects.
+
+Usage:
+
+    context_window = ContextWindow(max_tokens=4000)
+
+    def assistant(state: MessagesState):
+        return {"messages": [llm_with_tools.invoke(context_window.build_prompt(sys_msg, state["messages"]))]}
+"""
+from typing import Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from utils.token_counter import TokenCounter
+
+
+def split_turns(messages: list) -> list:
+    """Splits a message history into turns, each starting at a HumanMessage."""
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class ContextWindow:
+    """Selects the messages sent to the LLM so the prompt stays within `max_tokens`."""
+
+    def __init__(self, max_tokens: int = 4000, counter: Optional[TokenCounter] = None):
+        """
+        Args:
+            max_tokens: Token budget of the prompt (system message included).
+            counter: TokenCounter to use, share one to share its cache.
+        """
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+        self.last_prompt_tokens = 0
+        self.last_dropped_messages = 0
+
+    def select(self, messages: list, reserved_tokens: int = 0) -> list:
+        """
+        Returns the most recent whole turns of `messages` that fit in the budget.
+
+        Args:
+            messages: The full message history.
+            reserved_tokens: Tokens already used by other parts of the prompt (e.g. the system message).
+        """
+        turns = split_turns(messages)
+        if not turns:
+            self.last_prompt_tokens, self.last_dropped_messages = reserved_tokens, 0
+            return []
+
+        # The current turn is always sent, even if it alone is over the budget
+        selected = [turns[-1]]
+        used = reserved_tokens + self.counter.count_messages(turns[-1])
+        for turn in reversed(turns[:-1]):
+            tokens = self.counter.count_messages(turn)
+            if used + tokens > self.max_tokens:
+                break
+            selected.append(turn)
+            used += tokens
+
+        window = [message for turn in reversed(selected) for message in turn]
+        self.last_prompt_tokens = used
+        self.last_dropped_messages = len(messages) - len(window)
+        return window
+
+    def build_prompt(self, system_message: Optional[BaseMessage], messages: list) -> list:
+        """Returns `[system_message] + <the most recent turns that fit>`."""
+        if system_message is None:
+            return self.select(messages)
+        reserved = self.counter.count_message(system_message)
+        return [system_message] + self.select(messages, reserved_tokens=reserved)
@@ -0,0 +1,105 @@
+"""
+Runs a state-update node (e.g. summarization) in the background after a turn.
+
+Normally a node such as summarize_conversation runs inside the user's turn, so
+the user waits for it. DeferredNodeRunner lets the graph end right after the
+reply, and then runs the node on a worker thread. The node gets a snapshot of
+the thread's state and its update is applied with graph.update_state(...).
+
+To keep the update and the next user turn from colliding:
+  - every turn and every update of a thread run under that thread's lock, so
+    they never write checkpoints at the same time; the slow part (the node's
+    LLM call) runs outside the lock
+  - at most one background run per thread is pending at a time
+  - the node's update must still be right when messages were added after the
+    snapshot: RemoveMessage(id=...) only deletes the messages it names, and
+    fields with an add reducer (like message_tokens) take deltas
+
+Usage:
+
+    summarizer = DeferredNodeRunner(graph, summarize_conversation, should_run=needs_summary)
+    result = summarizer.invoke({"messages": messages}, config)   # returns before summarizing
+    ...
+    summarizer.close()   # waits for pending runs
+"""
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+
+class DeferredNodeRunner:
+    """Runs a node after each turn on a worker thread and merges its update into the thread's state."""
+
+    def __init__(self, graph, node: Callable[[dict], dict], should_run: Callable[[dict], bool],
+                 as_node: Optional[str] = None, max_workers: int = 1):
+        """
+        Args:
+            graph: Compiled graph with a checkpointer.
+            node: Function that takes the state and returns an update (like a graph node).
+            should_run: Decides from the state after a turn whether the node should run.
+            as_node: Node name the update is applied as (default: the function name).
+            max_workers: Number of worker threads (runs of different threads can overlap).
+        """
+        self.graph = graph
+        self.node = node
+        self.should_run = should_run
+        self.as_node = as_node or node.__name__
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deferred-node")
+        self._locks: defaultdict = defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
+        self._pending: dict = {}  # thread id -> future
+        self.completed = 0
+        self.errors = 0
+
+    def _lock(self, thread_id: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks[thread_id]
+
+    def invoke(self, input: Any, config: RunnableConfig) -> dict:
+        """Runs one turn and, when should_run says so, schedules the node for after it."""
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock(thread_id):
+            result = self.graph.invoke(input, config)
+        self.schedule(config, result)
+        return result
+
+    def schedule(self, config: RunnableConfig, state: dict) -> bool:
+        """Schedules the node for the thread if should_run(state) and none is pending. Returns whether it did."""
+        thread_id = config["configurable"]["thread_id"]
+        with self._locks_lock:
+            pending = self._pending.get(thread_id)
+            if (pending is not None and not pending.done()) or not self.should_run(state):
+                return False
+            config = {"configurable": {k: v for k, v in config["configurable"].items() if k != "checkpoint_id"}}
+            self._pending[thread_id] = self._executor.submit(self._run, config)
+        return True
+
+    def _run(self, config: RunnableConfig):
+        thread_id = config["configurable"]["thread_id"]
+        try:
+            # The node works on a snapshot; turns may add messages meanwhile
+            snapshot = self.graph.get_state(config)
+            if not self.should_run(snapshot.values):
+                return
+            update = self.node(snapshot.values)
+            with self._lock(thread_id):
+                self.graph.update_state(config, update, as_node=self.as_node)
+            self.completed += 1
+        except Exception:
+            self.errors += 1
+            raise
+
+    def wait(self, thread_id: Optional[str] = None):
+        """Waits for the pending run of one thread (or of all threads)."""
+        with self._locks_lock:
+            futures = [f for t, f in self._pending.items() if thread_id is None or t == thread_id]
+        for future in futures:
+            future.exception()
+
+    def close(self):
+        """Waits for pending runs and stops the worker threads."""
+        self.wait()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,276 @@
+"""
+Delta-encoded checkpoints for MessagesState graphs.
+
+Every checkpoint normally stores the whole message list, so a thread of n
+messages writes all n again on every step. DeltaCheckpointSaver wraps any
+checkpointer (MemorySaver, BoundedMemorySaver, MongoDBSaver,
+AsyncMongoDBSaver, ...) and stores the messages channel as a delta against
+the parent checkpoint instead:
+    {"base": <parent checkpoint id>, "removed": [ids], "replaced": [messages], "appended": [messages]}
+Reads rebuild the full list by replaying the deltas back to the last full
+snapshot. A full snapshot is written at least every `snapshot_every` steps,
+which bounds the replay, and recently rebuilt lists are cached in memory.
+
+Usage:
+
+    memory = DeltaCheckpointSaver(MongoDBSaver(mongodb_client))
+    graph = builder.compile(checkpointer=memory)
+
+With BoundedMemorySaver, keep_checkpoints must be larger than snapshot_every,
+otherwise the base of a delta can be pruned. list() skips the oldest kept
+checkpoints whose deltas can no longer be replayed.
+"""
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+# Marks a channel value as a delta (a plain dict, so every serializer can store it)
+DELTA_KEY = "__messages_delta__"
+
+
+class MissingBaseCheckpointError(Exception):
+    """Raised when the checkpoint a delta is based on no longer exists."""
+
+
+def diff_messages(old: list, new: list) -> Optional[dict]:
+    """
+    Describes `new` as changes to `old`: removed ids, replaced messages (same id) and appended messages.
+
+    Returns None when `new` cannot be expressed that way (e.g. reordered messages or missing ids).
+    """
+    if any(m.id is None for m in old) or any(m.id is None for m in new):
+        return None
+    new_ids = {m.id for m in new}
+    kept = [m for m in old if m.id in new_ids]
+    if len(kept) > len(new):
+        return None
+
+    replaced = []
+    for old_message, new_message in zip(kept, new):
+        if old_message.id != new_message.id:
+            return None
+        if old_message is not new_message and old_message != new_message:
+            replaced.append(new_message)
+
+    return {
+        "removed": [m.id for m in old if m.id not in new_ids],
+        "replaced": replaced,
+        "appended": new[len(kept):],
+    }
+
+
+def apply_delta(old: list, delta: dict) -> list:
+    """Rebuilds the new message list from the old one and a delta made by diff_messages."""
+    removed = set(delta["removed"])
+    replaced = {m.id: m for m in delta["replaced"]}
+    return [replaced.get(m.id, m) for m in old if m.id not in removed] + list(delta["appended"])
+
+
+def _is_delta(value) -> bool:
+    return isinstance(value, dict) and value.get(DELTA_KEY) is True
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver):
+    """Wraps a checkpointer and stores the messages channel as deltas between checkpoints."""
+
+    def __init__(self, saver: BaseCheckpointSaver, *, channel: str = "messages",
+                 snapshot_every: int = 20, cache_size: int = 256) -> None:
+        """
+        Args:
+            saver: The checkpointer that actually stores the checkpoints.
+            channel: State key holding the message list.
+            snapshot_every: Maximum number of steps between two full snapshots of the list.
+            cache_size: Number of rebuilt message lists kept in memory.
+        """
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.channel = channel
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()  # (thread id, ns, checkpoint id) -> (messages, snapshot step)
+        self._lock = threading.Lock()
+
+    @property
+    def config_specs(self):
+        return self.saver.config_specs
+
+    # --- cache ---
+
+    def _cache_get(self, key: tuple):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key: tuple, messages: list, snapshot_step: int):
+        with self._lock:
+            self._cache[key] = (messages, snapshot_step)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> tuple:
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable.get("checkpoint_id")
+
+    @staticmethod
+    def _base_config(key: tuple, checkpoint_id: str) -> RunnableConfig:
+        return {"configurable": {"thread_id": key[0], "checkpoint_ns": key[1], "checkpoint_id": checkpoint_id}}
+
+    # --- encoding ---
+
+    def _encode(self, checkpoint: Checkpoint, metadata: CheckpointMetadata, parent) -> tuple:
+        """Returns (checkpoint to store, snapshot step) given the parent's (messages, snapshot step) or None."""
+        messages = checkpoint["channel_values"][self.channel]
+        step = metadata.get("step", 0)
+        if parent is not None and step - parent[1] < self.snapshot_every:
+            delta = diff_messages(parent[0], messages)
+            if delta is not None:
+                delta.update({DELTA_KEY: True, "base": parent[2], "snapshot_step": parent[1]})
+                values = {**checkpoint["channel_values"], self.channel: delta}
+                return {**checkpoint, "channel_values": values}, parent[1]
+        return checkpoint, step
+
+    def _decoded(self, saved: CheckpointTuple, messages: Optional[list]) -> CheckpointTuple:
+        if messages is None:
+            return saved
+        values = {**saved.checkpoint["channel_values"], self.channel: list(messages)}
+        return saved._replace(checkpoint={**saved.checkpoint, "channel_values": values})
+
+    def _resolve(self, saved: Optional[CheckpointTuple]) -> Optional[tuple]:
+        """Returns (messages, snapshot step) of a stored checkpoint, replaying deltas as needed."""
+        if saved is None or self.channel not in saved.checkpoint["channel_values"]:
+            return None
+        key = self._key(saved.config)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        value = saved.checkpoint["channel_values"][self.channel]
+        if not _is_delta(value):
+            result = (value, saved.metadata.get("step", 0))
+        else:
+            base = self._resolve(self.saver.get_tuple(self._base_config(key, value["base"])))
+            if base is None:
+                raise MissingBaseCheckpointError(f"Base checkpoint {value['base']} of {key} not found.")
+            result = (apply_delta(base[0], value), value["snapshot_step"])
+        self._cache_put(key, *result)
+        return result
+
+    async def _aresolve(self, saved: Optional[CheckpointTuple]) -> Optional[tuple]:
+        if saved is None or self.channel not in saved.checkpoint["channel_values"]:
+            return None
+        key = self._key(saved.config)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        value = saved.checkpoint["channel_values"][self.channel]
+        if not _is_delta(value):
+            result = (value, saved.metadata.get("step", 0))
+        else:
+            base = await self._aresolve(await self.saver.aget_tuple(self._base_config(key, value["base"])))
+            if base is None:
+                raise MissingBaseCheckpointError(f"Base checkpoint {value['base']} of {key} not found.")
+            result = (apply_delta(base[0], value), value["snapshot_step"])
+        self._cache_put(key, *result)
+        return result
+
+    def _parent(self, config: RunnableConfig, parent_state) -> Optional[tuple]:
+        if parent_state is None:
+            return None
+        return (*parent_state, config["configurable"]["checkpoint_id"])
+
+    # --- BaseCheckpointSaver ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        saved = self.saver.get_tuple(config)
+        resolved = self._resolve(saved)
+        return self._decoded(saved, resolved[0] if resolved else None)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        for saved in self.saver.list(config, filter=filter, before=before, limit=limit):
+            try:
+                resolved = self._resolve(saved)
+            except MissingBaseCheckpointError:
+                continue  # older than what the wrapped saver still keeps (e.g. pruned by BoundedMemorySaver)
+            yield self._decoded(saved, resolved[0] if resolved else None)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        if self.channel not in checkpoint["channel_values"]:
+            return self.saver.put(config, checkpoint, metadata, new_versions)
+
+        parent = None
+        if config["configurable"].get("checkpoint_id"):
+            state = self._cache_get(self._key(config)) or self._resolve(self.saver.get_tuple(config))
+            parent = self._parent(config, state)
+        stored, snapshot_step = self._encode(checkpoint, metadata, parent)
+        next_config = self.saver.put(config, stored, metadata, new_versions)
+        self._cache_put(self._key(next_config), checkpoint["channel_values"][self.channel], snapshot_step)
+        return next_config
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        return self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == thread_id]:
+                del self._cache[key]
+        return self.saver.delete_thread(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        saved = await self.saver.aget_tuple(config)
+        resolved = await self._aresolve(saved)
+        return self._decoded(saved, resolved[0] if resolved else None)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        async for saved in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            try:
+                resolved = await self._aresolve(saved)
+            except MissingBaseCheckpointError:
+                continue
+            yield self._decoded(saved, resolved[0] if resolved else None)
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        if self.channel not in checkpoint["channel_values"]:
+            return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+        parent = None
+        if config["configurable"].get("checkpoint_id"):
+            state = self._cache_get(self._key(config)) or await self._aresolve(await self.saver.aget_tuple(config))
+            parent = self._parent(config, state)
+        stored, snapshot_step = self._encode(checkpoint, metadata, parent)
+        next_config = await self.saver.aput(config, stored, metadata, new_versions)
+        self._cache_put(self._key(next_config), checkpoint["channel_values"][self.channel], snapshot_step)
+        return next_config
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        return await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == thread_id]:
+                del self._cache[key]
+        return await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
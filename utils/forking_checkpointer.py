@@ -0,0 +1,227 @@
+"""
+Copy-on-write checkpoints for edit-and-resume and time travel.
+
+Every update_state() (an edit at a breakpoint, or a fork from an older
+checkpoint) writes a checkpoint with its own serialized copy of the whole
+message history, so editing one message of a 500-message thread stores 500
+messages again. ForkingMemorySaver is a BoundedMemorySaver that stores a list
+of messages (or a MessageWindow) as a tuple of per-message blobs instead:
+  - every message is serialized, and when the bytes are the same as a blob
+    stored before (the message was passed on unchanged), that blob is shared
+    instead of keeping another copy
+  - so a fork of an old checkpoint only stores its new and edited messages
+  - loading a checkpoint deserializes fresh message objects, so a message
+    changed in place (e.g. taken from get_state() and edited for
+    update_state()) never changes another checkpoint
+It can also list the branches of a thread and diff two checkpoints by
+comparing the shared blobs, without deserializing the common parts.
+
+Usage:
+
+    memory = ForkingMemorySaver(keep_checkpoints=None)
+    graph = builder.compile(checkpointer=memory)
+    ...
+    graph.update_state(old_config, {"messages": HumanMessage(content="edited", id=message_id)})
+    for branch in memory.branches(thread_id):
+        print(branch.checkpoint_id, branch.fork_point, branch.messages)
+    print(memory.diff(config_a, config_b).only_b)
+"""
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import get_checkpoint_id
+
+from utils.bounded_checkpointer import BoundedMemorySaver, ENTRY_OVERHEAD_BYTES
+from utils.message_window import MessageWindow
+
+# Blob type of a copy-on-write message list
+SHARED_MESSAGES = "shared-messages"
+
+
+class _SharedMessages:
+    """Stored message list: one serialized blob per message, shared with other checkpoints."""
+
+    __slots__ = ("blobs", "window", "owned_bytes")
+
+    def __init__(self, blobs: tuple, window: bool, owned_bytes: int):
+        self.blobs = blobs  # tuple of (type, bytes), in message order
+        self.window = window  # rebuild a MessageWindow instead of a list
+        self.owned_bytes = owned_bytes  # bytes of the messages first serialized for this list
+
+
+@dataclass
+class Branch:
+    """The head of a branch of a thread's checkpoint tree."""
+
+    checkpoint_id: str
+    fork_point: Optional[str]  # the checkpoint it branched off from, None for the main line
+    checkpoints: int  # checkpoints since the fork point
+    messages: Optional[int]  # messages at the head (None when not stored as a shared list)
+    config: dict = field(default_factory=dict)
+
+
+@dataclass
+class BranchDiff:
+    """Difference of the message lists of two checkpoints."""
+
+    common: int  # number of leading messages both share
+    common_tail: int  # number of trailing messages both share (after the common head)
+    only_a: list  # messages of `a` in between
+    only_b: list  # messages of `b` in between
+
+
+class ForkingMemorySaver(BoundedMemorySaver):
+    """BoundedMemorySaver whose checkpoints share unchanged messages."""
+
+    def __init__(self, *, max_cached_messages: int = 100_000, **kwargs):
+        """
+        Args:
+            max_cached_messages: Message blobs kept for sharing with later checkpoints (least recently
+                used are dropped; a dropped blob stays in its checkpoints, it is just not shared any more).
+            **kwargs: As for BoundedMemorySaver (keep_checkpoints, max_threads, max_bytes, spill_dir, serde).
+        """
+        super().__init__(**kwargs)
+        self.max_cached_messages = max_cached_messages
+        self._blobs: OrderedDict = OrderedDict()  # (type, bytes) -> the stored blob, least recently used first
+        self._counters.update(shared_messages=0, stored_messages=0)
+
+    # --- message blobs ---
+
+    def _share(self, blob: tuple) -> tuple:
+        """Returns (stored blob with the same bytes, bytes it adds). Caller holds the lock."""
+        shared = self._blobs.get(blob)
+        if shared is not None:
+            self._blobs.move_to_end(blob)
+            self._counters["shared_messages"] += 1
+            return shared, 0
+        self._blobs[blob] = blob
+        if len(self._blobs) > self.max_cached_messages:
+            self._blobs.popitem(last=False)
+        self._counters["stored_messages"] += 1
+        return blob, len(blob[1])
+
+    def _dumps_blob(self, value: Any) -> tuple:
+        is_window = isinstance(value, MessageWindow)
+        if not (is_window or (isinstance(value, list) and value and all(isinstance(m, BaseMessage) for m in value))):
+            return super()._dumps_blob(value)
+        # Compared by bytes, so a message edited in place is stored again even though it is the same object
+        serialized = [self.serde.dumps_typed(message) for message in value]
+        blobs, owned = [], 0
+        with self._lock:
+            for blob in serialized:
+                blob, nbytes = self._share(blob)
+                blobs.append(blob)
+                owned += nbytes
+        return SHARED_MESSAGES, _SharedMessages(tuple(blobs), is_window, owned)
+
+    def _loads_blob(self, blob: tuple) -> Any:
+        if blob[0] != SHARED_MESSAGES:
+            return super()._loads_blob(blob)
+        messages = self._load_messages(blob[1].blobs)
+        return MessageWindow(messages) if blob[1].window else messages
+
+    def _load_messages(self, blobs) -> list:
+        # New objects for every load: the caller may change them in place
+        return [self.serde.loads_typed(blob) for blob in blobs]
+
+    def _blob_size(self, blob: tuple) -> int:
+        if blob[0] != SHARED_MESSAGES:
+            return super()._blob_size(blob)
+        # The tuple of references, plus the messages this list serialized first (shared ones are counted once)
+        return ENTRY_OVERHEAD_BYTES + sys.getsizeof(blob[1].blobs) + blob[1].owned_bytes
+
+    # --- branches ---
+
+    def _stored_blob(self, config: RunnableConfig, channel: str) -> tuple:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            store = self._get_store(thread_id)
+            checkpoints = store.checkpoints.get(checkpoint_ns) if store else None
+            if not checkpoints:
+                raise ValueError(f"No checkpoints for thread {thread_id!r}")
+            checkpoint_id = get_checkpoint_id(config) or max(checkpoints)
+            if checkpoint_id not in checkpoints:
+                raise ValueError(f"Unknown checkpoint {checkpoint_id!r} of thread {thread_id!r}")
+            version = store.versions[(checkpoint_ns, checkpoint_id)].get(channel)
+            return store.blobs.get((checkpoint_ns, channel, version), ("empty", b""))
+
+    def branches(self, thread_id: str, checkpoint_ns: str = "", channel: str = "messages") -> list:
+        """
+        Lists the branches of a thread, newest head first, without loading any checkpoint.
+
+        Args:
+            thread_id: The thread.
+            checkpoint_ns: Checkpoint namespace ("" for the main graph).
+            channel: Channel whose message count is reported.
+
+        Returns:
+            A Branch per checkpoint that has no children.
+        """
+        with self._lock:
+            store = self._get_store(thread_id)
+            checkpoints = store.checkpoints.get(checkpoint_ns, {}) if store else {}
+            children: dict = {}
+            for checkpoint_id, (_, _, parent) in checkpoints.items():
+                if parent in checkpoints:
+                    children[parent] = children.get(parent, 0) + 1
+
+            result = []
+            for head in sorted((c for c in checkpoints if c not in children), reverse=True):
+                # Walk up to the nearest checkpoint with more than one child
+                length, current, fork_point = 1, head, None
+                while True:
+                    parent = checkpoints[current][2]
+                    if parent not in checkpoints:
+                        break
+                    if children[parent] > 1:
+                        fork_point = parent
+                        break
+                    current, length = parent, length + 1
+                version = store.versions[(checkpoint_ns, head)].get(channel)
+                blob = store.blobs.get((checkpoint_ns, channel, version))
+                result.append(Branch(
+                    checkpoint_id=head,
+                    fork_point=fork_point,
+                    checkpoints=length,
+                    messages=len(blob[1].blobs) if blob and blob[0] == SHARED_MESSAGES else None,
+                    config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                             "checkpoint_id": head}},
+                ))
+            return result
+
+    def diff(self, a: RunnableConfig, b: RunnableConfig, channel: str = "messages") -> BranchDiff:
+        """
+        Compares the messages of two checkpoints (without checkpoint_id: the latest of the thread).
+
+        Only the messages between the common head and tail are deserialized.
+        """
+        blob_a, blob_b = self._stored_blob(a, channel), self._stored_blob(b, channel)
+        if blob_a[0] == SHARED_MESSAGES and blob_b[0] == SHARED_MESSAGES:
+            blobs_a, blobs_b = blob_a[1].blobs, blob_b[1].blobs
+            common, common_tail = _common_ends(blobs_a, blobs_b, lambda x, y: x is y or x == y)
+            return BranchDiff(common, common_tail,
+                              self._load_messages(blobs_a[common:len(blobs_a) - common_tail]),
+                              self._load_messages(blobs_b[common:len(blobs_b) - common_tail]))
+
+        # Not stored as shared lists: compare the loaded values
+        messages_a = list(self._loads_blob(blob_a)) if blob_a[0] != "empty" else []
+        messages_b = list(self._loads_blob(blob_b)) if blob_b[0] != "empty" else []
+        common, common_tail = _common_ends(messages_a, messages_b, lambda x, y: x == y)
+        return BranchDiff(common, common_tail, messages_a[common:len(messages_a) - common_tail],
+                          messages_b[common:len(messages_b) - common_tail])
+
+
+def _common_ends(a, b, same) -> tuple:
+    """Returns the number of equal items at the start and (in the rest) at the end of both sequences."""
+    head = 0
+    while head < min(len(a), len(b)) and same(a[head], b[head]):
+        head += 1
+    tail = 0
+    while tail < min(len(a), len(b)) - head and same(a[-1 - tail], b[-1 - tail]):
+        tail += 1
+    return head, tail
@@ -1,26 +1,204 @@
 import os
+import json
+import hashlib
+import threading
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor, wait
 from PIL import Image as PILImage
 
-def save_and_show_graph(graph, filename: str, show_image: bool = False):
+from config.secret_keys import get_setting
+from utils.graph_local_renderer import render_graph_png, render_graph_svg
+
+# Sidecar file mapping each image filename to the fingerprint it was rendered from
+CACHE_MANIFEST = "./GraphImages/.render_cache.json"
+
+# Hit / miss counters for the render cache (reset with reset_render_cache_stats)
+render_cache_stats = {"hits": 0, "misses": 0}
+
+# Renderers that save_and_show_graph can use, and the formats each one supports
+RENDERERS = {
+    "mermaid": ("png",),  # draw_mermaid_png(), calls the external Mermaid service
+    "local": ("png", "svg"),  # utils.graph_local_renderer, no network call
+}
+
+
+def graph_fingerprint(graph) -> str:
+    """
+    Builds a content hash of the graph topology.
+
+    The hash covers every node, every edge and whether the edge is a conditional
+    branch, so two graphs with the same shape always share the same fingerprint.
+
+    Args:
+        graph: The compiled graph object.
+    """
+    drawable = graph.get_graph()
+    topology = {
+        "nodes": sorted(drawable.nodes),
+        "edges": sorted(
+            [edge.source, edge.target, str(edge.data or ""), bool(edge.conditional)]
+            for edge in drawable.edges
+        ),
+    }
+    payload = json.dumps(topology, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# Background rendering: a single worker keeps manifest writes in order
+_render_executor = None
+_render_executor_lock = threading.Lock()
+_pending_renders = []
+
+
+def _get_render_executor() -> ThreadPoolExecutor:
+    global _render_executor
+    with _render_executor_lock:
+        if _render_executor is None:
+            _render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-render")
+        return _render_executor
+
+
+def wait_for_pending_renders(timeout: float = None) -> int:
+    """
+    Blocks until every background render has finished (call it at shutdown).
+
+    Args:
+        timeout: Maximum number of seconds to wait, or None to wait forever.
+
+    Returns:
+        The number of renders that are still running after the timeout.
+    """
+    with _render_executor_lock:
+        pending = list(_pending_renders)
+    done, not_done = wait(pending, timeout=timeout)
+    with _render_executor_lock:
+        for future in done:
+            if future in _pending_renders:
+                _pending_renders.remove(future)
+    return len(not_done)
+
+
+def _report_background_error(future):
+    if future.exception() is not None:
+        print(f"Background graph render failed: {future.exception()}")
+
+
+def _render(graph, renderer: str, image_format: str) -> bytes:
+    if renderer == "local" and image_format == "svg":
+        return render_graph_svg(graph).encode("utf-8")
+    if renderer == "local":
+        return render_graph_png(graph)
+    return graph.get_graph().draw_mermaid_png()
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(CACHE_MANIFEST, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest: dict):
+    with open(CACHE_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def get_render_cache_stats() -> dict:
+    """Returns a copy of the render cache hit / miss counters."""
+    return dict(render_cache_stats)
+
+
+def reset_render_cache_stats():
+    """Resets the render cache hit / miss counters to zero."""
+    render_cache_stats["hits"] = 0
+    render_cache_stats["misses"] = 0
+
+
+def save_and_show_graph(
+    graph,
+    filename: str,
+    show_image: bool = False,
+    use_cache: bool = True,
+    renderer: str = None,
+    image_format: str = "png",
+    background: bool = False,
+) -> str:
     """
     Saves the graph image and optionally displays it.
 
+    If the image on disk was rendered from a graph with the same fingerprint,
+    rendering is skipped and the existing file is reused.
+
     Args:
         graph: The compiled graph object.
         filename: The custom name for the image file (without extension).
         show_image: Boolean flag to display the image after saving.
+        use_cache: Skip rendering when the graph topology has not changed.
+        renderer: "mermaid" (external Mermaid service) or "local" (offline, no network).
+            Defaults to GRAPH_RENDERER (environment or .env file), or "mermaid".
+        image_format: "png", or "svg" with the local renderer.
+        background: Render in a worker thread and return at once. Use
+            wait_for_pending_renders() to flush pending renders at shutdown.
+
+    Returns:
+        The path of the saved image. In background mode the path is returned
+        straight away and the file appears once the render has finished.
     """
+    renderer = renderer or get_setting("GRAPH_RENDERER", "mermaid")
+    if image_format not in RENDERERS.get(renderer, ()):
+        raise ValueError(f"Unsupported renderer / format combination: {renderer!r} / {image_format!r}")
+
+    # Hand the work to the render thread and return without waiting for it
+    if background:
+        future = _get_render_executor().submit(
+            _save_graph_image, graph, filename, show_image, use_cache, renderer, image_format
+        )
+        future.add_done_callback(_report_background_error)
+        with _render_executor_lock:
+            _pending_renders.append(future)
+        return f"./GraphImages/{filename}.{image_format}"
+
+    return _save_graph_image(graph, filename, show_image, use_cache, renderer, image_format)
+
+
+def _save_graph_image(graph, filename, show_image, use_cache, renderer, image_format) -> str:
     # Ensure the GraphImages directory exists
     os.makedirs("GraphImages", exist_ok=True)
 
-    # Save the graph image as a PNG file in the GraphImages directory
-    img_path = f"./GraphImages/{filename}.png"
-    with open(img_path, "wb") as f:
-        f.write(graph.get_graph().draw_mermaid_png())
+    img_path = f"./GraphImages/{filename}.{image_format}"
+    cache_key = os.path.basename(img_path)
 
-    print(f"Graph saved as '{img_path}'")
+    # Reuse the existing image if it was rendered from the same topology with the same renderer
+    fingerprint = f"{renderer}:{graph_fingerprint(graph)}" if use_cache else None
+    manifest = _load_manifest()
+    if use_cache and manifest.get(cache_key) == fingerprint and os.path.exists(img_path):
+        render_cache_stats["hits"] += 1
+        print(f"Graph unchanged, reusing '{img_path}'")
+    else:
+        render_cache_stats["misses"] += 1
+
+        # Render first so a failed render never truncates the existing image
+        image_bytes = _render(graph, renderer, image_format)
+
+        # Save the graph image in the GraphImages directory
+        with open(img_path, "wb") as f:
+            f.write(image_bytes)
+
+        # The manifest must describe the image on disk: record it, or forget the old entry
+        if use_cache:
+            manifest[cache_key] = fingerprint
+            _save_manifest(manifest)
+        elif manifest.pop(cache_key, None) is not None:
+            _save_manifest(manifest)
+
+        print(f"Graph saved as '{img_path}'")
 
     # Open and optionally display the image
-    if show_image:
+    if show_image and image_format == "svg":
+        webbrowser.open(f"file://{os.path.abspath(img_path)}")
+    elif show_image:
         img = PILImage.open(img_path)
         img.show()
+
+    return img_path
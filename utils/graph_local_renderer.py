@@ -0,0 +1,294 @@
+"""
+Offline renderer for compiled graphs.
+
+draw_mermaid_png() sends the diagram to an external Mermaid service. This module
+lays the graph out locally (simple layered / Sugiyama-style layout) and writes
+SVG or PNG without any network call. PNG output uses Pillow, which the project
+already depends on.
+"""
+import io
+from PIL import Image, ImageDraw, ImageFont
+
+# Layout constants (pixels)
+NODE_HEIGHT = 36
+NODE_PADDING_X = 18
+CHAR_WIDTH = 7
+LAYER_GAP = 70
+NODE_GAP = 40
+MARGIN = 30
+BACK_EDGE_OFFSET = 30
+
+# Colours roughly matching the default Mermaid theme
+NODE_FILL = "#f2f0ff"
+NODE_BORDER = "#9c8ee6"
+TERMINAL_FILL = "#bfb6fc"
+EDGE_COLOR = "#333333"
+TEXT_COLOR = "#000000"
+
+START_ID = "__start__"
+END_ID = "__end__"
+
+
+def _find_back_edges(node_ids, edges):
+    """Returns the edges that close a cycle (e.g. tools -> assistant)."""
+    children = {node_id: [] for node_id in node_ids}
+    for edge in edges:
+        children[edge.source].append(edge.target)
+
+    back_edges = set()
+    state = {}  # node -> "visiting" / "done"
+
+    def visit(node_id):
+        state[node_id] = "visiting"
+        for child in children[node_id]:
+            if state.get(child) == "visiting":
+                back_edges.add((node_id, child))
+            elif child not in state:
+                visit(child)
+        state[node_id] = "done"
+
+    roots = [START_ID] if START_ID in children else []
+    for node_id in roots + list(node_ids):
+        if node_id not in state:
+            visit(node_id)
+    return back_edges
+
+
+def layout_graph(graph) -> dict:
+    """
+    Computes node positions for a compiled graph.
+
+    Nodes are placed in layers by their longest distance from START, END is
+    always put in the last layer, and nodes inside a layer are ordered by the
+    average position of their parents to reduce edge crossings.
+
+    Args:
+        graph: The compiled graph object.
+
+    Returns:
+        A dict with "nodes" (id -> box), "edges", "width" and "height".
+    """
+    drawable = graph.get_graph()
+    node_ids = list(drawable.nodes)
+    labels = {node_id: node.name for node_id, node in drawable.nodes.items()}
+    edges = list(drawable.edges)
+    back_edges = _find_back_edges(node_ids, edges)
+
+    # Longest-path layering over the graph without its back edges
+    layer = {node_id: 0 for node_id in node_ids}
+    forward = [e for e in edges if (e.source, e.target) not in back_edges]
+    for _ in range(len(node_ids)):
+        changed = False
+        for edge in forward:
+            if layer[edge.target] < layer[edge.source] + 1:
+                layer[edge.target] = layer[edge.source] + 1
+                changed = True
+        if not changed:
+            break
+    if END_ID in layer and len(layer) > 1:
+        layer[END_ID] = max(value for key, value in layer.items() if key != END_ID) + 1
+
+    # Group into layers and order by the barycenter of the parents
+    layers = {}
+    for node_id in node_ids:
+        layers.setdefault(layer[node_id], []).append(node_id)
+    order = {}
+    for depth in sorted(layers):
+        members = layers[depth]
+
+        def barycenter(node_id):
+            parents = [order[e.source] for e in forward if e.target == node_id and e.source in order]
+            return sum(parents) / len(parents) if parents else 0.0
+
+        members.sort(key=barycenter)
+        for index, node_id in enumerate(members):
+            order[node_id] = index
+
+    # Node sizes from label length
+    widths = {node_id: len(labels[node_id]) * CHAR_WIDTH + 2 * NODE_PADDING_X for node_id in node_ids}
+    layer_widths = {
+        depth: sum(widths[n] for n in members) + NODE_GAP * (len(members) - 1)
+        for depth, members in layers.items()
+    }
+    content_width = max(layer_widths.values()) if layer_widths else 0
+
+    # Edges that skip a layer are routed around the left side, back edges around the right side
+    long_edges = {(e.source, e.target) for e in forward if layer[e.target] - layer[e.source] > 1}
+    left_pad = BACK_EDGE_OFFSET * 2 if long_edges else 0
+    right_pad = BACK_EDGE_OFFSET * 2 if back_edges else 0
+    total_width = content_width + 2 * MARGIN + left_pad + right_pad
+
+    boxes = {}
+    for depth, members in layers.items():
+        x = MARGIN + left_pad + (content_width - layer_widths[depth]) / 2
+        y = MARGIN + depth * (NODE_HEIGHT + LAYER_GAP)
+        for node_id in members:
+            boxes[node_id] = {
+                "label": labels[node_id],
+                "x": x,
+                "y": y,
+                "width": widths[node_id],
+                "height": NODE_HEIGHT,
+                "terminal": node_id in (START_ID, END_ID),
+            }
+            x += widths[node_id] + NODE_GAP
+
+    laid_out_edges = [
+        {
+            "source": edge.source,
+            "target": edge.target,
+            "label": str(edge.data) if edge.data else "",
+            "conditional": bool(edge.conditional),
+            "back": (edge.source, edge.target) in back_edges,
+            "long": (edge.source, edge.target) in long_edges,
+        }
+        for edge in edges
+    ]
+    total_height = MARGIN * 2 + (max(layers) + 1) * NODE_HEIGHT + max(layers) * LAYER_GAP if layers else 0
+    return {"nodes": boxes, "edges": laid_out_edges, "width": int(total_width), "height": int(total_height)}
+
+
+def _edge_points(layout, edge):
+    """
+    Returns the polyline for an edge: straight between neighbouring layers,
+    around the left side when it skips layers and around the right side for back edges.
+    """
+    source = layout["nodes"][edge["source"]]
+    target = layout["nodes"][edge["target"]]
+    if edge["long"]:
+        side_x = min(source["x"], target["x"]) - BACK_EDGE_OFFSET
+        return [
+            (source["x"], source["y"] + source["height"] / 2),
+            (side_x, source["y"] + source["height"] / 2),
+            (side_x, target["y"] + target["height"] / 2),
+            (target["x"], target["y"] + target["height"] / 2),
+        ]
+    if not edge["back"]:
+        return [
+            (source["x"] + source["width"] / 2, source["y"] + source["height"]),
+            (target["x"] + target["width"] / 2, target["y"]),
+        ]
+    side_x = max(source["x"] + source["width"], target["x"] + target["width"]) + BACK_EDGE_OFFSET
+    return [
+        (source["x"] + source["width"], source["y"] + source["height"] / 2),
+        (side_x, source["y"] + source["height"] / 2),
+        (side_x, target["y"] + target["height"] / 2),
+        (target["x"] + target["width"], target["y"] + target["height"] / 2),
+    ]
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def render_graph_svg(graph) -> str:
+    """
+    Renders a compiled graph to an SVG document without any network call.
+
+    Args:
+        graph: The compiled graph object.
+    """
+    layout = layout_graph(graph)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout["width"]}" height="{layout["height"]}" '
+        f'viewBox="0 0 {layout["width"]} {layout["height"]}" font-family="sans-serif" font-size="12">',
+        '<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto">'
+        f'<path d="M0,0 L0,6 L9,3 z" fill="{EDGE_COLOR}"/></marker></defs>',
+        '<rect width="100%" height="100%" fill="white"/>',
+    ]
+
+    for edge in layout["edges"]:
+        points = _edge_points(layout, edge)
+        dash = ' stroke-dasharray="5,4"' if edge["conditional"] else ""
+        coords = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+        parts.append(
+            f'<polyline points="{coords}" fill="none" stroke="{EDGE_COLOR}"{dash} marker-end="url(#arrow)"/>'
+        )
+        if edge["label"]:
+            (x1, y1), (x2, y2) = points[len(points) // 2 - 1], points[len(points) // 2]
+            parts.append(
+                f'<text x="{(x1 + x2) / 2 + 4:.1f}" y="{(y1 + y2) / 2:.1f}" fill="{TEXT_COLOR}">{_escape(edge["label"])}</text>'
+            )
+
+    for box in layout["nodes"].values():
+        fill = TERMINAL_FILL if box["terminal"] else NODE_FILL
+        radius = NODE_HEIGHT / 2 if box["terminal"] else 5
+        parts.append(
+            f'<rect x="{box["x"]:.1f}" y="{box["y"]:.1f}" width="{box["width"]}" height="{box["height"]}" '
+            f'rx="{radius}" fill="{fill}" stroke="{NODE_BORDER}"/>'
+        )
+        parts.append(
+            f'<text x="{box["x"] + box["width"] / 2:.1f}" y="{box["y"] + box["height"] / 2 + 4:.1f}" '
+            f'text-anchor="middle" fill="{TEXT_COLOR}">{_escape(box["label"])}</text>'
+        )
+
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def _draw_dashed_line(draw, start, end, dash=5, gap=4):
+    (x1, y1), (x2, y2) = start, end
+    length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+    if length == 0:
+        return
+    dx, dy = (x2 - x1) / length, (y2 - y1) / length
+    position = 0.0
+    while position < length:
+        segment_end = min(position + dash, length)
+        draw.line(
+            [(x1 + dx * position, y1 + dy * position), (x1 + dx * segment_end, y1 + dy * segment_end)],
+            fill=EDGE_COLOR,
+            width=1,
+        )
+        position = segment_end + gap
+
+
+def _draw_arrow_head(draw, start, end, size=8):
+    (x1, y1), (x2, y2) = start, end
+    length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5 or 1
+    dx, dy = (x2 - x1) / length, (y2 - y1) / length
+    left = (x2 - dx * size - dy * size / 2, y2 - dy * size + dx * size / 2)
+    right = (x2 - dx * size + dy * size / 2, y2 - dy * size - dx * size / 2)
+    draw.polygon([(x2, y2), left, right], fill=EDGE_COLOR)
+
+
+def render_graph_png(graph) -> bytes:
+    """
+    Renders a compiled graph to PNG bytes with Pillow, without any network call.
+
+    Args:
+        graph: The compiled graph object.
+    """
+    layout = layout_graph(graph)
+    image = Image.new("RGB", (max(layout["width"], 1), max(layout["height"], 1)), "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    for edge in layout["edges"]:
+        points = _edge_points(layout, edge)
+        for start, end in zip(points, points[1:]):
+            if edge["conditional"]:
+                _draw_dashed_line(draw, start, end)
+            else:
+                draw.line([start, end], fill=EDGE_COLOR, width=1)
+        _draw_arrow_head(draw, points[-2], points[-1])
+        if edge["label"]:
+            (x1, y1), (x2, y2) = points[len(points) // 2 - 1], points[len(points) // 2]
+            draw.text(((x1 + x2) / 2 + 4, (y1 + y2) / 2 - 6), edge["label"], fill=TEXT_COLOR, font=font)
+
+    for box in layout["nodes"].values():
+        fill = TERMINAL_FILL if box["terminal"] else NODE_FILL
+        radius = NODE_HEIGHT / 2 if box["terminal"] else 5
+        rect = [box["x"], box["y"], box["x"] + box["width"], box["y"] + box["height"]]
+        draw.rounded_rectangle(rect, radius=radius, fill=fill, outline=NODE_BORDER)
+        draw.text(
+            (box["x"] + box["width"] / 2, box["y"] + box["height"] / 2),
+            box["label"],
+            fill=TEXT_COLOR,
+            font=font,
+            anchor="mm",
+        )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
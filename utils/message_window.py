@@ -0,0 +1,262 @@
+"""
+Windowed message channel with O(1) eviction of the oldest messages.
+
+Deleting history with one RemoveMessage per message makes add_messages look up
+every id and rebuild the whole list, and add_messages also copies the list on
+every append. MessageWindow keeps the messages in a shared buffer with a head
+and a tail position (like a ring buffer, with the evicted head compacted away
+once it is more than half of the buffer):
+  - appending adds the new messages at the tail
+  - KeepLast(n) and TruncateBefore(id) only move the head
+  - RemoveMessage for the oldest messages also just moves the head; other
+    removals and replacements (same id) fall back to rebuilding the list
+Every value is an immutable view, so old checkpoints and branches never change.
+
+Usage:
+
+    class State(MessagesState):
+        messages: WindowedMessages
+
+    def summarize(state):
+        ...
+        return {"messages": TruncateBefore(state["messages"][-2].id)}  # keep the last 2
+"""
+import uuid
+from dataclasses import dataclass
+from collections.abc import Sequence
+from typing import Annotated, Optional
+
+from langchain_core.messages import RemoveMessage, convert_to_messages, message_chunk_to_message
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+
+# Dataclasses, so the checkpoint serializer can store them as pending writes
+@dataclass(frozen=True)
+class KeepLast:
+    """Channel update that keeps only the last `n` messages."""
+
+    n: int
+
+
+@dataclass(frozen=True)
+class TruncateBefore:
+    """Channel update that drops every message before the one with id `message_id`."""
+
+    message_id: str
+
+
+class _Buffer:
+    """Messages shared by several windows. Positions are absolute: items[pos - offset]."""
+
+    __slots__ = ("items", "offset", "index")
+
+    def __init__(self, messages: list, offset: int = 0):
+        self.items = messages
+        self.offset = offset
+        self.index = {m.id: offset + i for i, m in enumerate(messages)}
+
+    @property
+    def end(self) -> int:
+        return self.offset + len(self.items)
+
+
+class MessageWindow(Sequence):
+    """Immutable list of messages backed by a shared buffer (append at the tail, evict at the head)."""
+
+    __slots__ = ("_buffer", "_start", "_end")
+
+    def __init__(self, messages: Optional[list] = None):
+        self._buffer = _Buffer(list(messages or []))
+        self._start = 0
+        self._end = self._buffer.end
+
+    @classmethod
+    def _view(cls, buffer: _Buffer, start: int, end: int) -> "MessageWindow":
+        window = cls.__new__(cls)
+        window._buffer = buffer
+        window._start = start
+        window._end = end
+        return window
+
+    # --- reading (like a list) ---
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, key):
+        items, offset = self._buffer.items, self._buffer.offset
+        if isinstance(key, slice):
+            return items[self._start - offset: self._end - offset][key]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("MessageWindow index out of range")
+        return items[self._start - offset + key]
+
+    def __iter__(self):
+        items, offset = self._buffer.items, self._buffer.offset
+        for pos in range(self._start - offset, self._end - offset):
+            yield items[pos]
+
+    def position(self, message_id: str) -> Optional[int]:
+        """Returns the index of the message with this id, or None."""
+        pos = self._buffer.index.get(message_id)
+        if pos is None or not self._start <= pos < self._end:
+            return None
+        return pos - self._start
+
+    def __add__(self, other) -> list:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> list:
+        return list(other) + list(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MessageWindow, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageWindow({list(self)!r})"
+
+    def __reduce__(self):
+        # Pickle only the visible messages
+        return (MessageWindow, (list(self),))
+
+    def _asdict(self) -> dict:
+        # Lets the checkpoint serializer store the window as MessageWindow(messages=[...])
+        return {"messages": list(self)}
+
+    # --- updating (every method returns a new window) ---
+
+    def keep_last(self, n: int) -> "MessageWindow":
+        """Returns the window of the last n messages."""
+        return self._evict_to(max(self._start, self._end - n))
+
+    def truncate_before(self, message_id: str) -> "MessageWindow":
+        """Returns the window starting at the message with this id (unchanged when the id is not found)."""
+        position = self.position(message_id)
+        return self if position is None else self._evict_to(self._start + position)
+
+    def _evict_to(self, start: int) -> "MessageWindow":
+        buffer = self._buffer
+        # Compact once the evicted head is more than half of the buffer (amortized O(1) per message)
+        if start - buffer.offset > len(buffer.items) // 2 and start - buffer.offset > 32:
+            live = buffer.items[start - buffer.offset: self._end - buffer.offset]
+            return MessageWindow._view(_Buffer(live, offset=start), start, self._end)
+        return MessageWindow._view(buffer, start, self._end)
+
+    def extend(self, messages: list) -> "MessageWindow":
+        """Returns the window with new messages (whose ids are not in the window yet) added at the end."""
+        if not messages:
+            return self
+        buffer, end = self._buffer, self._end + len(messages)
+        following = buffer.items[self._end - buffer.offset: end - buffer.offset]
+        if len(following) == len(messages) and all(a is b for a, b in zip(following, messages)):
+            # The same write was already applied to another view (LangGraph applies a node's
+            # writes once for conditional edges and once for the real state), share it
+            return MessageWindow._view(buffer, self._start, end)
+
+        if self._end != buffer.end:
+            # An older value (a fork): copy our part into a new buffer
+            buffer = _Buffer(buffer.items[self._start - buffer.offset: self._end - buffer.offset], offset=self._start)
+        for m in messages:
+            buffer.index[m.id] = buffer.end
+            buffer.items.append(m)
+        return MessageWindow._view(buffer, self._start, buffer.end)
+
+    def update(self, messages: list) -> "MessageWindow":
+        """Applies messages like add_messages: new ids are appended, known ids replaced, RemoveMessage deletes."""
+        window = self
+        appended, seen = [], set()
+        for i, m in enumerate(messages):
+            if isinstance(m, RemoveMessage) and m.id == REMOVE_ALL_MESSAGES:
+                window = MessageWindow._view(window._buffer, window._end, window._end)
+                appended, seen = [], set()
+                continue
+            position = window.position(m.id)
+            if isinstance(m, RemoveMessage) and position == 0 and not appended:
+                window = window._evict_to(window._start + 1)  # the oldest message: move the head
+            elif position is not None or m.id in seen:
+                # Replacing or removing in the middle: rebuild the list (rare)
+                return window.extend(appended)._rebuilt(messages[i:])
+            elif isinstance(m, RemoveMessage):
+                raise ValueError(f"Attempting to delete a message with an ID that doesn't exist ('{m.id}')")
+            else:
+                appended.append(m)
+                seen.add(m.id)
+        return window.extend(appended)
+
+    def _rebuilt(self, messages: list) -> "MessageWindow":
+        merged = list(self)
+        positions = {m.id: i for i, m in enumerate(merged)}
+        removed = set()
+        for m in messages:
+            if isinstance(m, RemoveMessage):
+                if m.id not in positions:
+                    raise ValueError(f"Attempting to delete a message with an ID that doesn't exist ('{m.id}')")
+                removed.add(m.id)
+            elif m.id in positions:
+                removed.discard(m.id)
+                merged[positions[m.id]] = m
+            else:
+                positions[m.id] = len(merged)
+                merged.append(m)
+        return MessageWindow([m for m in merged if m.id not in removed])
+
+
+def _as_messages(value) -> list:
+    messages = [message_chunk_to_message(m) for m in convert_to_messages(value)]
+    for m in messages:
+        if m.id is None:
+            m.id = str(uuid.uuid4())
+    return messages
+
+
+def add_to_window(left: Optional[MessageWindow], right) -> MessageWindow:
+    """
+    Reducer for a windowed message channel.
+
+    Args:
+        left: The current messages.
+        right: What the node returned: a message, a list of messages (RemoveMessage works
+            as with add_messages), KeepLast(n) or TruncateBefore(id), or a list mixing them.
+    """
+    return _add_to_window(left, right, None)
+
+
+def _add_to_window(left: Optional[MessageWindow], right, max_messages: Optional[int]) -> MessageWindow:
+    if not isinstance(left, MessageWindow):
+        left = MessageWindow(_as_messages(left or []))
+    window = left
+    updates = right if isinstance(right, (list, tuple)) else [right]
+    pending = []
+    for update in updates:
+        if isinstance(update, (KeepLast, TruncateBefore)):
+            window = window.update(_as_messages(pending))
+            pending = []
+            if isinstance(update, KeepLast):
+                window = window.keep_last(update.n)
+            else:
+                window = window.truncate_before(update.message_id)
+        else:
+            pending.append(update)
+    window = window.update(_as_messages(pending))
+    if max_messages is not None and len(window) > max_messages:
+        window = window.keep_last(max_messages)
+    return window
+
+
+def message_window(max_messages: Optional[int] = None):
+    """Returns the state field type of a windowed message channel that keeps at most max_messages."""
+    if max_messages is None:
+        return Annotated[MessageWindow, add_to_window]
+
+    def add_to_bounded_window(left, right):
+        return _add_to_window(left, right, max_messages)
+
+    return Annotated[MessageWindow, add_to_bounded_window]
+
+
+# State field type for a windowed message channel (no size limit)
+WindowedMessages = message_window()
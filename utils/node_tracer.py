@@ -0,0 +1,267 @@
+"""
+Local per-node tracing for compiled graphs, without LangSmith.
+
+NodeTracer is a callback handler. For every node execution it records the
+wall time, the number of LLM and tool calls made inside the node, the
+prompt / completion tokens reported by the LLM and the size in bytes of the
+state the node received (serialized like a checkpoint). Records can be
+written as JSONL, and the totals per node in the Prometheus text format
+(e.g. for node_exporter's textfile collector). Nothing is sent over the network.
+
+Usage:
+
+    tracer = NodeTracer()
+    graph = tracer.attach(builder.compile())
+    ...
+    tracer.export_jsonl("./traces/nodes.jsonl")
+    tracer.write_prometheus("./traces/nodes.prom")
+
+Or set GRAPH_TRACE_DIR in the .env file and call trace_graph(graph, "name"):
+the records are written to that folder when the script exits.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import merge_configs
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# LangGraph tags the run of every node execution with "graph:step:<N>"
+STEP_TAG_PREFIX = "graph:step:"
+
+# Totals kept per node for the Prometheus export
+_TOTAL_FIELDS = ("executions", "errors", "duration_seconds", "llm_calls", "tool_calls",
+                 "prompt_tokens", "completion_tokens", "state_bytes")
+
+
+def _state_size(serde: JsonPlusSerializer, state: Any) -> Optional[int]:
+    try:
+        return len(serde.dumps_typed(state)[1])
+    except Exception:
+        return None
+
+
+def _token_usage(response) -> tuple:
+    """Returns (prompt_tokens, completion_tokens) of an LLMResult."""
+    prompt_tokens = completion_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if not found:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+class NodeTracer(BaseCallbackHandler):
+    """Callback handler that records one entry per node execution."""
+
+    # Keep the callbacks in order (and cheap) for async graphs too
+    run_inline = True
+
+    def __init__(self, max_records: int = 10000, measure_state: bool = True):
+        """
+        Args:
+            max_records: Number of most recent node executions kept for export_jsonl; the
+                Prometheus totals always cover every execution.
+            measure_state: Serialize each node's input state to record its size in bytes.
+        """
+        self.records: deque = deque(maxlen=max_records)
+        self.measure_state = measure_state
+        self._serde = JsonPlusSerializer()
+        self._lock = threading.Lock()
+        self._active: dict = {}  # node run id -> record being filled
+        self._owner: dict = {}  # run id -> node run id it belongs to
+        self._totals: dict = {}  # node -> {field: total}
+
+    def attach(self, graph):
+        """
+        Adds this tracer to the callbacks of the compiled graph and returns the graph.
+
+        The graph itself is updated (not wrapped in a RunnableBinding like with_config() may do),
+        so it stays a CompiledStateGraph for code that looks for one.
+        """
+        graph.config = merge_configs(graph.config, {"callbacks": [self]})
+        return graph
+
+    # --- callbacks ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       tags: Optional[list] = None, metadata: Optional[dict] = None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        step = next((t[len(STEP_TAG_PREFIX):] for t in tags or [] if t.startswith(STEP_TAG_PREFIX)), None)
+        with self._lock:
+            if node is not None and step is not None and kwargs.get("name") == node:
+                self._active[run_id] = {
+                    "node": node,
+                    "thread_id": metadata.get("thread_id"),
+                    "checkpoint_ns": metadata.get("checkpoint_ns", ""),
+                    "step": int(step),
+                    "started_at": time.time(),
+                    "duration_seconds": None,
+                    "llm_calls": 0,
+                    "tool_calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "state_bytes": _state_size(self._serde, inputs) if self.measure_state else None,
+                    "error": None,
+                    "_start": time.perf_counter(),
+                }
+                self._owner[run_id] = run_id
+            elif parent_run_id in self._owner:
+                self._owner[run_id] = self._owner[parent_run_id]
+
+    def _child_start(self, run_id: UUID, parent_run_id: Optional[UUID], counter: str):
+        with self._lock:
+            owner = self._owner.get(parent_run_id)
+            if owner is not None:
+                self._owner[run_id] = owner
+                self._active[owner][counter] += 1
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._child_start(run_id, parent_run_id, "llm_calls")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._child_start(run_id, parent_run_id, "llm_calls")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._child_start(run_id, parent_run_id, "tool_calls")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        with self._lock:
+            owner = self._owner.pop(run_id, None)
+            if owner in self._active:
+                self._active[owner]["prompt_tokens"] += prompt_tokens
+                self._active[owner]["completion_tokens"] += completion_tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._owner.pop(run_id, None)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        with self._lock:
+            self._owner.pop(run_id, None)
+
+    on_tool_error = on_llm_error
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id, None)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # An interrupt (breakpoint) also ends a node with an "error"
+        self._finish(run_id, f"{type(error).__name__}: {error}")
+
+    def _finish(self, run_id: UUID, error: Optional[str]):
+        with self._lock:
+            self._owner.pop(run_id, None)
+            record = self._active.pop(run_id, None)
+            if record is None:
+                return
+            record["duration_seconds"] = time.perf_counter() - record.pop("_start")
+            record["error"] = error
+            self.records.append(record)
+
+            totals = self._totals.setdefault(record["node"], dict.fromkeys(_TOTAL_FIELDS, 0))
+            totals["executions"] += 1
+            totals["errors"] += error is not None
+            for field in _TOTAL_FIELDS[2:]:
+                totals[field] += record[field] or 0
+
+    # --- export ---
+
+    def totals(self) -> dict:
+        """Returns the totals per node: executions, errors, seconds, LLM / tool calls, tokens and state bytes."""
+        with self._lock:
+            return {node: dict(values) for node, values in self._totals.items()}
+
+    def export_jsonl(self, path: str, clear: bool = True) -> int:
+        """
+        Appends the recorded node executions to a JSONL file.
+
+        Args:
+            path: File to append to, its folder is created if needed.
+            clear: Drop the exported records from memory (totals are kept).
+
+        Returns:
+            The number of records written.
+        """
+        with self._lock:
+            records = list(self.records)
+            if clear:
+                self.records.clear()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        return len(records)
+
+    def to_prometheus(self, prefix: str = "langgraph_node") -> str:
+        """Returns the per-node totals in the Prometheus text exposition format."""
+        metrics = [
+            ("executions", "counter", "Node executions."),
+            ("errors", "counter", "Node executions that raised (including interrupts)."),
+            ("duration_seconds", "counter", "Wall time spent in the node."),
+            ("llm_calls", "counter", "LLM calls made inside the node."),
+            ("tool_calls", "counter", "Tool calls made inside the node."),
+            ("prompt_tokens", "counter", "Prompt tokens reported by the LLM."),
+            ("completion_tokens", "counter", "Completion tokens reported by the LLM."),
+            ("state_bytes", "counter", "Serialized size of the input state, summed over executions."),
+        ]
+        totals = self.totals()
+        lines = []
+        for field, kind, help_text in metrics:
+            name = f"{prefix}_{field}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for node in sorted(totals):
+                label = node.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{node="{label}"}} {totals[node][field]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "langgraph_node"):
+        """Writes to_prometheus() to `path` atomically (safe for the textfile collector)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+def trace_graph(graph, name: str, trace_dir: Optional[str] = None):
+    """
+    Attaches a NodeTracer if tracing is enabled, otherwise returns the graph unchanged.
+
+    Args:
+        graph: The compiled graph.
+        name: File name (without extension) for the exported records.
+        trace_dir: Output folder, defaults to the GRAPH_TRACE_DIR environment variable.
+
+    Returns:
+        `graph`, with the tracer attached when tracing is on.
+    """
+    trace_dir = trace_dir or os.getenv("GRAPH_TRACE_DIR")
+    if not trace_dir:
+        return graph
+
+    tracer = NodeTracer()
+
+    def export():
+        tracer.export_jsonl(os.path.join(trace_dir, f"{name}.jsonl"))
+        tracer.write_prometheus(os.path.join(trace_dir, f"{name}.prom"))
+
+    atexit.register(export)
+    return tracer.attach(graph)
@@ -0,0 +1,205 @@
+"""
+Persistent cache for search results, shared by runs and restarts.
+
+The same (or nearly the same) questions reach the search nodes again and
+again, and every search costs upstream latency and API quota. RetrievalCache
+stores search results in a SQLite file, keyed by source and normalized
+question (case, punctuation, extra spaces and a few filler words ignored):
+  - fresh for `ttl` seconds: returned without a request
+  - stale for another `stale_ttl` seconds: returned right away, and refreshed
+    in the background (stale-while-revalidate); a failed refresh keeps the old value
+  - older: fetched again before returning
+  - at most `max_entries` entries / `max_bytes` of results, least recently used evicted first
+  - one fetch per key at a time: concurrent misses for the same question wait for it
+stats() reports hits, stale hits, misses, refreshes, evictions and the size.
+
+Usage:
+
+    retrieval_cache = RetrievalCache("./.retrieval_cache/search.sqlite", ttl=24 * 3600)
+    docs = retrieval_cache.get_or_fetch("tavily", question, lambda: tavily.search(question, max_results=3))
+"""
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Words that don't change what a search returns
+FILLER_WORDS = {"a", "an", "the", "please", "me", "tell", "about", "what", "is", "are", "can", "you"}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercases, drops punctuation and filler words and collapses whitespace."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    words = re.findall(r"\w+", text)
+    return " ".join(w for w in words if w not in FILLER_WORDS) or " ".join(words)
+
+
+class RetrievalCache:
+    """SQLite-backed cache of search results with TTL, stale-while-revalidate and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = "./.retrieval_cache/search.sqlite",
+        ttl: float = 24 * 3600,
+        stale_ttl: float = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = 200 * 1024 * 1024,
+        refresh_workers: int = 2,
+    ):
+        """
+        Args:
+            path: SQLite file (created with its folder if missing).
+            ttl: Seconds a result is fresh.
+            stale_ttl: Seconds after `ttl` during which the stale result is served while it is refreshed.
+            max_entries: Maximum number of cached results.
+            max_bytes: Maximum total size of the cached results, None for no limit.
+            refresh_workers: Background threads refreshing stale results.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.serde = JsonPlusSerializer()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (source TEXT, question TEXT, type TEXT, value BLOB, "
+            "size INTEGER, fetched_at REAL, used_at REAL, PRIMARY KEY (source, question))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+        self._lock = threading.Lock()
+        self._inflight: dict = {}  # key -> Future of the running fetch
+        self._refreshing: set = set()  # keys with a background refresh queued or running
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="retrieval-refresh")
+        self.counts = dict.fromkeys(("hits", "stale_hits", "misses", "refreshes", "refresh_errors", "evictions"), 0)
+
+    # --- reading ---
+
+    def _read(self, key: tuple) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute("SELECT type, value, fetched_at FROM results WHERE source = ? AND question = ?",
+                                     key).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE results SET used_at = ? WHERE source = ? AND question = ?",
+                                   (time.time(), *key))
+        return row
+
+    def get_or_fetch(self, source: str, question: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for the question, calling `fetch()` when there is none (or it expired).
+
+        Args:
+            source: Name of the search source, including anything that changes its results (e.g. "tavily:3").
+            question: The question as asked (normalized for the key).
+            fetch: Runs the search and returns its result.
+        """
+        key = (source, normalize_question(question))
+        row = self._read(key)
+        if row is not None:
+            age = time.time() - row[2]
+            if age < self.ttl:
+                self._count("hits")
+                return self.serde.loads_typed((row[0], row[1]))
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh(key, fetch)
+                return self.serde.loads_typed((row[0], row[1]))
+        self._count("misses")
+        return self._fetch(key, fetch).result()
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    # --- fetching ---
+
+    def _fetch(self, key: tuple, fetch: Callable[[], Any]) -> Future:
+        """Runs the fetch in the calling thread, or returns the future of the fetch already running for `key`."""
+        with self._lock:
+            running = self._inflight.get(key)
+            if running is not None:
+                return running
+            future = Future()
+            self._inflight[key] = future
+        try:
+            value = fetch()
+            self._write(key, value)
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future
+
+    def _refresh(self, key: tuple, fetch: Callable[[], Any]):
+        with self._lock:
+            if key in self._inflight or key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                failed = self._fetch(key, fetch).exception() is not None
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+            self._count("refresh_errors" if failed else "refreshes")  # after an error the stale result stays
+
+        self._refresher.submit(refresh)
+
+    # --- writing ---
+
+    def _write(self, key: tuple, value: Any):
+        type_, blob = self.serde.dumps_typed(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (*key, type_, blob, len(blob), now, now))
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        over_count = max(0, count - self.max_entries)
+        if self.max_bytes is not None and size > self.max_bytes:
+            freed, over_size = 0, 0
+            for (row_size,) in self._conn.execute("SELECT size FROM results ORDER BY used_at"):
+                if size - freed <= self.max_bytes:
+                    break
+                freed += row_size
+                over_size += 1
+            over_count = max(over_count, over_size)
+        if over_count:
+            self._conn.execute("DELETE FROM results WHERE rowid IN "
+                               "(SELECT rowid FROM results ORDER BY used_at LIMIT ?)", (over_count,))
+            self.counts["evictions"] += over_count
+
+    # --- maintenance ---
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self):
+        """Waits for background refreshes and closes the database."""
+        self._refresher.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            lookups = self.counts["hits"] + self.counts["stale_hits"] + self.counts["misses"]
+            hit_rate = (self.counts["hits"] + self.counts["stale_hits"]) / lookups if lookups else 0.0
+            return {**self.counts, "entries": entries, "bytes": size, "hit_rate": round(hit_rate, 3)}
@@ -0,0 +1,69 @@
+"""
+Hierarchical rolling summaries of a long conversation.
+
+Extending one summary string makes it grow with the conversation, and every
+extension re-reads all of it. Here the history is kept as a list of bounded
+summaries, oldest first, each with a level:
+  - every summarization adds one level 0 summary of the messages it removes
+  - whenever the last `fanout` summaries have the same level, they are rolled
+    up into one summary of the next level (like carrying in a counter)
+So a conversation of n chunks keeps at most (fanout - 1) summaries per level,
+about (fanout - 1) * log(n) in total, and each summarization reads one chunk
+plus, now and then, `fanout` summaries. Newer parts of the conversation stay
+in more detail than older ones.
+
+Usage:
+
+    summaries = add_summary(summaries, {"level": 0, "text": chunk_summary}, merge=merge_summaries)
+    text = summaries_for_prompt(summaries, max_tokens=1000, count_tokens=token_counter.encode)
+"""
+from typing import Callable
+
+# How many summaries of one level are rolled up into one summary of the next level
+DEFAULT_FANOUT = 4
+
+
+def add_summary(summaries: list, summary: dict, merge: Callable[[list], str], fanout: int = DEFAULT_FANOUT) -> list:
+    """
+    Appends a level 0 summary and rolls up full groups.
+
+    Args:
+        summaries: Existing summaries ({"level": int, "text": str}), oldest first.
+        summary: The new summary of the latest chunk of the conversation.
+        merge: Writes one summary from a list of summary texts (oldest first), e.g. with an LLM call.
+        fanout: Number of same-level summaries that are rolled up together.
+
+    Returns:
+        The new list (the input list is not modified).
+    """
+    summaries = summaries + [summary]
+    while len(summaries) >= fanout and len({s["level"] for s in summaries[-fanout:]}) == 1:
+        group = summaries[-fanout:]
+        merged = {"level": group[0]["level"] + 1, "text": merge([s["text"] for s in group])}
+        summaries = summaries[:-fanout] + [merged]
+    return summaries
+
+
+def summaries_for_prompt(summaries: list, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """
+    Joins the summaries for the prompt, oldest first, within max_tokens.
+
+    The highest level summaries cover most of the conversation and are always
+    included. The lower levels are added level by level while they fit, the
+    newest summaries of a level first, so when the budget is short the finest
+    (level 0) summaries are left out first.
+    """
+    if not summaries:
+        return ""
+    top = max(s["level"] for s in summaries)
+    selected = {i for i, s in enumerate(summaries) if s["level"] == top}
+    used = sum(count_tokens(summaries[i]["text"]) for i in selected)
+    lower = sorted((i for i in range(len(summaries)) if i not in selected),
+                   key=lambda i: (-summaries[i]["level"], -i))
+    for i in lower:
+        tokens = count_tokens(summaries[i]["text"])
+        if used + tokens > max_tokens:
+            break
+        selected.add(i)
+        used += tokens
+    return "\n\n".join(summaries[i]["text"] for i in sorted(selected))
@@ -0,0 +1,192 @@
+"""
+Process-wide pooled clients for the web and Wikipedia search nodes.
+
+TavilySearchResults posts every search with requests.post() and
+WikipediaLoader goes through the `wikipedia` package, which calls
+requests.get() for every API request, so each search opens new TCP/TLS
+connections, and the search nodes build a new client on every invocation.
+The clients here share one requests.Session per process:
+  - keep-alive connection pools (`pool_size` connections per host)
+  - at most `max_concurrency` requests in flight, the rest wait for a slot
+  - a timeout on every request
+  - a descriptive User-Agent, as Wikimedia's User-Agent policy asks for (generic
+    library agents can be throttled or refused); set SEARCH_USER_AGENT in the
+    .env file to add your contact details
+WikipediaSearchClient also fetches the page info of all search hits in one
+API request instead of several requests per page. The API returns only one
+whole-page extract per request, so the extracts come in one continuation
+request per page.
+
+Usage:
+
+    tavily, wikipedia = shared_search_clients(tavily_api_key=TAVILY_API_KEY)
+    docs = tavily.search("question", max_results=3)            # [{"url": ..., "content": ...}, ...]
+    pages = wikipedia.load("question", load_max_docs=2)        # [Document(page_content, metadata), ...]
+"""
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from langchain_core.documents import Document
+
+from config.secret_keys import get_setting
+
+TAVILY_API_URL = "https://api.tavily.com"
+WIKIPEDIA_API_URL = "https://{lang}.wikipedia.org/w/api.php"
+
+# Same limits as WikipediaLoader
+WIKIPEDIA_MAX_QUERY_LENGTH = 300
+DOC_CONTENT_CHARS_MAX = 4000
+
+# "<client>/<version> (<details>) <library>/<version>", the form Wikimedia's User-Agent policy asks for
+DEFAULT_USER_AGENT = (f"LangGraphLearning/1.0 (search nodes of 8-ParallelWebSearchGraph.py) "
+                      f"{requests.utils.default_user_agent()}")
+
+
+class PooledSession:
+    """requests.Session with keep-alive pools and a limit on concurrent requests."""
+
+    def __init__(self, pool_size: int = 32, max_concurrency: int = 16, timeout: float = 20.0,
+                 user_agent: str = DEFAULT_USER_AGENT):
+        """
+        Args:
+            pool_size: Keep-alive connections kept per host.
+            max_concurrency: Requests in flight at the same time (across all threads).
+            timeout: Seconds to wait for a response.
+            user_agent: User-Agent header of every request.
+        """
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def request_json(self, method: str, url: str, **kwargs) -> dict:
+        with self._slots:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+class TavilySearchClient:
+    """Tavily search over a shared PooledSession (the results of TavilySearchResults)."""
+
+    def __init__(self, http: PooledSession, api_key: str, base_url: str = TAVILY_API_URL):
+        self.http = http
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def search(self, query: str, max_results: int = 3) -> list:
+        """Returns the results as [{"title", "url", "content", "score"}, ...]."""
+        params = {
+            "api_key": self.api_key,
+            "query": query,
+            "max_results": max_results,
+            "search_depth": "advanced",
+            "include_answer": False,
+            "include_raw_content": False,
+            "include_images": False,
+        }
+        results = self.http.request_json("POST", f"{self.base_url}/search", json=params)["results"]
+        return [{key: r.get(key) for key in ("title", "url", "content", "score")} for r in results]
+
+
+class WikipediaSearchClient:
+    """Wikipedia search over a shared PooledSession (the documents of WikipediaLoader)."""
+
+    def __init__(self, http: PooledSession, lang: str = "en", base_url: Optional[str] = None):
+        self.http = http
+        self.api_url = base_url or WIKIPEDIA_API_URL.format(lang=lang)
+
+    def load(self, query: str, load_max_docs: int = 2, doc_content_chars_max: int = DOC_CONTENT_CHARS_MAX) -> list:
+        """
+        Returns the pages of the top search hits as Documents (metadata: title, summary, source).
+
+        Like WikipediaLoader, disambiguation and missing pages are skipped.
+        """
+        hits = self.http.request_json("GET", self.api_url, params={
+            "action": "query", "list": "search", "srsearch": query[:WIKIPEDIA_MAX_QUERY_LENGTH],
+            "srlimit": load_max_docs, "srprop": "", "format": "json",
+        })["query"]["search"]
+        titles = [hit["title"] for hit in hits][:load_max_docs]
+        if not titles:
+            return []
+
+        pages = self._query_pages(titles)
+        by_title = {page["title"]: page for page in pages["pages"].values()
+                    if "missing" not in page and "disambiguation" not in page.get("pageprops", {})}
+        # Titles the API normalized or followed a redirect for
+        for alias in pages["normalized"] + pages["redirects"]:
+            if alias["to"] in by_title:
+                by_title.setdefault(alias["from"], by_title[alias["to"]])
+
+        documents = []
+        for title in titles:
+            page = by_title.get(title)
+            if page is None or "extract" not in page:
+                continue  # no content, so nothing half-loaded ends up in the cache
+            content = page["extract"]
+            documents.append(Document(
+                page_content=content[:doc_content_chars_max],
+                metadata={"title": title, "summary": content.split("\n\n", 1)[0], "source": page.get("fullurl", "")},
+            ))
+        return documents
+
+    def _query_pages(self, titles: list) -> dict:
+        """
+        Returns the info, page props and whole-page extracts of `titles`.
+
+        TextExtracts returns one whole-page extract per request ("exlimit" is lowered to 1) and an
+        `excontinue` offset for the next one, so the request is repeated with the continuation
+        parameters until every page has its extract.
+        """
+        params = {
+            "action": "query", "prop": "extracts|info|pageprops", "ppprop": "disambiguation",
+            "explaintext": 1, "inprop": "url", "redirects": 1, "titles": "|".join(titles),
+            "format": "json", "continue": "",
+        }
+        merged = {"pages": {}, "normalized": [], "redirects": []}
+        for _ in range(len(titles) + 1):
+            response = self.http.request_json("GET", self.api_url, params=params)
+            query = response.get("query", {})
+            for page_id, page in query.get("pages", {}).items():
+                merged["pages"].setdefault(page_id, {}).update(page)
+            if not merged["normalized"] and not merged["redirects"]:
+                merged["normalized"] = query.get("normalized", [])
+                merged["redirects"] = query.get("redirects", [])
+            if "continue" not in response:
+                break
+            params = {**params, **response["continue"]}
+        return merged
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_search_clients(tavily_api_key: str, pool_size: int = 32, max_concurrency: int = 16,
+                          timeout: float = 20.0, user_agent: Optional[str] = None) -> tuple:
+    """
+    Returns the process-wide (TavilySearchClient, WikipediaSearchClient), created on first use.
+
+    Args:
+        tavily_api_key: Tavily API key.
+        pool_size: Keep-alive connections kept per host.
+        max_concurrency: Search requests in flight at the same time.
+        timeout: Seconds to wait for a response.
+        user_agent: User-Agent header, defaults to SEARCH_USER_AGENT (environment or .env file),
+            or DEFAULT_USER_AGENT.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            http = PooledSession(pool_size=pool_size, max_concurrency=max_concurrency, timeout=timeout,
+                                 user_agent=user_agent or get_setting("SEARCH_USER_AGENT", DEFAULT_USER_AGENT))
+            _shared = (TavilySearchClient(http, tavily_api_key), WikipediaSearchClient(http))
+        return _shared
@@ -0,0 +1,430 @@
+"""
+Durable single-file checkpointer on SQLite in WAL mode, with group commit.
+
+MemorySaver loses everything on restart and MongoDBSaver needs a server.
+SQLiteWALSaver keeps checkpoints in one local SQLite file:
+  - WAL journal: writers append to the write-ahead log, readers are not blocked,
+    and after a crash SQLite recovers by replaying the log when the file is opened
+  - group commit: put / put_writes from any number of threads are handed to one
+    writer thread, which commits everything that queued up while the previous
+    transaction was being written in a single transaction (one fsync for the group)
+  - reads use a per-thread connection with the database memory-mapped
+    (`mmap_size`), so get_tuple on recent checkpoints is served from the page cache
+The layout is the same as MemorySaver's: the checkpoint, and one blob per
+channel version, so unchanged channels are not written again.
+
+Usage:
+
+    memory = SQLiteWALSaver("./checkpoints.db")
+    graph = builder.compile(checkpointer=memory)
+"""
+import time
+import queue
+import random
+import asyncio
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Iterator, Sequence
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+# Stops the writer thread
+_STOP = object()
+
+
+class SQLiteWALSaver(BaseCheckpointSaver[str]):
+    """Checkpointer that stores checkpoints in a local SQLite file (WAL mode, group commit)."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        group_commit_ms: float = 0.0,
+        max_batch: int = 512,
+        synchronous: str = "FULL",
+        mmap_size: int = 256 * 2**20,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            path: Database file, created if needed.
+            group_commit_ms: Extra time the writer waits for more writes to join a transaction.
+                With 0, a transaction takes whatever was queued while the previous one committed.
+            max_batch: Maximum number of writes per transaction (1 disables group commit).
+            synchronous: SQLite synchronous mode: "FULL" syncs every commit to disk,
+                "NORMAL" may lose the last commits on power loss (never on a process crash).
+            mmap_size: Bytes of the database file memory-mapped by readers.
+            serde: Serializer, as for MemorySaver.
+        """
+        super().__init__(serde=serde)
+        self.path = path
+        self.group_commit_ms = group_commit_ms
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.commits = 0  # transactions
+        self.committed_writes = 0  # puts / put_writes in those transactions
+
+        self._local = threading.local()
+        self._readers: list = []
+        self._readers_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+
+        # Create the schema (and recover the WAL of an earlier crash) before anything else
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._writer_conn = conn
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    # --- connections ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    # --- group commit ---
+
+    def _write_loop(self):
+        conn = self._writer_conn
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            # Everything queued while the previous transaction was committing joins this one
+            batch = [first]
+            deadline = time.monotonic() + self.group_commit_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(item)
+
+            # Every future of the batch is resolved, whatever happens, so no caller waits forever
+            error: Optional[BaseException] = RuntimeError("The checkpoint writer stopped.")
+            try:
+                conn.execute("BEGIN")
+                for statements, _ in batch:
+                    for sql, rows in statements:
+                        conn.executemany(sql, rows)
+                conn.execute("COMMIT")
+                self.commits += 1
+                self.committed_writes += len(batch)
+                error = None
+            except Exception as e:
+                error = e
+                self._rollback(conn)
+            finally:
+                for _, future in batch:
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+
+    @staticmethod
+    def _rollback(conn: sqlite3.Connection):
+        # BEGIN may have failed (e.g. "database is locked"), or SQLite already rolled back after the error
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def _submit(self, statements: list):
+        """Queues the statements for the next group commit and waits until they are committed."""
+        if not self._writer.is_alive():
+            raise RuntimeError("SQLiteWALSaver is closed.")
+        future: Future = Future()
+        self._queue.put((statements, future))
+        future.result()
+
+    def close(self):
+        """Flushes pending writes and closes the database."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer_conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+    def __enter__(self) -> "SQLiteWALSaver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # --- reading ---
+
+    def _load_blobs(self, conn, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict:
+        if not versions:
+            return {}
+        channel_values = {}
+        # One primary key lookup per (channel, version): the cost does not grow with the thread's history
+        params = [thread_id, checkpoint_ns]
+        for channel, version in versions.items():
+            params += [channel, str(version)]
+        rows = conn.execute(
+            "SELECT channel, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND ("
+            + " OR ".join(["(channel = ? AND version = ?)"] * len(versions)) + ")",
+            params,
+        ).fetchall()
+        for channel, type_, blob in rows:
+            if type_ != "empty":
+                channel_values[channel] = self.serde.loads_typed((type_, blob))
+        return channel_values
+
+    def _make_tuple(self, conn, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = conn.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+            "AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = conn.execute(
+                "SELECT type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+                "AND channel = ? ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+        checkpoint_: Checkpoint = self.serde.loads_typed((type_, checkpoint))
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint_,
+                "channel_values": self._load_blobs(conn, thread_id, checkpoint_ns, checkpoint_["channel_versions"]),
+                "pending_sends": [self.serde.loads_typed(send) for send in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        conn = self._reader()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return self._make_tuple(conn, thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        conn = self._reader()
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        rows = conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints "
+            + (f"WHERE {' AND '.join(where)} " if where else "")
+            + "ORDER BY checkpoint_id DESC",
+            params,
+        )
+        count = 0
+        for thread_id, checkpoint_ns, *row in rows.fetchall():
+            if limit is not None and count >= limit:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            count += 1
+            yield self._make_tuple(conn, thread_id, checkpoint_ns, tuple(row))
+
+    # --- writing ---
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values: dict[str, Any] = c.pop("channel_values")
+
+        # Serialize in the calling thread, the writer thread only runs SQL
+        blob_rows = []
+        for channel, version in new_versions.items():
+            type_, blob = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            blob_rows.append((thread_id, checkpoint_ns, channel, str(version), type_, blob))
+        type_, serialized = self.serde.dumps_typed(c)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        checkpoint_row = (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                          type_, serialized, metadata_type, serialized_metadata)
+
+        self._submit([
+            ("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows),
+            ("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [checkpoint_row]),
+        ])
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        replace, keep = [], []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, serialized = self.serde.dumps_typed(value)
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx, channel, type_, serialized, task_path)
+            # Special writes (errors, interrupts) replace earlier ones, regular writes are only stored once
+            (keep if write_idx >= 0 else replace).append(row)
+        self._submit([
+            ("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", keep),
+            ("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", replace),
+        ])
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._submit([(f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,)])
+                      for table in ("checkpoints", "blobs", "writes")])
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        # Same scheme as MemorySaver: zero-padded counter, then a random suffix
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- async versions (run the blocking calls in a worker thread) ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,374 @@
+"""
+HTTP / Server-Sent Events front-end that streams per-step state diffs.
+
+With stream_mode="values" the whole state is sent after every step, although
+a client only needs what changed. StateStreamServer runs a graph for HTTP
+clients and streams to every subscriber of a thread:
+  - snapshot:  all messages, once when the client subscribes
+  - diff:      per step, only the added / replaced messages and the removed ids
+  - interrupt: the run paused at a breakpoint (next nodes and pending tool calls)
+  - end / error
+Each event is encoded once and the same bytes are written to every
+subscriber, so thousands of subscribers cost one encode per event. A
+subscriber that stops reading (more than `max_buffer` bytes waiting) is
+disconnected; on reconnect it gets a new snapshot. Clients skip events whose
+"seq" is not above the seq of their snapshot. Subscribe with ?mode=values to
+get the full messages after every step instead (like stream_mode="values").
+
+It only uses asyncio from the standard library and runs in a background thread.
+
+Endpoints:
+
+    GET  /threads/{thread_id}/stream[?mode=values]   SSE stream of the thread
+    GET  /threads/{thread_id}/state                   current messages and next nodes (JSON)
+    POST /threads/{thread_id}/runs                    {"input": "user message"} starts a run,
+                                                      {"input": null} resumes from the breakpoint,
+                                                      {"input": null, "edit": "new message"} edits, then resumes
+                                                      (resume and edit answer 403 with allow_resume=False)
+
+Usage:
+
+    server = StateStreamServer(breakpoint_graph, port=8765).start()
+    ...
+    server.stop()
+
+Or set STATE_STREAM_PORT in the .env file and call serve_state_stream(graph).
+A graph whose breakpoint is decided elsewhere (an ApprovalQueue with its
+policy, a person at the terminal) is served with allow_resume=False, so an
+HTTP client can't run a tool call that was never approved.
+"""
+import os
+import json
+import time
+import atexit
+import asyncio
+import operator
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlsplit, parse_qs
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+SSE_HEADERS = (b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+               b"Connection: keep-alive\r\n\r\n")
+
+
+def message_to_dict(message) -> dict:
+    """Compact JSON form of a message."""
+    data = {"id": message.id, "type": message.type, "content": message.content}
+    for name in ("tool_calls", "tool_call_id", "name"):
+        value = getattr(message, name, None)
+        if value:
+            data[name] = value
+    return data
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n".encode()
+
+
+def diff_messages(previous: list, current: list) -> Optional[dict]:
+    """
+    Returns what changed from `previous` to `current`: {"added": [...], "updated": [...], "removed": [ids]},
+    or None when the new order can't be reached by removing, replacing in place and appending.
+    """
+    n = len(previous)
+    if len(current) >= n and all(map(operator.is_, previous, current)):
+        # The usual step: messages appended at the end
+        return {"added": current[n:], "updated": [], "removed": []}
+
+    old = {m.id: m for m in previous}
+    ids = {m.id for m in current}
+    removed = [m.id for m in previous if m.id not in ids]
+    # Loaded from different checkpoints, unchanged messages are equal but not the same objects
+    updated = [m for m in current if m.id in old and old[m.id] is not m and old[m.id] != m]
+    added = [m for m in current if m.id not in old]
+    kept = [m.id for m in previous if m.id in ids]
+    if kept + [m.id for m in added] != [m.id for m in current]:
+        return None
+    return {"added": added, "updated": updated, "removed": removed}
+
+
+class _ThreadStream:
+    """Subscribers and latest state of one thread (used on the event loop only)."""
+
+    def __init__(self):
+        self.subscribers = {"diff": set(), "values": set()}  # mode -> stream writers
+        self.seq = 0
+        self.messages: Optional[list] = None  # messages after the latest event
+        self.next: list = []
+        self.snapshot: Optional[tuple] = None  # (seq, encoded snapshot)
+
+
+class StateStreamServer:
+    """Runs a graph for HTTP clients and streams state diffs of its threads over SSE."""
+
+    def __init__(self, graph, host: str = "127.0.0.1", port: int = 8765, max_workers: int = 8,
+                 max_buffer: int = 1 << 20, allow_resume: bool = True):
+        """
+        Args:
+            graph: Compiled graph with a checkpointer.
+            host: Interface to listen on.
+            port: Port to listen on (0 picks a free port, see `self.port` after start()).
+            max_workers: Graph runs executed at the same time.
+            max_buffer: Unsent bytes after which a slow subscriber is disconnected.
+            allow_resume: Accept runs that resume (or edit and resume) a thread from its breakpoint. Turn it
+                off when the breakpoint is an approval step that HTTP clients must not get around.
+        """
+        self.graph = graph
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.allow_resume = allow_resume
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="state-stream")
+        self._threads: dict = {}  # thread id -> _ThreadStream
+        self._run_locks: dict = {}  # thread id -> lock, one run per thread at a time
+        self._seqs: dict = {}  # thread id -> seq of the last published event (runs side)
+        self._locks_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._counts_lock = threading.Lock()  # counts are updated by the run threads and the event loop
+        self.counts = {"events": 0, "bytes_sent": 0, "encode_cpu_seconds": 0.0, "send_cpu_seconds": 0.0,
+                       "subscribers": 0, "dropped_subscribers": 0, "runs": 0}
+
+    # --- lifecycle ---
+
+    def start(self) -> "StateStreamServer":
+        """Starts listening in a background thread. Returns self."""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=4096))
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="state-stream-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Closes every connection and stops the server."""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            for stream in self._threads.values():
+                for writers in stream.subscribers.values():
+                    for writer in writers:
+                        writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self._loop = None
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            return dict(self.counts)
+
+    def _count(self, **increments):
+        with self._counts_lock:
+            for name, value in increments.items():
+                self.counts[name] += value
+
+    # --- HTTP ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = {k.strip().lower(): v.strip() for k, v in
+                       (line.split(":", 1) for line in header_lines if ":" in line)}
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+            url = urlsplit(target)
+            parts = url.path.strip("/").split("/")
+            if len(parts) != 3 or parts[0] != "threads":
+                return await self._respond(writer, 404, {"error": "not found"})
+            thread_id, action = parts[1], parts[2]
+            if method == "GET" and action == "stream":
+                mode = parse_qs(url.query).get("mode", ["diff"])[0]
+                if mode not in ("diff", "values"):
+                    return await self._respond(writer, 400, {"error": "mode must be diff or values"})
+                return await self._subscribe(thread_id, mode, reader, writer)
+            if method == "GET" and action == "state":
+                stream = await self._current(thread_id)
+                return await self._respond(writer, 200, {"messages": [message_to_dict(m) for m in stream.messages],
+                                                         "next": stream.next})
+            if method == "POST" and action == "runs":
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    return await self._respond(writer, 400, {"error": "the body must be a JSON object"})
+                if not self.allow_resume and (request.get("input") is None or request.get("edit") is not None):
+                    return await self._respond(writer, 403, {"error": "this graph's breakpoint is approved elsewhere, "
+                                                                      "only new input can be posted"})
+                self._executor.submit(self._run, thread_id, request.get("input"), request.get("edit"))
+                return await self._respond(writer, 202, {"status": "started"})
+            return await self._respond(writer, 405, {"error": "method not allowed"})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+        except ValueError as e:
+            await self._respond(writer, 400, {"error": str(e)})
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, data: dict):
+        body = json.dumps(data, default=str).encode()
+        writer.write(f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    # --- subscribers (event loop) ---
+
+    async def _current(self, thread_id: str) -> _ThreadStream:
+        stream = self._threads.setdefault(thread_id, _ThreadStream())
+        if stream.messages is None:
+            snapshot = await self._loop.run_in_executor(self._executor, self.graph.get_state, self._config(thread_id))
+            if stream.messages is None:  # no event arrived meanwhile
+                stream.messages = list(snapshot.values.get("messages", []))
+                stream.next = list(snapshot.next)
+        return stream
+
+    async def _subscribe(self, thread_id: str, mode: str, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter):
+        stream = await self._current(thread_id)
+        if stream.snapshot is None or stream.snapshot[0] != stream.seq:
+            stream.snapshot = (stream.seq, sse_event("snapshot", {
+                "seq": stream.seq, "thread_id": thread_id, "next": stream.next,
+                "messages": [message_to_dict(m) for m in stream.messages]}))
+        writer.write(SSE_HEADERS + stream.snapshot[1])
+        stream.subscribers[mode].add(writer)
+        self._count(subscribers=1)
+        try:
+            # Nothing more is expected from the client, this returns when it disconnects
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            stream.subscribers[mode].discard(writer)
+            self._count(subscribers=-1)
+            writer.close()
+
+    def _broadcast(self, thread_id: str, seq: int, messages: list, next_nodes: list, payloads: dict):
+        start = time.thread_time()
+        stream = self._threads.setdefault(thread_id, _ThreadStream())
+        stream.seq, stream.messages, stream.next = seq, messages, next_nodes
+        bytes_sent = dropped = 0
+        for mode, writers in stream.subscribers.items():
+            payload = payloads.get(mode)
+            if not writers or payload is None:
+                continue
+            for writer in list(writers):
+                if writer.transport.get_write_buffer_size() > self.max_buffer:
+                    writers.discard(writer)  # too slow: it reconnects and gets a new snapshot
+                    dropped += 1
+                    writer.close()
+                    continue
+                writer.write(payload)
+            bytes_sent += len(payload) * len(writers)
+        self._count(events=1, bytes_sent=bytes_sent, dropped_subscribers=dropped,
+                    send_cpu_seconds=time.thread_time() - start)
+
+    def _wants(self, thread_id: str, mode: str) -> bool:
+        stream = self._threads.get(thread_id)
+        return stream is not None and bool(stream.subscribers[mode])
+
+    # --- runs (worker threads) ---
+
+    @staticmethod
+    def _config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    def _run_lock(self, thread_id: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._run_locks.setdefault(thread_id, threading.Lock())
+
+    def _publish(self, thread_id: str, seq: int, event: str, data: dict, messages: list, next_nodes: list,
+                 full: Optional[dict] = None):
+        """Encodes the event once per mode that has subscribers and hands it to the event loop."""
+        start = time.thread_time()
+        base = {"seq": seq, "thread_id": thread_id}
+        payloads = {}
+        if self._wants(thread_id, "diff"):
+            payloads["diff"] = sse_event(event, {**base, **data})
+        if self._wants(thread_id, "values"):
+            payloads["values"] = sse_event("values" if full is not None else event, {**base, **(full or data)})
+        self._count(encode_cpu_seconds=time.thread_time() - start)
+        self._loop.call_soon_threadsafe(self._broadcast, thread_id, seq, messages, next_nodes, payloads)
+
+    def _run(self, thread_id: str, user_input: Any, edit: Optional[str] = None):
+        config = self._config(thread_id)
+        with self._run_lock(thread_id):
+            self._count(runs=1)
+            seq = self._seqs.get(thread_id, 0)
+            previous = list(self.graph.get_state(config).values.get("messages", []))
+            try:
+                if edit is not None:
+                    self.graph.update_state(config, {"messages": HumanMessage(content=edit)})
+                graph_input = {"messages": HumanMessage(content=user_input)} if user_input is not None else None
+                node = None
+                for mode, chunk in self.graph.stream(graph_input, config, stream_mode=["updates", "values"]):
+                    if mode == "updates":
+                        node = next(iter(chunk), None)
+                        continue
+                    messages = list(chunk.get("messages", []))
+                    change = diff_messages(previous, messages)
+                    if change is not None and not any(change.values()):
+                        continue  # nothing changed (e.g. the first chunk when resuming)
+                    seq += 1
+                    if change is None:
+                        event, data = "snapshot", {"messages": [message_to_dict(m) for m in messages]}
+                    else:
+                        event, data = "diff", {key: [message_to_dict(m) for m in value] if key != "removed" else value
+                                               for key, value in change.items()}
+                    data["node"] = node
+                    full = None
+                    if self._wants(thread_id, "values"):
+                        full = {"node": node, "messages": [message_to_dict(m) for m in messages]}
+                    self._publish(thread_id, seq, event, data, messages, [], full)
+                    previous = messages
+
+                state = self.graph.get_state(config)
+                seq += 1
+                if state.next:
+                    last = previous[-1] if previous else None
+                    tool_calls = last.tool_calls if isinstance(last, AIMessage) and "tools" in state.next else []
+                    self._publish(thread_id, seq, "interrupt", {"next": list(state.next), "tool_calls": tool_calls},
+                                  previous, list(state.next))
+                else:
+                    self._publish(thread_id, seq, "end", {}, previous, [])
+            except Exception as e:
+                seq += 1
+                self._publish(thread_id, seq, "error", {"message": str(e)}, previous, [])
+            self._seqs[thread_id] = seq
+
+
+def serve_state_stream(graph, port: Optional[int] = None, allow_resume: bool = True) -> Optional[StateStreamServer]:
+    """
+    Starts a StateStreamServer for the graph if streaming is enabled, otherwise does nothing.
+
+    Args:
+        graph: The compiled graph.
+        port: Port to listen on, defaults to the STATE_STREAM_PORT environment variable.
+        allow_resume: Accept resume and edit requests, see StateStreamServer.
+
+    Returns:
+        The running server (stopped when the script exits), or None when STATE_STREAM_PORT is not set.
+    """
+    port = port or os.getenv("STATE_STREAM_PORT")
+    if not port:
+        return None
+    server = StateStreamServer(graph, port=int(port), allow_resume=allow_resume).start()
+    atexit.register(server.stop)
+    print(f"Streaming state diffs on http://127.0.0.1:{server.port}/threads/<thread_id>/stream")
+    return server
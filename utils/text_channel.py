@@ -0,0 +1,120 @@
+"""
+Append-only text channel for graph state.
+
+`state["text"] + " more"` copies the whole string on every node, which is
+quadratic when a graph loops many times. TextRope keeps the fragments in a
+list instead and only joins them into a str when the text is read.
+
+Usage:
+
+    class State(TypedDict):
+        graph_state: AppendOnlyText
+
+    def node_1(state):
+        return {"graph_state": " I am"}  # only the new fragment
+"""
+from typing import Annotated, Union
+
+
+class TextRope:
+    """
+    Immutable, list-backed text that supports O(1) appends.
+
+    Several ropes can share one fragment list: each rope only sees the first
+    `_count` fragments. Appending to the newest rope appends to the shared list
+    in place; appending to an older rope (a fork) copies its fragments first, so
+    earlier values never change. Re-applying the exact same fragments to an
+    older rope reuses the ones already in the list instead of forking.
+    """
+
+    __slots__ = ("_fragments", "_count", "_text")
+
+    def __init__(self, fragments: list = None):
+        self._fragments = [f for f in (fragments or []) if f]
+        self._count = len(self._fragments)
+        self._text = None
+
+    @classmethod
+    def _view(cls, fragments: list, count: int) -> "TextRope":
+        rope = cls.__new__(cls)
+        rope._fragments = fragments
+        rope._count = count
+        rope._text = None
+        return rope
+
+    def append(self, text: Union[str, "TextRope"]) -> "TextRope":
+        """Returns a new rope with `text` added at the end."""
+        new_fragments = text.fragments() if isinstance(text, TextRope) else [text]
+        new_fragments = [f for f in new_fragments if f]
+        if not new_fragments:
+            return self
+
+        end = self._count + len(new_fragments)
+        following = self._fragments[self._count : end]
+        if len(following) == len(new_fragments) and all(a is b for a, b in zip(following, new_fragments)):
+            # The same write was already applied to another view (LangGraph applies a node's
+            # writes once for conditional edges and once for the real state), share it
+            return TextRope._view(self._fragments, end)
+
+        if self._count == len(self._fragments):
+            fragments = self._fragments  # we are the newest view, extend in place
+        else:
+            fragments = self._fragments[: self._count]  # fork, copy our part
+        fragments.extend(new_fragments)
+        return TextRope._view(fragments, len(fragments))
+
+    def fragments(self) -> list:
+        """Returns a copy of the fragments that make up this text."""
+        return self._fragments[: self._count]
+
+    def __str__(self) -> str:
+        # Join once and keep the result, the rope itself never changes
+        if self._text is None:
+            self._text = "".join(self._fragments[: self._count])
+        return self._text
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __add__(self, other: Union[str, "TextRope"]) -> "TextRope":
+        return self.append(other)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TextRope, str)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __reduce__(self):
+        # Pickle (e.g. results coming back from a process pool) only the visible fragments
+        return (TextRope, ([str(self)],))
+
+    def _asdict(self) -> dict:
+        # Lets the checkpoint serializer store the rope as TextRope(fragments=[...])
+        return {"fragments": [str(self)]}
+
+
+def append_text(left: TextRope, right: Union[str, TextRope, None]) -> TextRope:
+    """
+    Reducer that appends a node's text fragment to the channel.
+
+    Args:
+        left: The current text.
+        right: The fragment returned by the node.
+    """
+    if left is None:
+        left = TextRope()
+    elif isinstance(left, str):
+        left = TextRope([left])
+    if right is None:
+        return left
+    return left.append(right)
+
+
+# State field type for an append-only text channel
+AppendOnlyText = Annotated[TextRope, append_text]
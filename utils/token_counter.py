@@ -0,0 +1,107 @@
+"""
+Token counting for chat messages with a per-message cache.
+
+Counting a long thread on every turn re-tokenizes the same messages again and
+again. TokenCounter remembers the count of every message by its id (together
+with a fingerprint of the content, so an edited message is counted again).
+
+The counts use tiktoken when the encoding for the model can be loaded. tiktoken
+downloads the encoding the first time, so without internet access (and no
+cached copy) it falls back to an estimate of about 4 characters per token.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+# Tokens every message costs on top of its content (role and separators)
+MESSAGE_OVERHEAD = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text and code: about 4 characters per token."""
+    return (len(text) + 3) // 4
+
+
+def load_encoder(model: str = "gpt-4o-mini") -> Callable[[str], int]:
+    """
+    Returns a function that counts the tokens of a string for `model`.
+
+    Falls back to estimate_tokens when tiktoken or its encoding is not available.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return estimate_tokens
+
+    def count(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return count
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        content += json.dumps([(call["name"], call["args"]) for call in message.tool_calls], default=str)
+    return content
+
+
+class TokenCounter:
+    """Counts message tokens and caches the count per message id."""
+
+    def __init__(self, model: str = "gpt-4o-mini", max_cached: int = 10000,
+                 encoder: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            model: Model whose tokenizer is used.
+            max_cached: Number of message counts kept (least recently used are dropped).
+            encoder: Custom function that counts the tokens of a string.
+        """
+        self.encode = encoder or load_encoder(model)
+        self.max_cached = max_cached
+        self._cache: OrderedDict = OrderedDict()  # message id -> (fingerprint, tokens)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count_message(self, message: BaseMessage) -> int:
+        """Returns the tokens of one message, from the cache when it was counted before."""
+        text = _message_text(message)
+        if message.id is None:
+            return self.encode(text) + MESSAGE_OVERHEAD
+
+        # Hashing is much cheaper than tokenizing, and catches edited messages
+        fingerprint = (len(text), hash(text))
+        with self._lock:
+            cached = self._cache.get(message.id)
+            if cached is not None and cached[0] == fingerprint:
+                self._cache.move_to_end(message.id)
+                self.hits += 1
+                return cached[1]
+
+        tokens = self.encode(text) + MESSAGE_OVERHEAD
+        with self._lock:
+            self.misses += 1
+            self._cache[message.id] = (fingerprint, tokens)
+            self._cache.move_to_end(message.id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: list) -> int:
+        """Returns the total tokens of a list of messages."""
+        return sum(self.count_message(m) for m in messages)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "cached": len(self._cache)}
@@ -0,0 +1,163 @@
+"""
+Memoization for pure tools.
+
+Agents (and users retrying after an interrupt in 6-BreakpointGraph.py) often
+repeat the exact same tool call. Tools marked with @pure_tool return the same
+result for the same arguments, so their results can be cached: bounded LRU
+size, optional TTL for tools whose answers go stale (e.g. web searches) and
+hit-rate metrics.
+
+Usage:
+
+    @pure_tool
+    def add(a: int, b: int) -> int: ...
+
+    tool_cache = ToolResultCache(maxsize=256)
+    builder.add_node("tools", ToolNode(with_result_cache(tools, tool_cache)))
+
+with_result_cache() returns normal BaseTool objects, so it works with ToolNode too.
+"""
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.tools import tool as create_tool
+
+# Attribute / metadata key that marks a tool as pure
+PURE_MARKER = "pure"
+
+
+def pure_tool(func):
+    """Marks a tool function (or BaseTool) as pure: same arguments, same result, no side effects."""
+    if isinstance(func, BaseTool):
+        func.metadata = {**(func.metadata or {}), PURE_MARKER: True}
+    else:
+        setattr(func, "__pure_tool__", True)
+    return func
+
+
+def is_pure(tool_) -> bool:
+    if isinstance(tool_, BaseTool):
+        return bool((tool_.metadata or {}).get(PURE_MARKER))
+    return bool(getattr(tool_, "__pure_tool__", False))
+
+
+class ToolResultCache:
+    """Thread-safe LRU cache of tool results with an optional time to live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Maximum number of cached results, the least recently used is evicted first.
+            ttl: Seconds a result stays valid, or None to keep it until it is evicted.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(tool_name: str, args: dict) -> str:
+        """Normalized cache key: argument order and formatting do not matter."""
+        return tool_name + ":" + json.dumps(args, sort_keys=True, default=str, separators=(",", ":"))
+
+    def get(self, key: str):
+        """Returns (True, result) on a hit, (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: str, result: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit / miss counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+def _memoize_tool(tool_: BaseTool, cache: ToolResultCache) -> BaseTool:
+    """Wraps a pure BaseTool so results are served from `cache` when possible."""
+    func = getattr(tool_, "func", None)
+    coroutine = getattr(tool_, "coroutine", None)
+
+    def cached_func(**kwargs):
+        key = cache.make_key(tool_.name, kwargs)
+        hit, result = cache.get(key)
+        if hit:
+            return result
+        result = func(**kwargs)
+        cache.put(key, result)
+        return result
+
+    async def cached_coroutine(**kwargs):
+        key = cache.make_key(tool_.name, kwargs)
+        hit, result = cache.get(key)
+        if hit:
+            return result
+        result = await coroutine(**kwargs)
+        cache.put(key, result)
+        return result
+
+    # Same name, description and schema: the LLM and the argument validation see no difference
+    return StructuredTool(
+        name=tool_.name,
+        description=tool_.description,
+        args_schema=tool_.args_schema,
+        func=cached_func if func is not None else None,
+        coroutine=cached_coroutine if coroutine is not None else None,
+        metadata=tool_.metadata,
+        return_direct=tool_.return_direct,
+    )
+
+
+def with_result_cache(tools: Sequence[Any], cache: ToolResultCache) -> list:
+    """
+    Returns the tools as BaseTool objects, with every pure tool memoized in `cache`.
+
+    Args:
+        tools: Tool functions or BaseTool objects; only the ones marked @pure_tool are cached.
+        cache: The cache shared by these tools.
+    """
+    wrapped = []
+    for tool_ in tools:
+        pure = is_pure(tool_)
+        if not isinstance(tool_, BaseTool):
+            tool_ = create_tool(tool_)
+        wrapped.append(_memoize_tool(tool_, cache) if pure else tool_)
+    return wrapped